@@ -21,7 +21,7 @@
                 Support multiple users, each with their own expense data.
     Author: David Rogers
     Date Created: 4/12/2024
-    Last Modified: 11/01/2025
+    Last Modified: 19/10/2026
     Version: 1.0 - Add pseudocode and test database connectivity
              1.1 - Add date/time string manipulation to be more readable
              1.2 - Add initial menu structure and login page
@@ -49,35 +49,180 @@
              4.4 - Testing - fix blank catID in addCat()
              4.5 - Extract Report 'save to file' as seperate function
              4.6 - Testing and fix updateCat and minor interface fixes
+             4.7 - Add bulk DELETE and Category change of searched transactions
+             4.8 - Export raw report data as CSV, JSON Lines or Parquet/Arrow
+             4.9 - Write report files in one pass without redirecting stdout
+             5.0 - Add pooled connections and a background report job queue
+             5.1 - Cache report results until the user's data changes
+             5.2 - Add a combined, parameterized search on any mix of fields
+             5.3 - Add indexed description search with prefix and fuzzy matching
+             5.4 - Read transactions by their owner userID (see migrations/)
+             5.5 - Versioned schema migrations (migrate.py) and a local SQLite database option
+             5.6 - Return changed records from UPDATE/DELETE and keep a running budget total
+             5.7 - Change several fields of a transaction at once, checking its row version
+             5.8 - Fetch report rows and budget figures in one batch of result sets
+             5.9 - Work offline from a local replica synced with Azure (see replica.py)
+             6.0 - Add an asyncio data layer with async reports and searches
+             6.1 - Serve the expense engine as a multi-user HTTP/JSON API (see server.py)
+             6.2 - Clear the screen and read key presses without a shell or msvcrt (see terminal.py)
+             6.3 - Draw transaction lists and reports with a fast fixed-column table writer (see tables.py)
+             6.4 - Import heavy modules on first use and start from main() so importing has no side effects
+             6.5 - Add weekly/monthly/yearly budgets per Category with rollover, checked from running totals
+             6.6 - Add a Category by month report built from one grouped query, with CSV export
+             6.7 - Add a spending by hour and weekday report over any dates, on a (userID, tranTime) index
+             6.8 - Add recurring transactions, added in one batch at login with keys that prevent duplicates
+             6.9 - Check for duplicate transactions with an indexed content hash, and a duplicate scan report
+             7.0 - Forecast period spending and flag unusual amounts from running Category statistics
+             7.1 - Check a Category is empty with an EXISTS probe, and merge a Category into another in one step
 -----------------------------------------------------------
 '''
 
 # import modules
-import pyodbc
-from datetime import datetime
+import sqlite3
+from datetime import datetime, date, timedelta
 from art import logo
 import getpass
 import re
-from tabulate import tabulate
-import msvcrt
 import sys
 import os
 import time
+import csv
+import json
+import contextlib
+import queue
+import threading
+import collections
+import calendar
+import heapq
+import hashlib
+import importlib.util
+import migrate
+import replica
+import terminal
+import tables
+
+
+def lazyImport(name):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Imports a module the first time it is used rather
+                    than straight away, so that starting the program
+                    (or importing it, e.g. from server.py) does not
+                    wait on modules it may never need.
+    Args:           name (string): the module to import
+    Returns:        module: the module (loaded when first used), or
+                    None if it is not installed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if name in sys.modules:
+        return (sys.modules[name])
+    spec = importlib.util.find_spec(name)
+    if spec == None:
+        return None
+    
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    
+    return (module)
+
+
+asyncio = lazyImport('asyncio')
+
+# pyarrow is optional and only needed to export reports as Parquet/Arrow
+pyarrow = lazyImport('pyarrow')
+
+# aioodbc and aiosqlite are optional and give the async data layer
+# (see getDataAsync) non-blocking database access; without them each
+# query runs on a worker thread instead
+aioodbc = lazyImport('aioodbc')
+aiosqlite = lazyImport('aiosqlite')
+
+# pyodbc is only needed for the Azure SQL database (see loadPyodbc)
+pyodbc = None
 
 
 # global variables
 userID = ""
 
+# Set EXPENSE_TRACKER_DB to a file name to use a local SQLite database
+# instead of the Azure SQL database (see connectDB), or set
+# EXPENSE_TRACKER_REPLICA to use a local replica synced with Azure
+# (see syncReplica)
+replicaDB = os.environ.get('EXPENSE_TRACKER_REPLICA', '')
+localDB = os.environ.get('EXPENSE_TRACKER_DB', '') or replicaDB
+localMigrated = False
+# The database errors to catch (pyodbc's are added by loadPyodbc)
+dbErrors = (sqlite3.Error,)
+
+# Raw report columns and the file extensions that export them
+repColumns = ['tranDate', 'tranTime', 'catName', 'tranDescription', 'tranAmount']
+exportFormats = ('.csv', '.jsonl', '.parquet', '.arrow')
+
+# Days of the week for the spending by hour report (date.weekday() order)
+dayNames = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Pool of open database connections shared by all threads
+connPool = queue.LifoQueue(maxsize=8)
+maxPoolIdle = 300 # seconds
+
+# Pool of open async database connections (see getAsyncConn)
+asyncPool = collections.deque()
+
+# Azure SQL connection string
+connectionString = f'Driver={{ODBC Driver 18 for SQL Server}};' \
+                     'Server=tcp:djr040.database.windows.net,1433;' \
+                     'Database=Exp_Tracker;' \
+                     'Uid=djr040;Pwd=;' \
+                     'Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;'
+
+# Report result cache (see getRepData) and per-user data versions
+repCache = collections.OrderedDict()
+repCacheBytes = 0
+maxCacheBytes = 32 * 1024 * 1024
+dataVersions = {}
+globalVersion = 0
+
+# Each user's [data version, expenses total, budget] (see budSummary)
+budTotals = {}
+
+# Each user's Category and period budgets (see getBudRules) and their
+# [data version, {(catID, period, period start): total}] running 
+# totals of what they spent in each period (see getPeriodTotals)
+budRules = {}
+periodTotals = {}
+budPeriods = ('week', 'month', 'year')
+periodNames = {'week': 'Weekly', 'month': 'Monthly', 'year': 'Yearly'}
+
+# Each user's [data version, {catID: [count, mean, sum of squared
+# differences from the mean, recent average]}] running statistics of
+# their transaction amounts in each Category (see getCatStats)
+catStats = {}
+recentWeight = 0.2 # weight of each new amount in the recent average
+unusualLimit = 3 # standard deviations above the Category mean
+minStatsCount = 5 # transactions needed before amounts are flagged
+cacheLock = threading.Lock()
+
+# Trigram indexes of each user's transaction descriptions (see getDescIndex)
+descIndexes = {}
+
+# Background report job queue (see queueReports)
+reportPool = None
+reportJobs = []
+
 
 def clrScreen():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        Description:    Makes an OS call to clear the terminal screen
+        Description:    Clears the terminal screen, so the next screen
+                        is drawn in place of the last (see terminal.py)
         Args:           nil
         Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    os.system('cls')
+    terminal.clearScreen()
     return
 
 
@@ -162,24 +307,90 @@ def hasTwoDecimalPlaces(value):
     return bool(re.match(pattern, value))
 
 
-def getData (sql):
+def dbDialect ():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Connects to an Azure SQL database (within a max
-                    of 5 retries), gets data from the database based
-                    on a supplied SQL statement and then closes the
-                    connection.
-    Args:           sql (string): a valid SELECT SQL statement
-    Returns:        row: database records as a list of tuples 
+    Description:    Reports which kind of database is in use, for the
+                    few statements that differ between them.
+    Args:           Nil
+    Returns:        'sqlite' for a local database, otherwise 'mssql'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if localDB != "":
+        return ('sqlite')
+    
+    return ('mssql')
+
+
+def connectLocalDB ():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Opens the local SQLite database named by the
+                    EXPENSE_TRACKER_DB environment variable. The first
+                    connection brings the database up to the latest
+                    schema (see migrate.py), creating it if needed.
+    Args:           Nil
+    Returns:        conn: an open sqlite3 connection, or None if the 
+                    database could not be opened
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    global localMigrated
+
+    try:
+        # Connections are pooled, so may be used by more than one
+        # thread (one at a time)
+        conn = sqlite3.connect(localDB, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        
+        # Rows are returned as lists, as the callers update them in place
+        conn.row_factory = lambda cursor, row: list(row)
+        
+        if not localMigrated:
+            migrate.migrate(conn, 'sqlite', quiet=True)
+            localMigrated = True
+        return (conn)
+    
+    except sqlite3.Error as e:
+        print (f"Database connection error: {e}.")
+        return None
+
+
+def loadPyodbc ():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Imports pyodbc the first time the Azure SQL 
+                    database is used and adds its errors to the 
+                    database errors caught (see dbErrors).
+    Args:           Nil
+    Returns:        pyodbc: the pyodbc module
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # Connection string
-    connectionString = f'Driver={{ODBC Driver 18 for SQL Server}};' \
-                         'Server=tcp:djr040.database.windows.net,1433;' \
-                         'Database=Exp_Tracker;' \
-                         'Uid=djr040;Pwd=;' \
-                         'Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;'
+    global pyodbc, dbErrors
+    if pyodbc == None:
+        import pyodbc
+        dbErrors = (pyodbc.Error, sqlite3.Error)
     
+    return (pyodbc)
+
+
+def connectDB (remote=False):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Connects to an Azure SQL database within a max
+                    of 5 retries, waiting 2 seconds between retries
+                    while the serverless database spins up. If a local
+                    database is set (see localDB), opens that instead.
+    Args:           remote (bool): True to connect to the Azure
+                    database even if a local database is set (used to
+                    sync a replica)
+    Returns:        conn: an open database connection, or None if a
+                    connection could not be made
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if localDB != "" and not remote:
+        return (connectLocalDB())
+    loadPyodbc()
+
     # Set connection retries before giving up
     maxRetries = 5
     retries = 0
@@ -188,12 +399,13 @@ def getData (sql):
     while retries < maxRetries:
         try:
             conn = pyodbc.connect(connectionString)
-            break
+            return (conn)
 
         # Check for database connectivity issues
         except pyodbc.OperationalError as e:
             print ('Waiting on Azure Database Server to spin up...')
             retries += 1
+            time.sleep(2)  # Wait for 2 seconds before retrying
 
         except pyodbc.InterfaceError as e:
             print (f"InterfaceError: {e}. Unable to connect to the database.")
@@ -202,204 +414,750 @@ def getData (sql):
         except pyodbc.Error as e:
             print (f"Database connection error: {e}. Retrying... ({retries + 1}/{maxRetries})")
             retries += 1
+            time.sleep(2)  # Wait for 2 seconds before retrying
     
         except Exception as e:
             print (f"An unexpected error occurred: {e}.")
             return None  # Exit early on any other unexpected errors
 
     # If the connection fails after max retries, return None
-    if retries == maxRetries:
-        print (f"Failed to connect to the database after {maxRetries} retries.")
+    print (f"Failed to connect to the database after {maxRetries} retries.")
+    return None
+
+
+def syncReplica (uID=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    When working from a local replica (see replicaDB),
+                    sends the changes made in the replica to the Azure
+                    database and brings back the changes made there
+                    (see replica.sync). If Azure cannot be reached the
+                    program carries on with the replica, and the
+                    changes are sent at the next sync.
+    Args:           uID (string): the userID to sync transactions for,
+                    or None to only refresh the read-only tables
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if replicaDB == "":
+        return
+
+    local = replica.openReplica(replicaDB)
+    print ('Syncing with the Azure database...')
+    remote = connectDB(remote=True)
+    if remote == None:
+        print ('Working offline. ' + str(replica.pendingChanges(local)) + ' change(s) waiting to be sent.')
+        local.close()
+        return
+
+    try:
+        result = replica.sync(local, remote, uID)
+        print ('Sent ' + str(result['pushed']) + ' change(s), received ' + str(result['pulled']) + ' change(s).')
+        if result['conflicts'] > 0:
+            print (str(result['conflicts']) + ' of your changes clashed with changes made elsewhere and were not sent.')
+            print ('The other changes have been kept. Your changes are saved in the syncConflicts table.')
+
+        # Categories, budgets and recurring transactions are copied on
+        # every sync, and reports, totals and searches may be out of date
+        bumpDataVersion()
+        if uID != None and (result['pulled'] > 0 or result['conflicts'] > 0):
+            bumpDataVersion(uID)
+    except dbErrors as e:
+        print (f"Sync stopped by a database error: {e}. Working offline.")
+    finally:
+        remote.close()
+        local.close()
+
+    return
+
+
+def replicaReadOnly(what):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks whether the program is working from a local
+                    replica, where budgets and recurring transactions
+                    are read-only copies of the Azure database's (see
+                    replica.refreshShared), and if so tells the user.
+    Args:           what (string): what the user was trying to change,
+                    e.g. 'Budgets'
+    Returns:        True if the change cannot be made, else False
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if replicaDB == "":
+        return (False)
+
+    print ()
+    print (what + ' can only be changed while working online with the Azure database.')
+    print ('The local copy is brought up to date each time you sync.')
+    pause()
+    return (True)
+
+
+def getConn ():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes an open connection from the connection pool,
+                    or makes a new one (see connectDB) if the pool is
+                    empty. Connections that have sat idle in the pool
+                    for too long are closed rather than reused, as the
+                    Azure gateway drops idle connections. Safe to call
+                    from worker threads.
+    Args:           Nil
+    Returns:        conn: an open database connection, or None if a
+                    connection could not be made
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    while True:
+        try:
+            conn, lastUsed = connPool.get_nowait()
+        except queue.Empty:
+            # Nothing pooled so make a new connection
+            return (connectDB())
+        
+        if time.monotonic() - lastUsed < maxPoolIdle:
+            return (conn)
+        
+        # Throw away a stale connection and try the next one
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def releaseConn (conn, healthy=True):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Hands a connection back to the connection pool so
+                    it can be reused. Connections that have had an
+                    error, or that do not fit in the pool, are closed.
+    Args:           conn: a connection from getConn
+                    healthy (bool): False if the connection had an error
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if healthy:
+        try:
+            connPool.put_nowait((conn, time.monotonic()))
+            return
+        except queue.Full:
+            pass
+    
+    try:
+        conn.close()
+    except Exception:
+        pass
+    
+    return
+
+
+def getData (sql, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes a pooled connection to the Azure SQL database
+                    (connecting within a max of 5 retries if needed),
+                    gets data from the database based on a supplied SQL
+                    statement and then hands the connection back to the
+                    pool.
+    Args:           sql (string): a valid SELECT SQL statement
+                    params (list): values for any ? placeholders in
+                    the SQL statement
+    Returns:        row: database records as a list of tuples 
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Connect to the SQL Server
+    conn = getConn()
+    if conn == None:
         return None
 
     try:
         # Create a cursor object to interact with the database
         cursor = conn.cursor()
-        cursor.execute(sql) 
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql) 
         rows = cursor.fetchall()
         
-        # Close the connection
+        # Return the connection to the pool
         cursor.close()
-        conn.close()
+        releaseConn(conn)
         
         # Return rows 
         return (rows)
 
-    except pyodbc.Error as e:
+    except dbErrors as e:
         print (f"Error executing the query: {e}")
+        releaseConn(conn, healthy=False)
         return None
 
 
-def setData (sql):
+def streamData (sql, batchSize=5000, params=None):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Connects to an Azure SQL database, sets data in 
-                    the database based on a supplied SQL statement
-                    (either UPDATE, INSERT INTO or DELETE) and then 
-                    closes the connection.
-    Args:           sql (string): a valid UPDATE, INSERT INTO or DELETE SQL 
-                    statement.
-    Returns:        Nil
+    Description:    Takes a pooled connection to the Azure SQL database
+                    and runs a supplied SQL statement, handing the 
+                    results back a batch at a time straight from the
+                    cursor. Only one batch of rows is held in memory at
+                    once, so very large results can be processed in
+                    constant memory. The connection goes back to the
+                    pool when the last batch has been read (or is
+                    closed if the caller stops early). A read that
+                    cannot start or is cut short raises RuntimeError,
+                    so the caller never takes part of the rows for all
+                    of them.
+    Args:           sql (string): a valid SELECT SQL statement
+                    batchSize (int): the number of rows per batch
+                    params (list): values for any ? placeholders in
+                    the SQL statement
+    Returns:        rows: yields database records as lists of tuples
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # Connection string
-    connectionString = f'Driver={{ODBC Driver 18 for SQL Server}};' \
-                         'Server=tcp:djr040.database.windows.net,1433;' \
-                         'Database=Exp_Tracker;' \
-                         'Uid=djr040;Pwd=;' \
-                         'Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;'
-        
-    # Set connection retries before giving up
-    maxRetries = 5
-    retries = 0
+    # Connect to the SQL Server
+    conn = getConn()
+    if conn == None:
+        raise RuntimeError('The database is not available')
 
-    while retries < maxRetries:
-        try:
-            # Connect to the SQL Server
-            conn = pyodbc.connect(connectionString)
-            break
+    finished = False
+    try:
+        # Create a cursor object to interact with the database
+        cursor = conn.cursor()
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql)
 
-        # Check for database connectivity issues
-        except pyodbc.OperationalError as e:
-            print (f"OperationalError: {e}. Retrying... ({retries + 1}/{maxRetries})")
-            retries += 1
-            time.sleep(2)  # Wait for 2 seconds before retrying
+        # Hand back each batch of rows as it is fetched
+        rows = cursor.fetchmany(batchSize)
+        while rows:
+            yield rows
+            rows = cursor.fetchmany(batchSize)
+        cursor.close()
+        finished = True
 
-        except pyodbc.InterfaceError as e:
-            print (f"InterfaceError: {e}. Unable to connect to the database.")
-            return  # Exit early if there's an issue with the database interface
+    except dbErrors as e:
+        print (f"Error executing the query: {e}")
+        raise RuntimeError('The rows could not all be read from the database') from e
 
-        except pyodbc.Error as e:
-            print (f"Database connection error: {e}. Retrying... ({retries + 1}/{maxRetries})")
-            retries += 1
-            time.sleep(2)  # Wait for 2 seconds before retrying
+    finally:
+        # Only reuse the connection if every row was read
+        releaseConn(conn, healthy=finished)
 
-        except Exception as e:
-            print (f"An unexpected error occurred: {e}.")
-            return  # Exit early on any other unexpected errors
+    return
+
+
+def getDataSets (sqlList, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes a pooled connection to the database and runs
+                    several SELECT statements, getting back the rows of
+                    each one. On SQL Server the statements are sent as
+                    a single batch and each result set is read in turn
+                    with nextset(), so they cost one round trip to the
+                    Azure database. SQLite runs them one after another
+                    on the same connection.
+    Args:           sqlList (list): valid SELECT SQL statements
+                    params (list): a list of values for any ? 
+                    placeholders for each statement
+    Returns:        rowSets: a list of rows for each statement, or None
+                    if the statements could not be run
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Pair each statement with its parameters
+    statements = list(zip(sqlList, params or [[]] * len(sqlList)))
+    
+    if dbDialect() == 'mssql':
+        # NOCOUNT stops row counts being sent back as extra results
+        batch = "SET NOCOUNT ON;"
+        batchParams = []
+        for stmt, stmtParams in statements:
+            batch += stmt.rstrip().rstrip(';') + ";"
+            batchParams += stmtParams
+        statements = [(batch, batchParams)]
+
+    # Connect to the SQL Server
+    conn = getConn()
+    if conn == None:
+        return None
+
+    try:
+        # Create a cursor object to interact with the database
+        cursor = conn.cursor()
+        rowSets = []
+        for stmt, stmtParams in statements:
+            if stmtParams:
+                cursor.execute(stmt, stmtParams)
+            else:
+                cursor.execute(stmt)
+            rowSets.append(cursor.fetchall())
+            
+            # Read the rest of the batch's result sets
+            if dbDialect() == 'mssql':
+                while cursor.nextset():
+                    rowSets.append(cursor.fetchall())
+        
+        # Return the connection to the pool
+        cursor.close()
+        releaseConn(conn)
+
+        return (rowSets)
+
+    except dbErrors as e:
+        print (f"Error executing the query: {e}")
+        releaseConn(conn, healthy=False)
+        return None
 
-    # If the connection fails after max retries, return
-    if retries == maxRetries:
-        print (f"Failed to connect to the database after {maxRetries} retries.")
-        return
 
+def setData (sql, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes a pooled connection to the Azure SQL database,
+                    sets data in the database based on a supplied SQL
+                    statement (either UPDATE, INSERT INTO or DELETE)
+                    and then hands the connection back to the pool.
+                    A list of statements is committed together as one
+                    transaction: SQL Server is sent them as a single
+                    batch, SQLite (which runs one statement at a time)
+                    runs them in turn on the same connection.
+    Args:           sql (string): a valid UPDATE, INSERT INTO or DELETE SQL 
+                    statement, or a list of them.
+                    params (list): values for any ? placeholders in
+                    the SQL statement (a list of lists, one for each
+                    statement, if sql is a list)
+    Returns:        rows: the records handed back by an OUTPUT (SQL
+                    Server) or RETURNING (SQLite) clause, or None if
+                    there are none or the statement failed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Pair each statement with its parameters
+    if isinstance(sql, list):
+        statements = list(zip(sql, params or [[]] * len(sql)))
+    else:
+        statements = [(sql, params or [])]
+    
+    if dbDialect() == 'mssql' and len(statements) > 1:
+        # One round trip, and XACT_ABORT stops the batch on any error
+        batch = "SET NOCOUNT ON; SET XACT_ABORT ON;"
+        batchParams = []
+        for stmt, stmtParams in statements:
+            batch += stmt.rstrip().rstrip(';') + ";"
+            batchParams += stmtParams
+        statements = [(batch, batchParams)]
+
+    # Connect to the SQL Server
+    conn = getConn()
+    if conn == None:
+        return None
+
+    healthy = True
+    rows = None
     try:
         # Create a cursor object to interact with the database
         cursor = conn.cursor()
-        cursor.execute(sql) 
+        for stmt, stmtParams in statements:
+            if stmtParams:
+                cursor.execute(stmt, stmtParams)
+            else:
+                cursor.execute(stmt) 
+            
+            # Keep any changed records the statement returned
+            if cursor.description != None:
+                rows = cursor.fetchall()
         
         # Committ the transaction
         conn.commit()
+        cursor.close()
     
-    except pyodbc.Error as e:
+    except dbErrors as e:
         print (f"Error executing SQL statement: {e}")
         
         # Rollback any changes if the transaction fails
         conn.rollback()  
         print ("Expense transaction rolled back due to error.")
+        healthy = False
+        rows = None
 
-    # Close the connection
-    cursor.close()
-    conn.close()
+    # Return the connection to the pool
+    releaseConn(conn, healthy)
      
-    return
+    return (rows)
 
 
-def pause():
+def hasAsyncDriver ():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Asks the user to 'Press any key to continue'. 
-                    This allows the user to review information on 
-                    the screen before continuing
+    Description:    Checks whether the async driver for the database in
+                    use is installed (aiosqlite for a local database,
+                    aioodbc for Azure SQL).
     Args:           Nil
-    Returns:        Nil
+    Returns:        True if it is installed, otherwise False
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    print("Press any key to continue...")
-    # Wait for a key press
-    msvcrt.getch()  
-    return
+    if dbDialect() == 'sqlite':
+        return (aiosqlite != None)
+    
+    return (aioodbc != None)
 
 
-def isValidFilename(filename):
+async def connectDBAsync ():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Tests if a filename is valid under Windows
-    Args:           filename: a string
-    Returns:        True: the filename is valid under Windows
-                    False: the filename is invalid under Windows
+    Description:    The async version of connectDB. Waiting for the
+                    serverless database to spin up (5 retries, 2
+                    seconds apart) does not hold up the event loop, so
+                    other tasks keep running in the meantime.
+    Args:           Nil
+    Returns:        conn: an open aiosqlite or aioodbc connection, or
+                    None if a connection could not be made
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    invalidCharacters = r'["/\\:*?<>|]'  # Windows invalid characters
-    reservedNames = {'CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'LPT1', 'LPT2', 'LPT3'}
-
-    # Check if filename contains invalid characters
-    if re.search(invalidCharacters, filename):
-        print(f"\nError: Filename contains invalid characters.")
-        return False
-
-    # Check for reserved filenames (for Windows)
-    baseName = os.path.basename(filename).upper()  # case insensitive comparison
-    fName, ext = os.path.splitext(baseName) # split into filename and extension
-    if fName in reservedNames:
-        print(f"\nError: Filename is a reserved name.")
-        return False
-    
-    # Check if filename is blank
-    if filename == '':
-        print(f"\nError: Filename cannot be blank.")
-        return False
+    if dbDialect() == 'sqlite':
+        if not localMigrated:
+            # The first connection brings the database up to date
+            conn = await asyncio.to_thread(connectLocalDB)
+            if conn == None:
+                return None
+            releaseConn(conn)
+        try:
+            conn = await aiosqlite.connect(localDB, timeout=30)
+            conn.row_factory = lambda cursor, row: list(row)
+            await conn.execute("PRAGMA foreign_keys = ON")
+            return (conn)
+        except sqlite3.Error as e:
+            print (f"Database connection error: {e}.")
+            return None
     
-    # Check if the filename has an extension and if the extension is exactly 3 characters long
-    _, ext = os.path.splitext(filename)  # Split into filename and extension
-    if not ext:  # If there's no extension
-        print(f"\nError: Filename must have an extension.")
-        return False
-
-    if len(ext) != 4:  # Extension should be 3 characters + the dot (i.e., '.txt', '.csv', etc.)
-        print(f"\nError: Extension must be exactly 3 characters long (e.g., .txt, .csv).")
-        return False
+    # Set connection retries before giving up
+    loadPyodbc()
+    maxRetries = 5
+    retries = 0
+    while retries < maxRetries:
+        try:
+            conn = await aioodbc.connect(dsn=connectionString)
+            return (conn)
+        except pyodbc.Error as e:
+            print ('Waiting on Azure Database Server to spin up...')
+            retries += 1
+            await asyncio.sleep(2)  # Wait for 2 seconds before retrying
     
-    # If no issues, the filename is considered valid
-    return True
+    print (f"Failed to connect to the database after {maxRetries} retries.")
+    return None
 
 
-def showCats():
+async def getAsyncConn ():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Connect to the database and return a list of the
-                    current categories. Display the list of current
-                    categories, if available.
+    Description:    The async version of getConn. Takes an open async
+                    connection made on the running event loop from the
+                    async pool, or makes a new one.
     Args:           Nil
-    Returns:        validCats: A list of valid Category ID's
+    Returns:        conn: an open async connection, or None if a
+                    connection could not be made
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    validCats = []
-    cats = getData('SELECT * FROM categories;')
-
-    if cats == []:
-        return (validCats)    
-    else:
-        # Display the current list of categories
-        print ('ID \tCategory')
-        for cat in cats:
-            catRow = (cat[0] + '\t' + cat[1])
-            validCats.append(cat[0]) # Create a list of valid category ID's
-            print (catRow)
-        return (validCats)
+    loop = asyncio.get_running_loop()
+    while asyncPool:
+        connLoop, conn, lastUsed = asyncPool.pop()
+        if connLoop is loop and time.monotonic() - lastUsed < maxPoolIdle:
+            return (conn)
+        
+        # Throw away a stale connection, or one from another event loop
+        try:
+            await conn.close()
+        except Exception:
+            pass
+    
+    return (await connectDBAsync())
 
 
-def fixDate(dateToFix):
+async def releaseAsyncConn (conn, healthy=True):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Recieve a date in format yyyy-mm-dd and return
-                    it in the format dd-mm-yyyy
-    Args:           dateToFix: A date to convert
-    Returns:        fixedDate: A date converted from yyyy-mm-dd to dd-mm-yyyy
+    Description:    The async version of releaseConn.
+    Args:           conn: a connection from getAsyncConn
+                    healthy (bool): False if the connection had an error
+    Returns:        Nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # convert the date string to a datetime object
-    getDate = datetime.strptime(str(dateToFix),'%Y-%m-%d')
+    if healthy and len(asyncPool) < connPool.maxsize:
+        asyncPool.append((asyncio.get_running_loop(), conn, time.monotonic()))
+        return
+    
+    try:
+        await conn.close()
+    except Exception:
+        pass
+    
+    return
+
+
+async def closeAsyncPool ():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Closes the async connections in the async pool. Call
+                    before the event loop finishes (see runAsync).
+    Args:           Nil
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    while asyncPool:
+        connLoop, conn, lastUsed = asyncPool.pop()
+        try:
+            await conn.close()
+        except Exception:
+            pass
+    
+    return
+
+
+def runAsync (coro):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs an async function (e.g. runReportsAsync) from
+                    the synchronous parts of the program on a new event
+                    loop, closing its async connections when it is done.
+    Args:           coro: the coroutine to run
+    Returns:        the coroutine's result
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    async def runAndClose():
+        try:
+            return (await coro)
+        finally:
+            await closeAsyncPool()
+    
+    return (asyncio.run(runAndClose()))
+
+
+async def getDataAsync (sql, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of getData, for use on an event
+                    loop. Many queries can be waiting on the database
+                    at once, e.g. with asyncio.gather. Uses the async
+                    driver if installed (see hasAsyncDriver), otherwise
+                    runs getData on a worker thread.
+    Args:           sql (string): a valid SELECT SQL statement
+                    params (list): values for any ? placeholders in
+                    the SQL statement
+    Returns:        rows: database records as a list of lists
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if not hasAsyncDriver():
+        return (await asyncio.to_thread(getData, sql, params))
+    
+    rowSets = await getDataSetsAsync([sql], [params or []])
+    if rowSets == None:
+        return None
+    
+    return (rowSets[0])
+
+
+async def getDataSetsAsync (sqlList, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of getDataSets. On SQL Server the
+                    statements are sent as one batch and each result
+                    set is read with nextset().
+    Args:           sqlList (list): valid SELECT SQL statements
+                    params (list): a list of values for any ? 
+                    placeholders for each statement
+    Returns:        rowSets: a list of rows for each statement, or None
+                    if the statements could not be run
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if not hasAsyncDriver():
+        return (await asyncio.to_thread(getDataSets, sqlList, params))
+    
+    # Pair each statement with its parameters
+    statements = list(zip(sqlList, params or [[]] * len(sqlList)))
+    if dbDialect() == 'mssql':
+        batch = "SET NOCOUNT ON;"
+        batchParams = []
+        for stmt, stmtParams in statements:
+            batch += stmt.rstrip().rstrip(';') + ";"
+            batchParams += stmtParams
+        statements = [(batch, batchParams)]
+    
+    conn = await getAsyncConn()
+    if conn == None:
+        return None
+
+    try:
+        cursor = await conn.cursor()
+        rowSets = []
+        for stmt, stmtParams in statements:
+            await cursor.execute(stmt, stmtParams)
+            rowSets.append([list(row) for row in await cursor.fetchall()])
+            
+            # Read the rest of the batch's result sets
+            if dbDialect() == 'mssql':
+                while await cursor.nextset():
+                    rowSets.append([list(row) for row in await cursor.fetchall()])
+        await cursor.close()
+        await releaseAsyncConn(conn)
+        
+        return (rowSets)
+    
+    except dbErrors as e:
+        print (f"Error executing the query: {e}")
+        await releaseAsyncConn(conn, healthy=False)
+        return None
+
+
+async def setDataAsync (sql, params=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of setData. A list of statements
+                    is committed together as one transaction.
+    Args:           sql (string): a valid UPDATE, INSERT INTO or DELETE SQL 
+                    statement, or a list of them.
+                    params (list): values for any ? placeholders in
+                    the SQL statement (a list of lists, one for each
+                    statement, if sql is a list)
+    Returns:        rows: the records handed back by an OUTPUT or 
+                    RETURNING clause, or None if there are none or the
+                    statement failed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if not hasAsyncDriver():
+        return (await asyncio.to_thread(setData, sql, params))
+    
+    # Pair each statement with its parameters
+    if isinstance(sql, list):
+        statements = list(zip(sql, params or [[]] * len(sql)))
+    else:
+        statements = [(sql, params or [])]
+    if dbDialect() == 'mssql' and len(statements) > 1:
+        batch = "SET NOCOUNT ON; SET XACT_ABORT ON;"
+        batchParams = []
+        for stmt, stmtParams in statements:
+            batch += stmt.rstrip().rstrip(';') + ";"
+            batchParams += stmtParams
+        statements = [(batch, batchParams)]
+    
+    conn = await getAsyncConn()
+    if conn == None:
+        return None
+
+    healthy = True
+    rows = None
+    try:
+        cursor = await conn.cursor()
+        for stmt, stmtParams in statements:
+            await cursor.execute(stmt, stmtParams)
+            if cursor.description != None:
+                rows = [list(row) for row in await cursor.fetchall()]
+        await conn.commit()
+        await cursor.close()
+    
+    except dbErrors as e:
+        print (f"Error executing SQL statement: {e}")
+        await conn.rollback()
+        print ("Expense transaction rolled back due to error.")
+        healthy = False
+        rows = None
+    
+    await releaseAsyncConn(conn, healthy)
+    
+    return (rows)
+
+
+def pause():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Asks the user to 'Press any key to continue'. 
+                    This allows the user to review information on 
+                    the screen before continuing
+    Args:           Nil
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    print("Press any key to continue...")
+    # Wait for a key press
+    terminal.getKey()
+    return
+
+
+def isValidFilename(filename):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Tests if a filename is valid under Windows
+    Args:           filename: a string
+    Returns:        True: the filename is valid under Windows
+                    False: the filename is invalid under Windows
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    invalidCharacters = r'["/\\:*?<>|]'  # Windows invalid characters
+    reservedNames = {'CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'LPT1', 'LPT2', 'LPT3'}
+
+    # Check if filename contains invalid characters
+    if re.search(invalidCharacters, filename):
+        print(f"\nError: Filename contains invalid characters.")
+        return False
+
+    # Check for reserved filenames (for Windows)
+    baseName = os.path.basename(filename).upper()  # case insensitive comparison
+    fName, ext = os.path.splitext(baseName) # split into filename and extension
+    if fName in reservedNames:
+        print(f"\nError: Filename is a reserved name.")
+        return False
+    
+    # Check if filename is blank
+    if filename == '':
+        print(f"\nError: Filename cannot be blank.")
+        return False
+    
+    # Check if the filename has an extension and if the extension is exactly 3 characters long
+    _, ext = os.path.splitext(filename)  # Split into filename and extension
+    if not ext:  # If there's no extension
+        print(f"\nError: Filename must have an extension.")
+        return False
+
+    # Extension should be 3 characters + the dot (i.e., '.txt', '.csv', etc.) or a raw data export format
+    if len(ext) != 4 and ext.lower() not in exportFormats:
+        print(f"\nError: Extension must be exactly 3 characters long (e.g., .txt, .csv), or one of .jsonl, .parquet, .arrow.")
+        return False
+    
+    # If no issues, the filename is considered valid
+    return True
+
+
+def showCats():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Connect to the database and return a list of the
+                    current categories. Display the list of current
+                    categories, if available.
+    Args:           Nil
+    Returns:        validCats: A list of valid Category ID's
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    validCats = []
+    cats = getData('SELECT * FROM categories;')
+
+    if cats == []:
+        return (validCats)    
+    else:
+        # Display the current list of categories
+        print ('ID \tCategory')
+        for cat in cats:
+            catRow = (cat[0] + '\t' + cat[1])
+            validCats.append(cat[0]) # Create a list of valid category ID's
+            print (catRow)
+        return (validCats)
+
+
+def fixDate(dateToFix):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Recieve a date in format yyyy-mm-dd and return
+                    it in the format dd-mm-yyyy
+    Args:           dateToFix: A date to convert
+    Returns:        fixedDate: A date converted from yyyy-mm-dd to dd-mm-yyyy
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # convert the date string to a datetime object
+    getDate = datetime.strptime(str(dateToFix),'%Y-%m-%d')
     
     # amend the new datetime object to the correct format
     fixedDate = datetime.strftime(getDate, '%d-%m-%Y')
@@ -460,10 +1218,10 @@ def buildTrans(trans):
             # build a list of current valid transaction ID's to return
             validTranIDs.append(tran[0])
         
-        # Output a report of transactions using the tabulate module
-        headers = ['TranID', 'Date', 'Time', 'Category', 'Description', 'Amount']    
-        report = (tabulate(trans, headers, tablefmt="simple", colalign=("right", "right", "right", "center", "left", "right")))
-        print (report)
+        # Output a report of transactions a line at a time
+        widths = tables.fitWidths(trans, tables.tranColumns, 'simple')
+        for line in tables.tableLines(trans, tables.tranColumns, 'simple', widths):
+            print (line)
     else:
         return (validTranIDs)
         
@@ -523,6 +1281,25 @@ def loginUser ():
         return # To Main
 
 
+def checkLogin (uID, pwd):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks a userID and password against the users 
+                    table without asking for them (for the API server,
+                    see server.py).
+    Args:           uID (string): the userID
+                    pwd (string): the password
+    Returns:        fName (string): the user's first name, or None if
+                    the userID or password is not valid
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rows = getData ("SELECT userPwd, fName FROM users WHERE userID=?", [str(uID)])
+    if not rows or pwd != str(rows[0][0]).strip():
+        return None
+    
+    return (str(rows[0][1]).strip())
+
+
 def createUser ():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -600,10 +1377,11 @@ def addTrans ():
                     and asks User to enter (validated) details about 
                     the new transaction (Date, Time, Category, 
                     Description and Amount). Creates a new unique
-                    Transction ID and uploads the information to the
-                    transactions table. Takes the current global UserID
-                    and updates the userTransactions table with
-                    userID and tranID to maintain m2m relationship.
+                    Transction ID and uploads the information, with the
+                    current global UserID as its owner, to the
+                    transactions table. Also updates the userTransactions
+                    table with userID and tranID to maintain m2m 
+                    relationship.
     Args:           Nil
     Returns:        Nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -688,30 +1466,34 @@ def addTrans ():
         else:
             print('That is not a valid amount. Please try again.')
     
-    # Create a new unique TranID by adding 1 to the current maximum TranID
-    tranID = []
-    trans = getData ("SELECT MAX(tranID) FROM transactions")
-    
-    if trans[0][0] != None:
-        for tran in trans:
-            tranID = tran[0]
-        tranID = int(tranID) + 1
-    else:
-        # if this is the first transaction use tranID 1000
-        tranID = 1000
-    
-    # Build a SQL statement to INSERT the collected tranaction details
-    # into the tranactions table in the database.
-    sql = ("SET DATEFORMAT dmy;"\
-           "INSERT INTO transactions (tranID, tranDate, tranTime, catID, tranDescription, tranAmount) "\
-           "VALUES ('" + str(tranID) + "','" + str(tranDate) + "', '" + str(tranTime) + "', '" + str(catID) + "', '" + tranDesc + "', '" + str(tranAmt) + "')")
-    setData (sql)
+    # Check the user has not already entered this transaction
+    dupID = findDuplicate(userID, dupHash(convertDate(tranDate), tranTime, tranAmt, tranDesc))
+    if dupID != None:
+        print ()
+        print ('Expense transaction ' + dupID + ' has the same date, time, amount and description.')
+        validAns = False
+        while not validAns:
+            addDup = input('Do you still want to add this expense transaction (y/n)?: ')
+            if addDup.lower() == 'y':
+                validAns = True
+            elif addDup.lower() == 'n':
+                print ()
+                print ('The expense transaction has NOT been added.')
+                pause ()
+                return # To transMenu
+            else:
+                print ('That is not a valid answer. Please Try Again.')
 
-    # Build a SQL statement to INSERT the current UserID and new TranID
-    # into the userTransactions table in the database.
-    sql = ("INSERT INTO userTransactions (userID, tranID) "\
-           "VALUES ('" + str(userID) + "', '" + str(tranID) + "')")
-    setData(sql)
+    # Check the amount against the Category's usual amounts before it
+    # is added to them
+    unusualNote = unusualAmount(userID, catID, float(tranAmt))
+
+    # INSERT the collected transaction details for the current user
+    if insertTran(userID, tranDate, tranTime, catID, tranDesc, tranAmt) == None:
+        print ()
+        print ('The expense transaction could not be added.')
+        pause ()
+        return # To transMenu
 
     print ()
     print ('Expense transaction added successfully.')
@@ -719,112 +1501,728 @@ def addTrans ():
 
     # Do a budget check after the new transaction has been added
     checkBud()
+    print (unusualNote + forecastSummary(userID), end='')
     pause ()
     
     return # To transMenu
 
 
-def getTranByCat():
+def insertTran(uID, tranDate, tranTime, catID, tranDesc, tranAmt):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Search the database for all the transactions for the
-                    requested category for the current user and return a 
-                    list of valid TranID's
-    Args:           Nil
-    Returns:        validTranIDs: a list of tranID's found
+    Description:    INSERTs a new transaction and its user/trans link 
+                    for a user in a single transaction. The new TranID
+                    (1 more than the current maximum, starting at 1000)
+                    is worked out by the INSERT itself, so users adding
+                    transactions at the same time cannot be given the
+                    same TranID.
+    Args:           uID (string): the userID that owns the transaction
+                    tranDate (string): the date (dd-mm-yyyy)
+                    tranTime (string): the time (hh:mm)
+                    catID (string): a valid Category ID
+                    tranDesc (string): the description
+                    tranAmt (string): the amount (0.00)
+    Returns:        tranID (string): the new TranID, or None if the
+                    transaction could not be added
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # import the current UserID 
-    global userID
-
-    clrScreen()
-    print ()
-    print ("========================================================================")
-    print ("\t   SEARCH FOR AN EXPENSE TRANSACTION BY CATEGORY")
-    print ("========================================================================")
-    print ()
-    print ('Here are the available categories:')
-    print ()
+    values = [str(uID), convertDate(tranDate), str(tranTime), str(catID), tranDesc, str(tranAmt),
+              dupHash(convertDate(tranDate), tranTime, tranAmt, tranDesc)]
     
-    # Search the database for current list of valid categories
-    # Print out a table of valid categories for the user to select
-    validCats = showCats()
-    print ()
-
-    if validCats != []:
-        # Ask the user which category they wish to search for tranactions 
-        validCategory = False
-        while not validCategory:    
-            catID = input('Please enter a Category ID to find Expense Transactions for: ')
-            if catID in validCats:
-                break
-            else:
-                print ('That is not a currently available Category ID. Please try again.')
+    if dbDialect() == 'mssql':
+        # Lock the table's key range until the batch commits so that a
+        # concurrent INSERT waits for this TranID instead of reusing it
+        newID = ("SELECT CAST(COALESCE(MAX(CAST(tranID AS INT)), 999) + 1 AS VARCHAR(10)), ?, ?, ?, ?, ?, ?, ? "\
+                 "FROM transactions WITH (UPDLOCK, HOLDLOCK)")
+        sql = ["DECLARE @newTran TABLE (tranID VARCHAR(10))",
+               "INSERT INTO transactions (tranID, userID, tranDate, tranTime, catID, tranDescription, tranAmount, dupHash) "\
+               "OUTPUT inserted.tranID INTO @newTran " + newID,
+               "INSERT INTO userTransactions (userID, tranID) SELECT ?, tranID FROM @newTran",
+               "SELECT tranID FROM @newTran"]
+        params = [[], values, [str(uID)], []]
     else:
-        return
+        # SQLite only has one writer at a time, so the TranID just 
+        # added is still the maximum for the link INSERT
+        newID = ("SELECT CAST(COALESCE(MAX(CAST(tranID AS INTEGER)), 999) + 1 AS TEXT), ?, ?, ?, ?, ?, ?, ? "\
+                 "FROM transactions")
+        sql = ["INSERT INTO transactions (tranID, userID, tranDate, tranTime, catID, tranDescription, tranAmount, dupHash) "\
+               + newID + " RETURNING tranID",
+               "INSERT INTO userTransactions (userID, tranID) "\
+               "SELECT ?, CAST(MAX(CAST(tranID AS INTEGER)) AS TEXT) FROM transactions"]
+        params = [values, [str(uID)]]
     
-    print ()
+    rows = setData(sql, params)
+    if not rows:
+        return None
     
-    # Build a SQL SELECT statement to return transactions for the selected category
-    # that relate to the current User
-    sql = ("SELECT transactions.tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND categories.catID=" + str(catID) + " "\
-            "ORDER BY tranDate;")
-    trans = getData(sql)
-
-    # Build a list of transactions with correctly formatted dates and amounts and display the list 
-    validTranIDs = buildTrans(trans)
+    bumpDataVersion(uID, float(tranAmt), [(catID, convertDate(tranDate), float(tranAmt))])
     
-    # return a list of valid Transaction ID's 
-    return (validTranIDs)
+    return (str(rows[0][0]))
 
 
-def getTranByDate(tranDate):
+def dupHash(tranDate, tranTime, tranAmt, tranDesc):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Recieve a valid date, search the database for
-                    transactions from that date for the current user, 
-                    display the list of transactions and return a 
-                    list of valid Transaction ID's 
-    Args:           tranDate (dd-mm-yyyy)
-    Returns:        validTranIDs: a list of tran ID's
+    Description:    Works out the duplicate check hash of a transaction
+                    (see findDuplicate): a 16 character hash of its
+                    date, time, amount and description. The description
+                    is made lower case with runs of spaces made single,
+                    so 'Coffee ' and 'coffee' count as the same.
+    Args:           tranDate: the date (yyyy-mm-dd or a date)
+                    tranTime (string): the time (hh:mm)
+                    tranAmt: the amount
+                    tranDesc (string): the description
+    Returns:        hashValue (string): the hash
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # import the current UserID 
-    global userID
-
-    clrScreen()
-    print ()
-    print ("========================================================================")
-    print ("\t    SEARCH FOR AN EXPENSE TRANSACTION BY DATE")
-    print ("========================================================================")
-    print ()
+    content = "|".join([str(tranDate)[:10], str(tranTime).strip(), "{:.2f}".format(float(tranAmt)),
+                        " ".join(str(tranDesc).lower().split())])
+    
+    return (hashlib.blake2b(content.encode(), digest_size=8).hexdigest())
 
-    # Build a SQL SELECT statement to return transactions for the selected date
-    # that relate to the current User
-    sql = ("SELECT transactions.tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND tranDate = '" + convertDate(str(tranDate)) + "' "\
-            "ORDER BY tranDate;")
-    trans = getData(sql)
 
-    # If there are transactions returned then
-    # Build a list of transactions with correctly formatted dates and amounts and display the list 
-    if trans != []:
-        validTranIDs = buildTrans(trans)
+def findDuplicate(uID, hashValue):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Looks for a transaction of a user's with the same
+                    date, time, amount and description as a new one,
+                    with a single seek on the (userID, dupHash) index.
+    Args:           uID (string): the userID
+                    hashValue (string): the new transaction's hash (see
+                    dupHash)
+    Returns:        tranID (string): the TranID of the first matching
+                    transaction, or None if there is none
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'mssql':
+        sql = "SELECT TOP 1 tranID FROM transactions WHERE userID=? AND dupHash=?"
     else:
-        print ('You have no expense transactions with that date.')
-        pause ()
-        validTranIDs = []
+        sql = "SELECT tranID FROM transactions WHERE userID=? AND dupHash=? LIMIT 1"
+    rows = getData(sql, [str(uID), hashValue])
+    if not rows:
+        return None
+    
+    return (str(rows[0][0]))
+
+
+def recurDate(period, firstDate, count):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the date of one occurrence of a recurring
+                    transaction. Monthly and yearly occurrences keep to
+                    the day of the month of the first one, or the last
+                    day of a shorter month (e.g. 31-01, 28-02, 31-03).
+    Args:           period (string): 'week', 'month' or 'year'
+                    firstDate (date): the date of the first occurrence
+                    count (int): the number of periods after the first
+    Returns:        recDate (date): the date of the occurrence
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if period == 'week':
+        return (firstDate + timedelta(weeks=count))
+    
+    months = count if period == 'month' else 12 * count
+    year, month = divmod(firstDate.month - 1 + months, 12)
+    year += firstDate.year
+    lastDay = calendar.monthrange(year, month + 1)[1]
+    
+    return (date(year, month + 1, min(firstDate.day, lastDay)))
+
+
+def getRecurRules(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gets a user's recurring transactions.
+    Args:           uID (string): the userID
+    Returns:        rules (list): recID, catID, catName,
+                    recDescription, recAmount, recPeriod, recTime,
+                    startDate, nextDate and endDate for each recurring
+                    transaction
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT recID, recurring.catID, categories.catName, recDescription, recAmount, "\
+           "recPeriod, recTime, startDate, nextDate, endDate "\
+           "FROM recurring "\
+           "INNER JOIN categories on recurring.catID = categories.catID "\
+           "WHERE userID=? "\
+           "ORDER BY recID")
+    
+    return (getData(sql, [str(uID)]) or [])
+
+
+def dueRecurring(rules, today):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Works out every occurrence of a user's recurring
+                    transactions that has fallen due and not yet been
+                    added, however far behind they are.
+    Args:           rules (list): the recurring transactions (see
+                    getRecurRules)
+                    today (date): the last date that is due
+    Returns:        due (list): recID, date (yyyy-mm-dd), recKey and
+                    dupHash for each occurrence due
+                    nextDates (dict): recID -> the new nextDate of each
+                    recurring transaction with occurrences due
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    due = []
+    nextDates = {}
+    for rule in rules:
+        recID, period = rule[0], rule[5]
+        firstDate, nextDate = date.fromisoformat(str(rule[7])[:10]), date.fromisoformat(str(rule[8])[:10])
+        lastDate = today if rule[9] == None else min(today, date.fromisoformat(str(rule[9])[:10]))
+        if nextDate > lastDate:
+            continue
+        
+        # Step through the occurrences from the first one not added yet
+        count = 0
+        recDate = firstDate
+        while recDate < nextDate:
+            count += 1
+            recDate = recurDate(period, firstDate, count)
+        while recDate <= lastDate:
+            due.append([recID, recDate.isoformat(), str(recID) + ':' + recDate.isoformat(),
+                        dupHash(recDate, rule[6], rule[4], rule[3])])
+            count += 1
+            recDate = recurDate(period, firstDate, count)
+        nextDates[recID] = recDate.isoformat()
+    
+    return (due, nextDates)
+
+
+def addRecurringDue(uID, today=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds every occurrence of a user's recurring
+                    transactions that has fallen due, however many
+                    there are, with one INSERT ... SELECT in a single
+                    transaction. The occurrences are sent as one JSON
+                    parameter (OPENJSON in SQL Server, json_each in
+                    SQLite) and joined to their recurring transaction,
+                    and the new TranIDs are numbered on from the
+                    current maximum as in insertTran. An occurrence
+                    whose recKey is already in the transactions table is
+                    skipped (and the unique recKey index stops two at
+                    once adding it), so running this again never adds
+                    a duplicate. So is one the user has already entered
+                    by hand (the same dupHash, see findDuplicate).
+    Args:           uID (string): the userID
+                    today (date): the last date that is due, if not
+                    today
+    Returns:        added (int): the number of transactions added, or
+                    None if they could not be added
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    due, nextDates = dueRecurring(getRecurRules(uID), today or date.today())
+    if due == []:
+        return (0)
+    
+    dueJSON = json.dumps(due)
+    columns = "tranID, userID, tranDate, tranTime, catID, tranDescription, tranAmount, recKey, dupHash"
+    values = ("recurring.userID, due.tranDate, recTime, recurring.catID, recDescription, recAmount, "\
+              "due.recKey, due.dupHash "\
+              "FROM recurring "\
+              "INNER JOIN due ON recurring.recID = due.recID AND recurring.userID = ? "\
+              "WHERE NOT EXISTS (SELECT 1 FROM transactions WHERE transactions.recKey = due.recKey) "\
+              "AND NOT EXISTS (SELECT 1 FROM transactions "\
+              "WHERE transactions.userID = recurring.userID AND transactions.dupHash = due.dupHash)")
+    if dbDialect() == 'mssql':
+        # Lock the table's key range until the batch commits, as in insertTran
+        sql = ["DECLARE @newTrans TABLE (tranID VARCHAR(10), userID VARCHAR(10), catID VARCHAR(4), "\
+               "tranDate DATE, tranAmount DECIMAL(10, 2))",
+               "WITH due AS (SELECT recID, tranDate, recKey, dupHash FROM OPENJSON(?) "\
+               "WITH (recID INT '$[0]', tranDate DATE '$[1]', recKey VARCHAR(30) '$[2]', dupHash CHAR(16) '$[3]')), "\
+               "lastTran AS (SELECT COALESCE(MAX(CAST(tranID AS INT)), 999) AS maxID "\
+               "FROM transactions WITH (UPDLOCK, HOLDLOCK)) "\
+               "INSERT INTO transactions (" + columns + ") "\
+               "OUTPUT inserted.tranID, inserted.userID, inserted.catID, inserted.tranDate, inserted.tranAmount "\
+               "INTO @newTrans "\
+               "SELECT CAST((SELECT maxID FROM lastTran) + ROW_NUMBER() OVER (ORDER BY due.tranDate, due.recID) "\
+               "AS VARCHAR(10)), " + values,
+               "INSERT INTO userTransactions (userID, tranID) SELECT userID, tranID FROM @newTrans"]
+        params = [[], [dueJSON, uID], []]
+    else:
+        sql = ["WITH due AS (SELECT json_extract(value, '$[0]') AS recID, json_extract(value, '$[1]') AS tranDate, "\
+               "json_extract(value, '$[2]') AS recKey, json_extract(value, '$[3]') AS dupHash FROM json_each(?)) "\
+               "INSERT INTO transactions (" + columns + ") "\
+               "SELECT CAST((SELECT COALESCE(MAX(CAST(tranID AS INTEGER)), 999) FROM transactions) "\
+               "+ ROW_NUMBER() OVER (ORDER BY due.tranDate, due.recID) AS TEXT), " + values + " "\
+               "RETURNING tranID, userID, catID, tranDate, tranAmount",
+               "INSERT INTO userTransactions (userID, tranID) "\
+               "SELECT transactions.userID, transactions.tranID "\
+               "FROM json_each(?) INNER JOIN transactions ON transactions.recKey = json_extract(value, '$[2]') "\
+               "WHERE NOT EXISTS (SELECT 1 FROM userTransactions "\
+               "WHERE userTransactions.userID = transactions.userID AND userTransactions.tranID = transactions.tranID)"]
+        params = [[dueJSON, uID], [dueJSON]]
+    
+    # Move each recurring transaction on to its next occurrence
+    for recID, nextDate in nextDates.items():
+        sql.append("UPDATE recurring SET nextDate=? WHERE recID=?")
+        params.append([nextDate, recID])
+    if dbDialect() == 'mssql':
+        sql.append("SELECT tranID, userID, catID, tranDate, tranAmount FROM @newTrans")
+        params.append([])
+    
+    rows = setData(sql, params)
+    if rows == None:
+        return None
+    
+    if rows != []:
+        bumpDataVersion(uID, sum(float(row[4]) for row in rows), [(row[2], row[3], float(row[4])) for row in rows])
+    
+    return (len(rows))
+
+
+def scanDuplicates(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the groups of a user's transactions that have
+                    the same date, time, amount and description, in one
+                    pass over their transactions: each is grouped by
+                    its hash (see dupHash) as it is read, rather than
+                    being compared with every other transaction.
+                    Transactions with no hash yet (entered before
+                    hashes were kept, or copied from elsewhere) or an
+                    out of date one have it saved, all in one UPDATE,
+                    so they are found by findDuplicate from then on.
+    Args:           uID (string): the userID
+    Returns:        groups (list): a list of the TranIDs in each group
+                    of duplicates, in TranID order, or None if the
+                    transactions could not all be read
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT tranID, tranDate, tranTime, tranAmount, tranDescription, dupHash "\
+           "FROM transactions "\
+           "WHERE userID=?")
+    byHash = {}
+    newHashes = []
+    try:
+        for rows in streamData(sql, params=[str(uID)]):
+            for tranID, tranDate, tranTime, tranAmt, tranDesc, oldHash in rows:
+                hashValue = dupHash(tranDate, tranTime, tranAmt, tranDesc)
+                byHash.setdefault(hashValue, []).append(str(tranID))
+                if oldHash != hashValue:
+                    newHashes.append([str(tranID), hashValue])
+    except RuntimeError as e:
+        print (str(e) + '.')
+        return None
+    
+    # Save the missing hashes, sent as one JSON parameter
+    if newHashes != []:
+        if dbDialect() == 'mssql':
+            sql = ("UPDATE transactions SET dupHash = newHash.dupHash "\
+                   "FROM transactions "\
+                   "INNER JOIN OPENJSON(?) WITH (tranID VARCHAR(10) '$[0]', dupHash CHAR(16) '$[1]') newHash "\
+                   "ON transactions.tranID = newHash.tranID "\
+                   "WHERE transactions.userID=?")
+        else:
+            sql = ("UPDATE transactions SET dupHash = newHash.dupHash "\
+                   "FROM (SELECT json_extract(value, '$[0]') AS tranID, json_extract(value, '$[1]') AS dupHash "\
+                   "FROM json_each(?)) AS newHash "\
+                   "WHERE transactions.tranID = newHash.tranID AND transactions.userID=?")
+        setData(sql, [json.dumps(newHashes), str(uID)])
+    
+    groups = [sorted(tranIDs, key=int) for tranIDs in byHash.values() if len(tranIDs) > 1]
+    
+    return (sorted(groups, key=lambda tranIDs: int(tranIDs[0])))
+
+
+def buildSearch(uID, criteria):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Compiles any mix of transaction search values into
+                    a single parameterized SQL SELECT statement for one
+                    user, along with a plain English plan of how the
+                    database can answer it. Dates, times and amounts
+                    are compared as ranges on the bare columns so the
+                    database can use its indexes. Blank values match
+                    everything.
+    Args:           uID (string): the userID to search
+                    criteria (dict): any of
+                        'cats': a list of Category IDs
+                        'firstDate', 'secDate': a date range (dd-mm-yyyy)
+                        'firstTime', 'secTime': a time range (hh:mm)
+                        'minAmt', 'maxAmt': an amount range
+                        'descText': text the description contains
+    Returns:        sql (string): the SELECT statement
+                    params (list): the values for its ? placeholders
+                    plan (list): the steps of the search plan
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT transactions.tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
+           "FROM transactions "\
+           "INNER JOIN categories on transactions.catID = categories.catID "\
+           "WHERE transactions.userID = ? ")
+    params = [str(uID)]
+    plan = ['Seek transactions on userID = ' + str(uID) + ' (index on userID, tranDate)']
+
+    # Add a condition for each search value given, as a range where possible
+    def addRange(column, first, second, access):
+        nonlocal sql
+        if first != None and second != None:
+            sql += "AND " + column + " BETWEEN ? AND ? "
+            params.extend([first, second])
+            plan.append('Range ' + column + ' between ' + str(first) + ' and ' + str(second) + ' (' + access + ')')
+        elif first != None:
+            sql += "AND " + column + " >= ? "
+            params.append(first)
+            plan.append('Range ' + column + ' from ' + str(first) + ' (' + access + ')')
+        elif second != None:
+            sql += "AND " + column + " <= ? "
+            params.append(second)
+            plan.append('Range ' + column + ' up to ' + str(second) + ' (' + access + ')')
+
+    cats = criteria.get('cats')
+    if cats:
+        sql += "AND transactions.catID IN (" + ",".join("?" * len(cats)) + ") "
+        params.extend(str(catID) for catID in cats)
+        plan.append('Filter catID in ' + ", ".join(str(catID) for catID in cats) + ' (checked on each row)')
+
+    # Dates are passed as date values so the server's DATEFORMAT does not matter
+    firstDate = criteria.get('firstDate')
+    secDate = criteria.get('secDate')
+    addRange('tranDate',
+             datetime.strptime(firstDate, '%d-%m-%Y').date() if firstDate else None,
+             datetime.strptime(secDate, '%d-%m-%Y').date() if secDate else None,
+             'same index range as userID')
+    addRange('tranTime', criteria.get('firstTime') or None, criteria.get('secTime') or None, 'checked on each row')
+    minAmt = criteria.get('minAmt')
+    maxAmt = criteria.get('maxAmt')
+    addRange('tranAmount',
+             float(minAmt) if minAmt not in (None, '') else None,
+             float(maxAmt) if maxAmt not in (None, '') else None,
+             'checked on each row')
+
+    descText = criteria.get('descText')
+    if descText:
+        # Escape the LIKE wildcards so the text is matched literally
+        pattern = descText.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        sql += "AND tranDescription LIKE ? ESCAPE '\\' "
+        params.append('%' + pattern + '%')
+        plan.append("Filter tranDescription containing '" + descText + "' (checked on each row, no index can help)")
+
+    sql += "ORDER BY tranDate, tranTime;"
+    plan.append('Join categories on catID (primary key lookup)')
+    plan.append('Sort by tranDate, tranTime')
+    
+    return (sql, params, plan)
+
+
+def searchTrans(uID, criteria):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Searches a user's transactions for any mix of 
+                    search values with one database query (see
+                    buildSearch).
+    Args:           uID (string): the userID to search
+                    criteria (dict): the search values (see buildSearch)
+    Returns:        trans: the matching transactions as a list of
+                    (tranID, Date, Time, Category, Description, Amount)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql, params, plan = buildSearch(uID, criteria)
+    trans = getData(sql, params)
+    
+    return (trans)
+
+
+async def searchTransAsync(uID, criteria):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of searchTrans.
+    Args:           uID (string): the userID to search
+                    criteria (dict): the search values (see buildSearch)
+    Returns:        trans: the matching transactions as a list of
+                    (tranID, Date, Time, Category, Description, Amount)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql, params, plan = buildSearch(uID, criteria)
+    trans = await getDataAsync(sql, params)
+    
+    return (trans)
+
+
+def wordGrams(word, prefix=False):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Breaks a word into its trigrams (3 letter pieces).
+                    The word is padded with two spaces in front so the
+                    start of a word has its own trigrams, and one space
+                    after unless only its prefix is wanted.
+                    e.g. 'rent' -> '  r', ' re', 'ren', 'ent', 'nt '
+    Args:           word (string): a lower case word
+                    prefix (bool): True to leave out the end of word pad
+    Returns:        grams (set): the word's trigrams
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    padded = '  ' + word + ('' if prefix else ' ')
+    grams = set(padded[i:i + 3] for i in range(len(padded) - 2))
+    
+    return (grams)
+
+
+def getDescIndex(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Returns the trigram index of a user's transaction
+                    descriptions, building it with a single query the
+                    first time it is needed and again whenever the 
+                    user's data version changes (see bumpDataVersion).
+                    Each distinct word maps to the set of tranIDs whose
+                    description uses it, and each trigram maps to the
+                    set of words containing it. Descriptions repeat a
+                    lot, so searching the words rather than every 
+                    transaction keeps searches fast on large histories.
+                    Each transaction's row is kept so matches can be 
+                    shown without going back to the database.
+    Args:           uID (string): the userID whose transactions to index
+    Returns:        index (dict): 'words', 'grams', 'rows' and 'version',
+                    or None if the database could not be read
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    with cacheLock:
+        version = (dataVersions.get(uID, 0), globalVersion)
+    
+    index = descIndexes.get(uID)
+    if index != None and index['version'] == version:
+        return (index)
+
+    # Read all the user's transactions with a single query
+    trans = searchTrans(uID, {})
+    if trans == None:
+        return None
+
+    words = {}
+    rows = {}
+    for tran in trans:
+        tranID = tran[0]
+        rows[tranID] = tuple(tran)
+        for word in set(re.findall(r'[a-z0-9]+', str(tran[4]).lower())):
+            postings = words.get(word)
+            if postings == None:
+                words[word] = postings = set()
+            postings.add(tranID)
+
+    # Index the trigrams of each distinct word
+    grams = {}
+    for word in words:
+        for gram in wordGrams(word):
+            grams.setdefault(gram, set()).add(word)
+
+    index = {'words': words, 'grams': grams, 'rows': rows, 'version': version}
+    descIndexes[uID] = index
+    
+    return (index)
+
+
+def searchDesc(uID, text, fuzzy=True, limit=200):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Searches a user's transaction descriptions using
+                    the trigram index (see getDescIndex). Transactions
+                    with a word starting with every word searched for
+                    (e.g. 'groc' finds 'Groceries') are listed first.
+                    With fuzzy matching on, descriptions with words
+                    that share most of their trigrams with the search
+                    words are then added, so small spelling mistakes
+                    still match (e.g. 'grocerys' finds 'Groceries').
+                    When there are more matches than the limit, the
+                    most recent ones are returned.
+    Args:           uID (string): the userID to search
+                    text (string): the words to search for
+                    fuzzy (bool): True to include close matches
+                    limit (int): the most transactions to return
+    Returns:        trans: the matching transactions in date order as
+                    a list of (tranID, Date, Time, Category, 
+                    Description, Amount), or None if the database 
+                    could not be read
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    index = getDescIndex(uID)
+    if index == None:
+        return None
+    
+    queryWords = re.findall(r'[a-z0-9]+', text.lower())
+    if queryWords == []:
+        return ([])
+    words = index['words']
+    grams = index['grams']
+    rows = index['rows']
+
+    # Find the transactions matching every search word, first by
+    # prefix and then (optionally) also by close spelling
+    matches = None
+    closeMatches = None
+    for queryWord in queryWords:
+        # Words starting with the search word share all its prefix trigrams
+        candidates = None
+        for gram in wordGrams(queryWord, prefix=True):
+            candidates = set(grams.get(gram, ())) if candidates == None else candidates & grams.get(gram, set())
+        prefixWords = [word for word in candidates if word.startswith(queryWord)]
+        found = set()
+        for word in prefixWords:
+            found |= words[word]
+        matches = found if matches == None else matches & found
+
+        if fuzzy:
+            # Words whose trigrams mostly match (Jaccard similarity) are close spellings
+            queryGrams = wordGrams(queryWord)
+            common = collections.Counter()
+            for gram in queryGrams:
+                common.update(grams.get(gram, ()))
+            for word, count in common.items():
+                if count / (len(queryGrams) + len(wordGrams(word)) - count) >= 0.4:
+                    found = found | words[word]
+            closeMatches = found if closeMatches == None else closeMatches & found
+
+    # Keep the most recent transactions, prefix matches first
+    byDate = lambda tranID: (str(rows[tranID][1]), str(rows[tranID][2]), tranID)
+    found = heapq.nlargest(limit, matches, key=byDate)
+    if fuzzy and len(found) < limit:
+        found += heapq.nlargest(limit - len(found), closeMatches - matches, key=byDate)
+    found.sort(key=byDate)
+
+    trans = [list(rows[tranID]) for tranID in found]
+    
+    return (trans)
+
+
+async def searchDescAsync(uID, text, fuzzy=True, limit=200):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of searchDesc. Most of its time
+                    goes on building and searching the description 
+                    index, so it runs on a worker thread to keep the 
+                    event loop free.
+    Args:           uID (string): the userID to search
+                    text (string): the words to search for
+                    fuzzy (bool): allow misspelt matches
+                    limit (int): the most matches to return
+    Returns:        trans (list): the matching transactions (see
+                    searchDesc)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    return (await asyncio.to_thread(searchDesc, uID, text, fuzzy, limit))
+
+
+def askOptional(prompt, isValid):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Asks the user for an optional value, repeating 
+                    the question until the answer is blank or valid.
+    Args:           prompt (string): the question to ask
+                    isValid (function): returns True for a valid answer
+    Returns:        answer (string): the valid answer, or '' if blank
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    while True:
+        answer = input(prompt).strip()
+        if answer == '' or isValid(answer):
+            return (answer)
+        print ('That is not a valid value. Please try again, or leave it blank.')
+
+
+def isValidAmt(amount):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Tests if a string is a valid non-negative amount
+                    (e.g. 50 or 50.00)
+    Args:           amount (string): the amount to test
+    Returns:        True: It is a valid amount
+                    False: It is not a valid amount
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    pattern = r'^\d+(\.\d{1,2})?$'
+    return bool(re.match(pattern, amount))
+
+
+def getTranByCat():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Search the database for all the transactions for the
+                    requested category for the current user and return a 
+                    list of valid TranID's
+    Args:           Nil
+    Returns:        validTranIDs: a list of tranID's found
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # import the current UserID 
+    global userID
+
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ("\t   SEARCH FOR AN EXPENSE TRANSACTION BY CATEGORY")
+    print ("========================================================================")
+    print ()
+    print ('Here are the available categories:')
+    print ()
+    
+    # Search the database for current list of valid categories
+    # Print out a table of valid categories for the user to select
+    validCats = showCats()
+    print ()
+
+    if validCats != []:
+        # Ask the user which category they wish to search for tranactions 
+        validCategory = False
+        while not validCategory:    
+            catID = input('Please enter a Category ID to find Expense Transactions for: ')
+            if catID in validCats:
+                break
+            else:
+                print ('That is not a currently available Category ID. Please try again.')
+    else:
+        return
+    
+    print ()
+    
+    # Search for transactions for the selected category
+    # that relate to the current User
+    trans = searchTrans(userID, {'cats': [catID]})
+
+    # Build a list of transactions with correctly formatted dates and amounts and display the list 
+    validTranIDs = buildTrans(trans)
+    
+    # return a list of valid Transaction ID's 
+    return (validTranIDs)
+
+
+def getTranByDate(tranDate):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Recieve a valid date, search the database for
+                    transactions from that date for the current user, 
+                    display the list of transactions and return a 
+                    list of valid Transaction ID's 
+    Args:           tranDate (dd-mm-yyyy)
+    Returns:        validTranIDs: a list of tran ID's
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # import the current UserID 
+    global userID
+
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ("\t    SEARCH FOR AN EXPENSE TRANSACTION BY DATE")
+    print ("========================================================================")
+    print ()
+
+    # Search for transactions for the selected date
+    # that relate to the current User
+    trans = searchTrans(userID, {'firstDate': tranDate, 'secDate': tranDate})
+
+    # If there are transactions returned then
+    # Build a list of transactions with correctly formatted dates and amounts and display the list 
+    if trans != []:
+        validTranIDs = buildTrans(trans)
+    else:
+        print ('You have no expense transactions with that date.')
+        pause ()
+        validTranIDs = []
 
     # return a list of valid Transaction ID's 
     return (validTranIDs)
@@ -851,17 +2249,9 @@ def getTranByTime(tranTime):
     print ("========================================================================")
     print ()
 
-    # Build a SQL SELECT statement to return transactions for the selected time
+    # Search for transactions for the selected time
     # that relate to the current User
-    sql = ("SELECT transactions.tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND tranTime = '" + tranTime + "' "\
-            "ORDER BY tranDate;")
-    trans = getData(sql)
+    trans = searchTrans(userID, {'firstTime': tranTime, 'secTime': tranTime})
 
     # If there are transactions returned then
     # Build a list of transactions with correctly formatted dates and amounts and display the list 
@@ -878,14 +2268,21 @@ def updateByTranID(tranID):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     Description:    Update the elements of a transaction with a given
-                    tranID. Display the existing transaction and ask
-                    the user which element they want to update. Issue
-                    a SQL UPDATE statement to make the changes in 
-                    the database.
+                    tranID. Display the existing transaction and let
+                    the user change any of its elements, checking each
+                    new value as it is entered. When the user saves,
+                    all of the changes are made with a single SQL
+                    UPDATE statement (see updateTran), which also hands
+                    back the new record and the change in amount for
+                    the budget check. If someone else has changed the
+                    transaction since it was displayed, nothing is
+                    saved.
     Args:           tranID (string): a transaction ID
     Returns:        Nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """    
+    # Import the current userID
+    global userID
     
     clrScreen()
     print ()
@@ -895,66 +2292,90 @@ def updateByTranID(tranID):
     print ()
 
     # Build a SQL statement to return the current details of 
-    # the transaction
-    sql = ("SELECT tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
+    # the transaction and its row version
+    sql = ("SELECT tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount, "\
+          "tranVersion, transactions.catID "\
           "FROM transactions "\
           "INNER JOIN categories on transactions.catID = categories.catID "\
-          "WHERE tranID=" + str(tranID))
+          "WHERE tranID=? AND transactions.userID=?")
 
-    trans = getData(sql)
+    trans = getData(sql, [str(tranID), str(userID)])
+    if trans == None:
+        print ('That expense transaction could not be read. Please try again later.')
+        pause()
+        return
+    if trans == []:
+        print ('You have no expense transaction ' + str(tranID) + '.')
+        pause()
+        return
+    
+    # Keep the Category, date, amount, time, description and version
+    # shown, then leave them off the row formatted for display
+    row = list(trans[0])
+    oldTran = [row[7], str(row[1]), float(row[5]), row[2], row[4]]
+    tranVersion = int(row[6])
 
     # Build a list of transactions with correctly formatted dates and amounts and display the list 
-    buildTrans(trans)
+    buildTrans([row[:6]])
     
-    # Provide user with a list of elements to update
-    # Or return to the previous menu
-    print ()
-    print ('\t (1) DATE')
-    print ('\t (2) TIME')
-    print ('\t (3) CATEGORY')
-    print ('\t (4) DESCRIPTION')
-    print ('\t (5) AMOUNT')
-    print ('\t (R)ETURN')
-    print ()
+    # Collect the changes to save: column -> new value, and
+    # field name -> new value as displayed
+    changes = {}
+    shownChanges = {}
     
-    # Get a valid tranaction element to work with
+    # Get valid changes to any of the transaction's elements until
+    # the user saves them or returns to the previous menu
     validSelection = False
     while not validSelection:
-        fieldToUpdate = input('Press a number to update a field for expense transaction ' + tranID + ': ')
+        # Provide user with a list of elements to update
+        # Or save the changes, or return to the previous menu
+        print ()
+        print ('\t (1) DATE')
+        print ('\t (2) TIME')
+        print ('\t (3) CATEGORY')
+        print ('\t (4) DESCRIPTION')
+        print ('\t (5) AMOUNT')
+        print ('\t (S)AVE CHANGES')
+        print ('\t (R)ETURN without saving')
+        print ()
+        
+        # Show the changes made so far
+        if shownChanges != {}:
+            print ('Changes to save:')
+            for field, value in shownChanges.items():
+                print ('\t' + field + ': ' + value)
+            print ()
+        
+        fieldToUpdate = input('Press a number to change a field for expense transaction ' + tranID + ': ')
         
         # Change the transactions date
         if fieldToUpdate == '1':
-            validSelection = True
             validDate = False
             while not validDate:
                 newDate = input('Please enter a new date (dd-mm-yyyy): ')
                 if isValidDate(newDate):
                     validDate = True
-                    # Build the SQL String to UPDATE the tranDate
-                    sql = "UPDATE transactions "\
-                          "SET tranDate='" + str(convertDate(newDate)) + "' "\
-                          "WHERE tranID=" + str(tranID)
+                    # Record the new tranDate
+                    changes['tranDate'] = convertDate(newDate)
+                    shownChanges['Date'] = newDate
                 else:
                     print ('This is not a valid date. Please try again.')
 
         # Change a transactions time
         elif fieldToUpdate == '2':
-            validSelection = True
             validTime = False
             while not validTime:
                 newTime = input('Please enter a new time (hh:mm): ')
                 if isValidTime(newTime):
                     validTime = True
-                    # Build a SQL String to UPDATE the tranTime
-                    sql = "UPDATE transactions "\
-                          "SET tranTime='" + str(newTime) + "' "\
-                          "WHERE tranID=" + str(tranID)
+                    # Record the new tranTime
+                    changes['tranTime'] = newTime
+                    shownChanges['Time'] = newTime
                 else:
                     print ('This is not a valid time. Please try again.')
 
         # Change a transactions Category
         elif fieldToUpdate == '3':
-            validSelection = True
             print ('Here are the available categories:')
             print ()
             # Display the list of current Categories to the user
@@ -966,45 +2387,46 @@ def updateByTranID(tranID):
             while not validCat:
                 newCat = input('Enter the Category you want to change to: ')
                 if newCat in validCats:
-                    # Build a SQL UPDATE statement to update the tranID's 
-                    # Category in the database
-                    sql = "UPDATE transactions "\
-                          "SET catID='" + str(newCat) + "' "\
-                          "WHERE tranID=" + str(tranID)
+                    # Record the tranID's new Category
+                    changes['catID'] = newCat
+                    shownChanges['Category'] = newCat
                     validCat = True
                 else:
                     print ('That is not a valid existing category. Please try again.')
 
         # Change a transactions description            
         elif fieldToUpdate == '4':
-            validSelection = True
             validDesc = False
             while not validDesc:
                 newDesc = input('Please enter the new description: ')
                 if newDesc != '' and len(newDesc) <= 50:
                     validDesc = True
-                    # Build a SQL UPDATE statement to update the transactions description
-                    sql = "UPDATE transactions "\
-                          "SET tranDescription='" + str(newDesc) + "' "\
-                          "WHERE tranID=" + str(tranID)
+                    # Record the transactions new description
+                    changes['tranDescription'] = newDesc
+                    shownChanges['Description'] = newDesc
                 else:
                     print ('That is not a valid description. Please try again.')
         
         # Change a transactions amount
         elif fieldToUpdate == '5':
-            validSelection = True
             validAmt = False
             while not validAmt:
                 newAmt = input('Please enter the new amount in 0.00 format: $')
                 if hasTwoDecimalPlaces(newAmt) and float(newAmt) > 0:
                     validAmt = True
-                    # Builde a SQL UPDATE statement to update the transactions amount    
-                    sql = "UPDATE transactions "\
-                          "SET tranAmount=" + str(newAmt) + " "\
-                          "WHERE tranID=" + str(tranID)
+                    # Record the transactions new amount
+                    changes['tranAmount'] = float(newAmt)
+                    shownChanges['Amount'] = fixAmt(float(newAmt))
                 else:
                     print('This is not a valid amount. Please try agin.')
 
+        # Save the changes
+        elif fieldToUpdate.lower() == 's':
+            if changes == {}:
+                print ('Nothing has been changed yet.')
+            else:
+                validSelection = True
+
         # Return to the previous menu
         elif fieldToUpdate.lower() == 'r':
             validSelection = True
@@ -1012,26 +2434,26 @@ def updateByTranID(tranID):
         else:
             print ('That is not a valid selection. Please try again.') 
     
-    # Send the created SQL statement to the database to update
-    setData(sql)
+    # Send all the changes to the database, getting the new record back
+    tran, amtDelta = updateTran(tranID, userID, changes, oldTran, tranVersion)
+    if tran == None:
+        print ()
+        print ('Expense Transaction ' + tranID + ' has been changed or deleted since it was displayed.')
+        print ('Your changes have NOT been saved. Please search for it again.')
+        pause ()
+        return
     
     # Confirm with the user that the record has been updated successfully
     print ()
     print ('Expense Transaction Record updated successfully!')
     print ('Here is the new record -:')
     print ()
-    
-    # Build a SQL statement to return the newly update transaction
-    sql = ("SELECT tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-          "FROM transactions "\
-          "INNER JOIN categories on transactions.catID = categories.catID "\
-          "WHERE tranID=" + str(tranID))
-    trans = getData(sql)
 
     # Build a list of transactions with correctly formatted dates and amounts and display the list 
-    buildTrans(trans)
+    buildTrans([tran])
     
     # Do a budget check now that a transaction has been updated
+    # (the total is adjusted by amtDelta, so is not read again)
     print ()
     checkBud()
     pause ()
@@ -1077,14 +2499,13 @@ def deleteByTranID(tranID):
     while not validAns:
         ans = input ("Please confirm that you wish to DELETE transaction number " + tranID + " (y/n): ")
         if ans.lower() == 'y':
-            # Build the SQL DELETE statement to delete the user/trans record from userTransactions table
-            sql = ("DELETE FROM userTransactions WHERE tranid='" + tranID + "';")
-            setData (sql)            
-            # Build the SQL DELETE statement to delete the current transaction record from transactions table
-            sql = ("DELETE FROM transactions WHERE tranid='" + tranID + "';")
             validAns = True
-            # Send the SQL DELETE request to the database
-            setData (sql)
+            # DELETE the user/trans record and the transaction record,
+            # getting the deleted amount back for the budget check
+            tranAmt = deleteTran(tranID, userID)
+            if tranAmt == None:
+                print ('Expense Transaction ' + tranID + ' could not be DELETED.')
+                break
             print ("Expense Transaction Successfully DELETED")
         elif ans.lower() == 'n':
             break
@@ -1099,23 +2520,320 @@ def deleteByTranID(tranID):
     return
 
 
-def addCat():
+def updateTran(tranID, uID, changes, oldTran, tranVersion):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Function Name:  addCat
-    Description:    Add a new valid category to the database. The
-                    Category ID and Name must not already exist and
-                    must not be blank.
-    Args:           nil
-    Returns:        nil
+    Description:    UPDATEs the given fields of one of a user's 
+                    transactions in a single statement and gets the 
+                    changed record back from it (OUTPUT on SQL Server,
+                    RETURNING on SQLite), so it does not have to be 
+                    read again. The record comes back with its Category
+                    name, ready to display. The UPDATE only happens if
+                    the transaction still has the row version it was
+                    read with, and adds 1 to it. The user's cached 
+                    totals are moved on by the change (see 
+                    bumpDataVersion).
+    Args:           tranID (string): a valid transaction ID
+                    uID (string): the userID that owns the transaction
+                    changes (dict): new values for any of tranDate
+                    (yyyy-mm-dd), tranTime, catID, tranDescription and
+                    tranAmount
+                    oldTran (list): the catID, tranDate (yyyy-mm-dd),
+                    tranAmount, tranTime and tranDescription before
+                    the change (SQLite cannot return the old values,
+                    so they are used to work out what the change moved
+                    and the new duplicate check hash)
+                    tranVersion (int): the row version the transaction
+                    was read with
+    Returns:        tran (list): tranID, tranDate, tranTime, catName,
+                    tranDescription and tranAmount, or None if the
+                    transaction has been changed or deleted since it
+                    was read (or could not be updated)
+                    amtDelta (float): the change in the amount
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    clrScreen()
-    print ()
-    print ("========================================================================")
-    print ('\t                   ADD A NEW CATEGORY')
-    print ("========================================================================")
-    print ()
+    # Keep the duplicate check hash in step with the new values
+    oldCat, oldDate, oldAmt, oldTime, oldDesc = oldTran
+    if set(changes) & {'tranDate', 'tranTime', 'tranAmount', 'tranDescription'}:
+        changes = dict(changes, dupHash=dupHash(changes.get('tranDate', oldDate), changes.get('tranTime', oldTime),
+                                                changes.get('tranAmount', oldAmt),
+                                                changes.get('tranDescription', oldDesc)))
+    
+    setCols = ", ".join(col + "=?" for col in changes) + ", tranVersion=tranVersion + 1"
+    params = list(changes.values())
+    
+    if dbDialect() == 'mssql':
+        # Join the Category the transaction will have after the change
+        # so its name can be OUTPUT with the new record
+        if 'catID' in changes:
+            catJoin = "?"
+            params.append(changes['catID'])
+        else:
+            catJoin = "transactions.catID"
+        sql = ("UPDATE transactions "\
+               "SET " + setCols + " "\
+               "OUTPUT inserted.tranID, inserted.tranDate, inserted.tranTime, categories.catName, "\
+               "inserted.tranDescription, inserted.tranAmount, inserted.tranAmount - deleted.tranAmount "\
+               "FROM transactions "\
+               "INNER JOIN categories on categories.catID = " + catJoin + " "\
+               "WHERE transactions.tranID=? AND transactions.userID=? "\
+               "AND transactions.tranVersion=?")
+        params += [str(tranID), str(uID), tranVersion]
+    else:
+        sql = ("UPDATE transactions "\
+               "SET " + setCols + " "\
+               "WHERE tranID=? AND userID=? AND tranVersion=? "\
+               "RETURNING tranID, tranDate, tranTime, "\
+               "(SELECT catName FROM categories WHERE categories.catID = transactions.catID), "\
+               "tranDescription, tranAmount, tranAmount - ?")
+        params += [str(tranID), str(uID), tranVersion, oldTran[2]]
+    
+    rows = setData(sql, params)
+    if not rows:
+        return (None, 0)
+    
+    tran = list(rows[0])
+    amtDelta = float(tran[6])
+    
+    # Move the amount spent from the old Category/date to the new one
+    spend = []
+    if 'catID' in changes or 'tranDate' in changes or amtDelta != 0:
+        spend = [(oldCat, oldDate, -float(oldAmt)),
+                 (changes.get('catID', oldCat), changes.get('tranDate', oldDate), float(oldAmt) + amtDelta)]
+    bumpDataVersion(uID, amtDelta, spend)
+    
+    return (tran[:6], amtDelta)
+
+
+def deleteTran(tranID, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    DELETEs one of a user's transactions (and its
+                    user/trans link) in a single transaction, getting
+                    the deleted amount back from the DELETE itself 
+                    (OUTPUT on SQL Server, RETURNING on SQLite) to 
+                    take off the user's cached totals.
+    Args:           tranID (string): a valid transaction ID
+                    uID (string): the userID that owns the transaction
+    Returns:        tranAmt (float): the amount of the deleted
+                    transaction, or None if nothing was deleted
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'mssql':
+        delTran = ("DELETE FROM transactions OUTPUT deleted.tranAmount, deleted.catID, deleted.tranDate "\
+                   "WHERE tranID=? AND userID=?")
+    else:
+        delTran = "DELETE FROM transactions WHERE tranID=? AND userID=? RETURNING tranAmount, catID, tranDate"
+    
+    sql = ["DELETE FROM userTransactions WHERE tranID=? AND userID=?", delTran]
+    params = [[str(tranID), str(uID)], [str(tranID), str(uID)]]
+    rows = setData(sql, params)
+    if not rows:
+        return None
+    
+    tranAmt = float(rows[0][0])
+    bumpDataVersion(uID, -tranAmt, [(rows[0][1], rows[0][2], -tranAmt)])
+    
+    return (tranAmt)
+
+
+def bulkDeleteTrans(tranIDs, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes a list of valid tranIDs and DELETEs all of
+                    them in one set-based batch. The IDs are sent as
+                    one JSON parameter (OPENJSON on SQL Server,
+                    json_each on SQLite). Both DELETE statements are
+                    sent on a single connection and committed together,
+                    so either every transaction is removed or none are.
+                    Only transactions belonging to the user are removed.
+    Args:           tranIDs (list): valid transaction IDs
+                    uID (string): the userID that owns the transactions
+    Returns:        delCount (int): the number of transactions deleted,
+                    or None if the DELETE failed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'mssql':
+        idList = "SELECT value FROM OPENJSON(?)"
+    else:
+        idList = "SELECT value FROM json_each(?)"
+    params = [str(uID), json.dumps([str(tranID) for tranID in tranIDs])]
+
+    # Remove the user/trans links first, then the transaction records,
+    # getting back the deleted amounts for the budget total
+    if dbDialect() == 'mssql':
+        delTrans = ("DELETE FROM transactions "\
+                    "OUTPUT deleted.tranAmount, deleted.catID, deleted.tranDate "\
+                    "WHERE userID=? AND tranID IN (" + idList + ");")
+    else:
+        delTrans = ("DELETE FROM transactions "\
+                    "WHERE userID=? AND tranID IN (" + idList + ") "\
+                    "RETURNING tranAmount, catID, tranDate;")
+    sql = ["DELETE FROM userTransactions WHERE userID=? AND tranID IN (" + idList + ");",
+           delTrans]
+    rows = setData(sql, [params, params])
+    if rows == None:
+        bumpDataVersion(uID)
+        return None
+
+    bumpDataVersion(uID, -sum(float(row[0]) for row in rows),
+                    [(row[1], row[2], -float(row[0])) for row in rows])
+
+    return (len(rows))
+
+
+def bulkRecatTrans(tranIDs, newCat, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes a list of valid tranIDs and a valid Category
+                    ID and moves all of the transactions to that
+                    Category with a single UPDATE statement, the IDs
+                    sent as one JSON parameter. Only transactions
+                    belonging to the user are changed.
+    Args:           tranIDs (list): valid transaction IDs
+                    newCat (string): a valid Category ID
+                    uID (string): the userID that owns the transactions
+    Returns:        moveCount (int): the number of transactions moved,
+                    or None if the UPDATE failed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'mssql':
+        sql = ("UPDATE transactions "\
+               "SET catID=?, tranVersion=tranVersion + 1 "\
+               "OUTPUT inserted.tranID "\
+               "WHERE userID=? AND tranID IN (SELECT value FROM OPENJSON(?))")
+    else:
+        sql = ("UPDATE transactions "\
+               "SET catID=?, tranVersion=tranVersion + 1 "\
+               "WHERE userID=? AND tranID IN (SELECT value FROM json_each(?)) "\
+               "RETURNING tranID")
+    rows = setData(sql, [str(newCat), str(uID), json.dumps([str(tranID) for tranID in tranIDs])])
+    
+    # Moving Category does not change the expenses total
+    bumpDataVersion(uID, 0)
+    if rows == None:
+        return None
+
+    return (len(rows))
+
+
+def bulkTransMenu(validTranIDs):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Takes the list of tranIDs returned by a search and
+                    asks the user which of them (or ALL) they want to
+                    change. The selected transactions are then DELETED
+                    or moved to a new Category in one batch, followed
+                    by a single budget check.
+    Args:           validTranIDs (list): tranIDs from the last search
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+
+    # Get a valid set of tranIDs from the list of transactions presented
+    validSelection = False
+    while not validSelection:
+        print ()
+        selection = input('Enter the Expense Transaction IDs separated by commas, or ALL for every listed transaction: ')
+        if selection.lower() == 'all':
+            tranIDs = list(validTranIDs)
+        else:
+            tranIDs = []
+            for tranID in selection.split(','):
+                tranID = tranID.strip()
+                # Ignore blanks and repeated IDs
+                if tranID != '' and tranID not in tranIDs:
+                    tranIDs.append(tranID)
+        
+        if tranIDs != [] and all(tranID in validTranIDs for tranID in tranIDs):
+            validSelection = True
+        else:
+            print ('Those are not all available Expense Transaction IDs for this search. Please try again.')
+
+    print ()
+    print ('You have selected ' + str(len(tranIDs)) + ' expense transactions.')
+    print ()
+    print ('Press letter to change the selected expense transactions:')
+    print ()
+    print ('\t (D)ELETE the selected expense transactions')
+    print ('\t (C)ATEGORY change for the selected expense transactions')
+    print ('\t (R)ETURN to previous menu')
+    print ()
+    validChoice = False
+    while not validChoice:
+        menuChoice = input('What would you like to do?: ')
+        if menuChoice.lower() == 'd':
+            validChoice = True
+            # Print a warning to the user and confirm the DELETE
+            print ()
+            print ('Please note: The Action CANNOT be undone')
+            print ()
+            validAns = False
+            while not validAns:
+                ans = input ('Please confirm that you wish to DELETE ' + str(len(tranIDs)) + ' expense transactions (y/n): ')
+                if ans.lower() == 'y':
+                    validAns = True
+                    delCount = bulkDeleteTrans(tranIDs, userID)
+                    if delCount == None:
+                        print ('The Expense Transactions could not be DELETED. Please try again later.')
+                    else:
+                        print (str(delCount) + ' Expense Transactions Successfully DELETED')
+                elif ans.lower() == 'n':
+                    return # To search menu
+                else:
+                    print ('That is not a valid answer. Please try again.')
+        elif menuChoice.lower() == 'c':
+            validChoice = True
+            print ()
+            print ('Here are the available categories:')
+            print ()
+            # Display the list of current Categories to the user
+            validCats = showCats()
+            print ()
+            validCat = False
+            while not validCat:
+                newCat = input('Enter the Category you want to change to: ')
+                if newCat in validCats:
+                    validCat = True
+                    moveCount = bulkRecatTrans(tranIDs, newCat, userID)
+                    if moveCount == None:
+                        print ('The Expense Transactions could not be moved. Please try again later.')
+                    else:
+                        print (str(moveCount) + ' Expense Transactions moved to Category ' + newCat)
+                else:
+                    print ('That is not a valid existing category. Please try again.')
+        elif menuChoice.lower() == 'r':
+            return # To search menu
+        else:
+            print ('Invalid Choice. Please try again.')
+
+    # Do a single budget check now that the transactions have changed
+    print ()
+    checkBud()
+    pause ()
+
+    return
+
+
+def addCat():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Function Name:  addCat
+    Description:    Add a new valid category to the database. The
+                    Category ID and Name must not already exist and
+                    must not be blank.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ('\t                   ADD A NEW CATEGORY')
+    print ("========================================================================")
+    print ()
     print ('Current Categories:')
     print ()
 
@@ -1241,6 +2959,8 @@ def updateCat():
            "SET catName='" + newCatName + "' "\
            "WHERE catID=" + catID)
     setData (sql)
+    # Category names appear in every user's reports
+    bumpDataVersion()
 
     # Confirm new category created
     print ()
@@ -1265,7 +2985,8 @@ def deleteCat():
                     categories. Ask which Category they wish to 
                     delete. Ensure there are no transactions 
                     associated with that category and delete the
-                    category record.
+                    category record, or offer to move them all to
+                    another Category and delete it (see mergeCat).
     Args:           nil 
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -1298,21 +3019,55 @@ def deleteCat():
         else:
             print ('This is not a valid Category ID. Please try again.')
     
-    # Test if there are any TranIDs with that CatID
-    tranIDs = []
-    sql = ("SELECT * FROM transactions WHERE catID=" + catID)
-    tranIDs = getData(sql)
-    if tranIDs != []:
-        print()
-        print('You cannot delete that Category - there are expense transactions associated with it.')
-        print('The administrator will first need to delete all the existing transactions from all users.')
+    # Test if anything is in that Category, or offer to move it all to
+    # another Category first
+    if catInUse(catID):
         print()
-        pause()
-        return # To catMenu
+        print('There are expense transactions, recurring transactions or budgets (from any user) in that Category.')
+        validAns = False
+        while not validAns:
+            moveTrans = input('Would you like to move them all to another Category and then delete it (y/n)?: ')
+            if moveTrans.lower() == 'y':
+                validAns = True
+            elif moveTrans.lower() == 'n':
+                print('The Category has NOT been deleted.')
+                print()
+                pause()
+                return # To catMenu
+            else:
+                print ('That is not a valid answer. Please Try Again.')
+        
+        validNewCat = False
+        while not validNewCat:
+            newCat = input ('What is the Category ID to move them to?: ')
+            if newCat in validCatIDs and newCat != catID:
+                validNewCat = True
+            else:
+                print ('This is not a valid Category ID. Please try again.')
+        
+        moved = mergeCat(catID, newCat)
+        if moved == None:
+            print ('The Category could not be deleted.')
+        else:
+            print (str(moved) + ' expense transaction(s) moved and Category Deleted successfully')
     else:
-        sql=("DELETE FROM categories WHERE catID='" + catID + "';")
-        setData(sql)
-        print ('Category Deleted successfully')
+        # Only delete the Category if nothing has been added to it since
+        # it was checked, getting the deleted catID back to confirm it
+        if dbDialect() == 'mssql':
+            sql = "DELETE FROM categories OUTPUT deleted.catID WHERE catID=? "
+        else:
+            sql = "DELETE FROM categories WHERE catID=? "
+        sql += ("AND NOT EXISTS (SELECT 1 FROM transactions WHERE transactions.catID = categories.catID) "\
+                "AND NOT EXISTS (SELECT 1 FROM recurring WHERE recurring.catID = categories.catID) "\
+                "AND NOT EXISTS (SELECT 1 FROM budgets WHERE budgets.catID = categories.catID)")
+        if dbDialect() == 'sqlite':
+            sql += " RETURNING catID"
+        rows = setData(sql, [catID])
+        bumpDataVersion()
+        if rows:
+            print ('Category Deleted successfully')
+        else:
+            print ('The Category could not be deleted.')
 
     # Display an updated list of Categories
     print()
@@ -1325,20 +3080,81 @@ def deleteCat():
     return # To catMenu
 
 
-def getBud():
+def catInUse(catID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Tests if any user has a transaction, recurring
+                    transaction or budget in a Category. Each EXISTS
+                    stops at the first row found (on the
+                    transactions.catID index for transactions), rather
+                    than reading every transaction in the Category.
+    Args:           catID (string): the Category ID
+    Returns:        True if the Category is in use, else False
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rows = getData("SELECT CASE WHEN EXISTS (SELECT 1 FROM transactions WHERE catID=?) "\
+                   "OR EXISTS (SELECT 1 FROM recurring WHERE catID=?) "\
+                   "OR EXISTS (SELECT 1 FROM budgets WHERE catID=?) THEN 1 ELSE 0 END",
+                   [str(catID)] * 3)
+    
+    return (bool(rows and rows[0][0]))
+
+
+def mergeCat(oldCat, newCat):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Moves every transaction (from all users), recurring
+                    transaction and budget in one Category to another
+                    with set-based UPDATEs, then DELETEs the old
+                    Category, all in one database transaction. If a transaction is added
+                    to the old Category in the meantime, the foreign key
+                    stops the DELETE and nothing is changed.
+    Args:           oldCat (string): the Category ID to delete
+                    newCat (string): the Category ID to move to
+    Returns:        moved (int): the number of transactions moved, or
+                    None if the Category could not be deleted
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'mssql':
+        moveTrans = ("UPDATE transactions SET catID=?, tranVersion=tranVersion + 1 "\
+                     "OUTPUT inserted.tranID "\
+                     "WHERE catID=?")
+    else:
+        moveTrans = ("UPDATE transactions SET catID=?, tranVersion=tranVersion + 1 "\
+                     "WHERE catID=? "\
+                     "RETURNING tranID")
+    sql = [moveTrans,
+           "UPDATE recurring SET catID=? WHERE catID=?",
+           "UPDATE budgets SET catID=? WHERE catID=?",
+           "DELETE FROM categories WHERE catID=?"]
+    params = [[str(newCat), str(oldCat)], [str(newCat), str(oldCat)], [str(newCat), str(oldCat)], [str(oldCat)]]
+    
+    rows = setData(sql, params)
+    
+    # Every user's Category totals and statistics may have changed
+    bumpDataVersion()
+    if rows == None:
+        return None
+    
+    return (len(rows))
+
+
+def getBud(uID=None):
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     Description:    Get the budget amount for the current
                     User and return it with 2 decimal places
-    Args:           Nil
+    Args:           uID (string): the userID to use (defaults to the
+                    current user)
     Returns:        budget (float): Amount with 2 decimal places
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # Import the current userID
-    global userID
+    # Use the current userID unless another user is given
+    if uID == None:
+        uID = userID
     
-    # Get the current budget amount for the current user from the database
-    bud = getData("SELECT userBudget FROM users WHERE userID=" + userID)
+    # Get the current budget amount for the user from the database
+    bud = getData("SELECT userBudget FROM users WHERE userID=" + str(uID))
     
     # Extract the Budget amount from database returned list of tuples
     # and fix it to be a float with 2 decimal places
@@ -1370,6 +3186,8 @@ def updateBud():
             # Send UPDATE SQL statement to the database to update users table with
             # new budget amount
             setData("UPDATE users SET userBudget=" + bud +" WHERE userID=" + userID)
+            with cacheLock:
+                budTotals.pop(str(userID), None)
             print ('Your budget is now set to $',bud)
             validInput = True
         else:
@@ -1381,149 +3199,1595 @@ def updateBud():
     return # To budMenu
 
 
-def checkBud():
+def addBudRule():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Update the budget amount for the current user in
-                    the database.
+    Description:    Asks the user for a new weekly, monthly or yearly
+                    budget for one Category (or all their expenses)
+                    and INSERTs it into the budgets table. A budget
+                    with rollover starts from the current period.
     Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # use the current logged in userID
-    global userID
-    totalTranAmt = 0
+    periods = {'w': 'week', 'm': 'month', 'y': 'year'}
+    validPeriod = False
+    while not validPeriod:
+        period = input('Is this a (W)EEKLY, (M)ONTHLY or (Y)EARLY budget?: ').lower()
+        if period in periods:
+            period = periods[period]
+            validPeriod = True
+        else:
+            print ('That is not a valid period. Please try again.')
     
-    # Get the users current budget amount
-    userBudget = getBud()
+    # Get a valid Category ID, or none for all expenses
+    cats = getData("SELECT catID FROM categories")
+    catIDs = [str(cat[0]).strip() for cat in cats]
+    showCats()
+    validCat = False
+    while not validCat:
+        catID = input('Please enter the Category ID for this budget (press Enter for all expenses): ').strip()
+        if catID == '' or catID in catIDs:
+            validCat = True
+        else:
+            print ('That is not a valid Category ID. Please try again.')
     
-    # fix the amount format to currency with 2 decimal places
-    userBudget = float(userBudget)
-    fixBudAmt = fixAmt(userBudget)
-
-    # Get the total of all transaction amounts for the current user
-    sql = ("SELECT tranAmount " \
-           "FROM userTransactions " \
-           "INNER JOIN transactions on transactions.tranID = userTransactions.tranID " \
-           "INNER JOIN users on users.userID = userTransactions.userID " \
-           "WHERE users.userID=" + str(userID))
-    tranAmts = getData(sql)
-    for tranAmt in tranAmts:
-        totalTranAmt += tranAmt[0]
-
-    # fix the amount format to currency with 2 decimal places
-    totalTranAmt = float(totalTranAmt)
-    fixTranAmt = fixAmt(totalTranAmt)
+    validAmt = False
+    while not validAmt:
+        budAmt = input('Please enter the budget amount for each ' + period + ' in 0.00 format: $')
+        if hasTwoDecimalPlaces(budAmt) and float(budAmt) > 0:
+            validAmt = True
+        else:
+            print ('That is not a valid amount. Please try again.')
     
-    print ()
-    print ('All your expenses currently total ' + str(fixTranAmt))
-    print ('Your budget is currently set to ' + str(fixBudAmt))
-    print ()
+    validAns = False
+    while not validAns:
+        ans = input('Carry what is left of (or overspent on) each ' + period + ' into the next (y/n)?: ').lower()
+        if ans in ('y', 'n'):
+            validAns = True
+        else:
+            print ('That is not a valid answer. Please try again.')
     
-    # Check if the total transactions are now Under Budget, Within 90% of the Budget, Over Budget.
-    if float(totalTranAmt) < (float(userBudget) * 0.9):
-        print ('UNDER BUDGET: Your total tranactions are less than 90% of your Budget Amount.')
-    elif (float(totalTranAmt) < float(userBudget)) and (float(totalTranAmt) > (float(userBudget) * 0.9)):
-        print ('UNDER BUDGET Note: You have reached 90% of your current budget.')
-    else:
-        print ("OVER BUDGET: You have now exceeded your current budget.")
+    startDate = periodStart(period, date.today()).isoformat()
+    setData("INSERT INTO budgets (userID, catID, budPeriod, budAmount, rollover, startDate) "\
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [str(userID), catID or None, period, budAmt, 1 if ans == 'y' else 0, startDate])
+    with cacheLock:
+        budRules.pop(str(userID), None)
     
     print ()
+    print ('Your ' + periodNames[period].lower() + ' budget of $' + budAmt + ' has been added.')
+    pause()
     
-    return
+    return # To budMenu
 
 
-def saveToFile (repHead, report):
+def delBudRule():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Accepts a report header and report content, requests
-                    a filename from the user and saves the report header,
-                    the report and budget information to an external
-                    file.
-    Args:           repHead: string (The report header)
-                    report: string (The report to save) 
+    Description:    Lists the user's Category and period budgets and
+                    DELETEs the one they choose.
+    Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-
-    filePath = "./Reports/"
-    # Check if ./Reports/ folder exists, if not, create it
-    os.makedirs(filePath, exist_ok=True)
-    # Get a valid filename to save file to
-    validFilename = False
-    while not validFilename:
-        fName = input ('\nEnter a filename for the report: ')
-        # test if this is a valid filename
-        if isValidFilename(fName):
-            validFilename = True
+    rules = getBudRules(userID)
+    if rules == []:
+        print ('You do not have any Category or period budgets.')
+        pause()
+        return # To budMenu
+    
+    print ()
+    for rule in rules:
+        print ('\t' + str(rule[0]) + ': ' + periodNames[rule[3]] + ' '\
+               + (str(rule[2]).strip() if rule[1] != None else 'all expenses') + ' '\
+               + fixAmt(float(rule[4])) + (' with rollover' if rule[5] else ''))
+    print ()
+    
+    budIDs = [str(rule[0]) for rule in rules]
+    validID = False
+    while not validID:
+        budID = input('Please enter the number of the budget to DELETE (press Enter to cancel): ').strip()
+        if budID == '':
+            return # To budMenu
+        if budID in budIDs:
+            validID = True
         else:
-            print ('That is not a valid filename in Windows. Please try again.')
-    # Build the full file path
-    fPathName = filePath + fName
-    # Overwrite (or create) the file with the latest report
-    # Write the heading
-    with open(fPathName, "w") as file:
-        file.write(repHead)
-    # Append the report data to the heading
-    with open(fPathName, "a") as file:
-        file.write(report)
-    # Append the output from checkBud() to the report    
-    with open(fPathName, "a") as file:
-        # Redirect stdout to the file
-        sys.stdout = file  
-        checkBud()  
-        # Restore stdout to normal
-        sys.stdout = sys.__stdout__
-    print ('\nYour Report has been written to ' + str(fPathName))
-    return
-
+            print ('That is not one of your budgets. Please try again.')
+    
+    setData("DELETE FROM budgets WHERE budID=? AND userID=?", [int(budID), str(userID)])
+    with cacheLock:
+        budRules.pop(str(userID), None)
+    print ('Budget ' + budID + ' has been DELETED.')
+    pause()
+    
+    return # To budMenu
 
 
-def currTranRep():
+def addRecurRule():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Builds a report to output to the screen all
-                    the users current tranactions. Offer the user
-                    the ability to save report to an external file.
-    Args:           nil 
+    Description:    Asks the user for a new recurring transaction
+                    (Category, Description, Amount, how often, the time
+                    and the first and last dates) and INSERTs it into
+                    the recurring table. Any occurrences already due
+                    are added straight away.
+    Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
     # Import the current userID
     global userID
-    clrScreen ()
     print ()
-    print ("========================================================================")
-    print ("\t \t     ALL EXPENSES REPORT")
-    print ("========================================================================")
+    print ('Here are the available categories:')
     print ()
-
-    print ('This is a report of all your expenses to date:')
+    validCats = showCats()
+    print ()
+    validCategory = False
+    while not validCategory:
+        catID = input('Please enter the Category ID for your recurring transaction: ')
+        if catID in validCats:
+            validCategory = True
+        else:
+            print ('That is not an available Category ID. Please try again.')
+    
+    validDesc = False
+    while not validDesc:
+        recDesc = input('Please enter the description in 50 characters or less: ')
+        if len(recDesc) <= 50 and recDesc != '':
+            validDesc = True
+        else:
+            print('That is not a valid description. Please try again.')
+    validAmt = False
+    while not validAmt:
+        recAmt = input('Please enter the amount in 0.00 format: $')
+        if hasTwoDecimalPlaces(recAmt) and float(recAmt) > 0:
+            validAmt = True
+        else:
+            print('That is not a valid amount. Please try again.')
+    
+    periods = {'w': 'week', 'm': 'month', 'y': 'year'}
+    validPeriod = False
+    while not validPeriod:
+        period = input('Does this happen (W)EEKLY, (M)ONTHLY or (Y)EARLY?: ').lower()
+        if period in periods:
+            period = periods[period]
+            validPeriod = True
+        else:
+            print ('That is not a valid period. Please try again.')
+    validTime = False
+    while not validTime:
+        recTime = input('Please enter the time of the transaction in hh:mm format: ')
+        if isValidTime(recTime):
+            validTime = True
+        else:
+            print('That is not a valid time. Please try again.')
+    validDate = False
+    while not validDate:
+        firstDate = input('Please enter the date of the first transaction in dd-mm-yyyy format: ')
+        if isValidDate(firstDate):
+            validDate = True
+        else:
+            print('That is not a valid date. Please try again.')
+    validDate = False
+    while not validDate:
+        lastDate = askOptional('Please enter the date it ends in dd-mm-yyyy format (press Enter for no end): ', isValidDate)
+        if lastDate == '' or convertDate(lastDate) >= convertDate(firstDate):
+            validDate = True
+        else:
+            print('The end date cannot be before the first date. Please try again.')
+    
+    setData("INSERT INTO recurring (userID, catID, recDescription, recAmount, recPeriod, recTime, startDate, nextDate, endDate) "\
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [str(userID), catID, recDesc, recAmt, period, recTime, convertDate(firstDate), convertDate(firstDate),
+             convertDate(lastDate) if lastDate != '' else None])
+    
     print ()
+    print ('Your ' + periodNames[period].lower() + ' transaction "' + recDesc + '" has been added.')
+    
+    # Add the transactions already due
+    added = addRecurringDue(userID)
+    if added:
+        print (str(added) + ' expense transaction(s) that have already fallen due have been added.')
+    pause()
+    
+    return # To recurMenu
 
-    # Build a SQL SELECT statement to return all this users transactions
+
+def delRecurRule():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Lists the user's recurring transactions and DELETEs
+                    the one they choose. The transactions already added
+                    from it are kept.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rules = getRecurRules(userID)
+    if rules == []:
+        print ('You do not have any recurring transactions.')
+        pause()
+        return # To recurMenu
+    
+    print ()
+    for rule in rules:
+        print ('\t' + str(rule[0]) + ': ' + periodNames[rule[5]] + ' ' + str(rule[3]).strip() + ' '\
+               + fixAmt(float(rule[4])) + ' (' + str(rule[2]).strip() + ') next on ' + fixDate(rule[8])\
+               + (' until ' + fixDate(rule[9]) if rule[9] != None else ''))
+    print ()
+    
+    recIDs = [str(rule[0]) for rule in rules]
+    validID = False
+    while not validID:
+        recID = input('Please enter the number of the recurring transaction to DELETE (press Enter to cancel): ').strip()
+        if recID == '':
+            return # To recurMenu
+        if recID in recIDs:
+            validID = True
+        else:
+            print ('That is not one of your recurring transactions. Please try again.')
+    
+    setData("DELETE FROM recurring WHERE recID=? AND userID=?", [int(recID), str(userID)])
+    print ('Recurring transaction ' + recID + ' has been DELETED.')
+    pause()
+    
+    return # To recurMenu
+
+
+def getBudSQL(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for the budget
+                    figures used by budSummary: the user's budget 
+                    amount and the total of all their transactions.
+    Args:           uID (string): the userID
+    Returns:        sql (string): a SELECT returning one row of
+                    userBudget and the transactions total
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT userBudget, "\
+           "(SELECT SUM(tranAmount) FROM transactions WHERE userID='" + str(uID) + "') "\
+           "FROM users "\
+           "WHERE userID='" + str(uID) + "'")
+    
+    return (sql)
+
+
+def storeBudTotal(uID, version, budRow):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Keeps the budget figures read with getBudSQL for
+                    the user's data version they were read at (see
+                    budSummary).
+    Args:           uID (string): the userID
+                    version (int): the user's data version, read
+                    before the figures were
+                    budRow: the row returned by getBudSQL
+    Returns:        totalTranAmt (float): the transactions total
+                    userBudget (float): the budget amount
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # The total is empty if the user has no transactions
+    userBudget = float(budRow[0])
+    totalTranAmt = float(budRow[1] or 0)
+    
+    with cacheLock:
+        budTotals[str(uID)] = [version, totalTranAmt, userBudget]
+    
+    return (totalTranAmt, userBudget)
+
+
+def periodStart(period, day):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the first day of the budget period a date is
+                    in. Weeks start on Monday.
+    Args:           period (string): 'week', 'month' or 'year'
+                    day (date): the date
+    Returns:        start (date): the first day of the period
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if period == 'week':
+        return (day - timedelta(days=day.weekday()))
+    if period == 'month':
+        return (day.replace(day=1))
+    
+    return (day.replace(month=1, day=1))
+
+
+def nextPeriodStart(period, start):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the first day of the budget period after the
+                    one starting on a date.
+    Args:           period (string): 'week', 'month' or 'year'
+                    start (date): the first day of a period
+    Returns:        start (date): the first day of the next period
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if period == 'week':
+        return (start + timedelta(days=7))
+    if period == 'month':
+        return ((start.replace(day=28) + timedelta(days=4)).replace(day=1))
+    
+    return (start.replace(year=start.year + 1))
+
+
+def addSpend(totals, catID, tranDate, amount):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds an amount spent to the running totals of the
+                    week, month and year it was spent in, both for its
+                    Category and for all Categories (None).
+    Args:           totals (dict): (catID, period, period start) ->
+                    amount spent (see getPeriodTotals)
+                    catID (string): the Category ID
+                    tranDate: the date spent (yyyy-mm-dd or a date)
+                    amount (float): the amount (negative to take off)
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    day = date.fromisoformat(str(tranDate)[:10])
+    catID = str(catID).strip()
+    for period in budPeriods:
+        start = periodStart(period, day)
+        for key in ((catID, period, start), (None, period, start)):
+            totals[key] = totals.get(key, 0) + amount
+    
+    return
+
+
+def getPeriodSQL(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for the amounts a
+                    user spent in each Category on each day, that their
+                    period totals are built from (a range of the
+                    userID, tranDate index).
+    Args:           uID (string): the userID
+    Returns:        sql (string): the SELECT statement
+                    params (list): the values for its ? placeholders
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT catID, tranDate, SUM(tranAmount) "\
+           "FROM transactions "\
+           "WHERE userID=? "\
+           "GROUP BY catID, tranDate")
+    
+    return (sql, [str(uID)])
+
+
+def storePeriodTotals(uID, version, rows):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds a user's running period totals from the rows
+                    read with getPeriodSQL and keeps them for the data
+                    version they were read at.
+    Args:           uID (string): the userID
+                    version (int): the user's data version, read
+                    before the rows were
+                    rows: the rows returned by getPeriodSQL
+    Returns:        totals (dict): (catID, period, period start) ->
+                    amount spent
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    totals = {}
+    for catID, tranDate, amount in rows:
+        addSpend(totals, catID, tranDate, float(amount))
+    
+    with cacheLock:
+        periodTotals[str(uID)] = [version, totals]
+    
+    return (totals)
+
+
+def getPeriodTotals(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gets the running totals of what a user spent in
+                    each week, month and year, by Category and overall.
+                    They are read from the database once and then kept
+                    up to date as transactions are added, changed and
+                    deleted (see bumpDataVersion), so checking any
+                    number of budgets costs no database reads.
+    Args:           uID (string): the userID
+    Returns:        totals (dict): (catID, period, period start) ->
+                    amount spent, with catID None for all Categories
+                    (empty, and not kept, if the database could not be
+                    read)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    with cacheLock:
+        version = dataVersions.get(uID, 0)
+        cached = periodTotals.get(uID)
+    if cached != None and cached[0] == version:
+        return (cached[1])
+    
+    sql, params = getPeriodSQL(uID)
+    rows = getData(sql, params)
+    if rows == None:
+        return ({})
+    
+    return (storePeriodTotals(uID, version, rows))
+
+
+def addStat(stats, catID, amount):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds a transaction amount to (or, if negative, takes
+                    it off) the running statistics of its Category: the
+                    count, mean and sum of squared differences from the
+                    mean are updated in one step each time (Welford's
+                    method), so the variance never has to be worked out
+                    from all the amounts again. The recent average
+                    (an exponentially weighted moving average) moves
+                    towards each amount added; it is left as it is when
+                    an amount is taken off.
+    Args:           stats (dict): catID -> [count, mean, sum of squared
+                    differences, recent average] (see getCatStats)
+                    catID (string): the Category ID
+                    amount (float): the amount (negative to take off)
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    catID = str(catID).strip()
+    count, mean, sumSquares, recent = stats.get(catID, [0, 0.0, 0.0, None])
+    
+    if amount >= 0:
+        count += 1
+        delta = amount - mean
+        mean += delta / count
+        sumSquares += delta * (amount - mean)
+        recent = amount if recent == None else recent + recentWeight * (amount - recent)
+    elif count <= 1:
+        count, mean, sumSquares = 0, 0.0, 0.0
+    else:
+        amount = -amount
+        count -= 1
+        delta = amount - mean
+        mean -= delta / count
+        sumSquares = max(0.0, sumSquares - delta * (amount - mean))
+    
+    stats[catID] = [count, mean, sumSquares, recent]
+    
+    return
+
+
+def getCatStats(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gets the running statistics of a user's transaction
+                    amounts in each Category. They are read from the
+                    database once (in date order, for the recent
+                    average) and then kept up to date as transactions
+                    are added, changed and deleted (see
+                    bumpDataVersion), so checking a new amount against
+                    them costs no database reads.
+    Args:           uID (string): the userID
+    Returns:        stats (dict): catID -> [count, mean, sum of squared
+                    differences from the mean, recent average] (empty,
+                    and not kept, if the transactions could not all be
+                    read)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    with cacheLock:
+        version = dataVersions.get(uID, 0)
+        cached = catStats.get(uID)
+    if cached != None and cached[0] == version:
+        return (cached[1])
+    
+    stats = {}
+    sql = ("SELECT catID, tranAmount "\
+           "FROM transactions "\
+           "WHERE userID=? "\
+           "ORDER BY tranDate, tranTime")
+    try:
+        for rows in streamData(sql, params=[uID]):
+            for catID, amount in rows:
+                addStat(stats, catID, float(amount))
+    except RuntimeError:
+        return ({})
+    
+    with cacheLock:
+        catStats[uID] = [version, stats]
+    
+    return (stats)
+
+
+def unusualAmount(uID, catID, amount):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks a new transaction amount against the user's
+                    usual amounts in its Category (see getCatStats). An
+                    amount more than unusualLimit standard deviations
+                    above the Category mean is unusual, once there are
+                    at least minStatsCount transactions to go by.
+    Args:           uID (string): the userID
+                    catID (string): the Category ID
+                    amount (float): the new amount (not yet added)
+    Returns:        note (string): a warning about the amount, or '' if
+                    it is not unusual
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    count, mean, sumSquares, recent = getCatStats(uID).get(str(catID).strip(), [0, 0.0, 0.0, None])
+    if count < minStatsCount:
+        return ('')
+    
+    stdDev = (sumSquares / (count - 1)) ** 0.5
+    if amount <= mean + unusualLimit * max(stdDev, 0.01):
+        return ('')
+    
+    return ('UNUSUAL: ' + fixAmt(amount) + ' is well above your usual amount in this category ('\
+            + fixAmt(mean) + ' on average, ' + fixAmt(recent) + ' recently).\n')
+
+
+def forecastSummary(uID, today=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the spending forecast text for a user: what
+                    they will have spent by the end of this month, and
+                    of the period of each of their Category and period
+                    budgets, if they keep spending at the rate they
+                    have so far this period. It is worked out from the
+                    running period totals (see getPeriodTotals), so it
+                    costs no database reads once they are loaded.
+    Args:           uID (string): the userID
+                    today (date): the date to forecast from (defaults
+                    to today)
+    Returns:        summary (string): the forecast text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    today = today or date.today()
+    totals = getPeriodTotals(uID)
+    
+    def projected(catID, period):
+        start = periodStart(period, today)
+        spent = totals.get((catID, period, start), 0)
+        daysGone = (today - start).days + 1
+        periodDays = (nextPeriodStart(period, start) - start).days
+        return (spent * periodDays / daysGone)
+    
+    summary = ('At this rate your expenses this month will total ' + fixAmt(projected(None, 'month')) + '.\n')
+    for rule in getBudRules(uID):
+        catID = str(rule[1]).strip() if rule[1] != None else None
+        period = rule[3]
+        forecast = projected(catID, period)
+        spent, available, carried = checkBudRule(rule, totals, today)
+        if forecast > available:
+            summary += ('FORECAST: ' + periodNames[period] + ' ' + (str(rule[2]).strip() if catID != None else 'all expenses')\
+                        + ' is heading for ' + fixAmt(forecast) + ' this ' + period + ', '\
+                        + fixAmt(forecast - available) + ' over its ' + fixAmt(available) + ' budget.\n')
+    summary += '\n'
+    
+    return (summary)
+
+
+def getBudRulesSQL(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for a user's
+                    Category and period budgets.
+    Args:           uID (string): the userID
+    Returns:        sql (string): the SELECT statement
+                    params (list): the values for its ? placeholders
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = ("SELECT budID, budgets.catID, categories.catName, budPeriod, budAmount, rollover, startDate "\
+           "FROM budgets "\
+           "LEFT JOIN categories on budgets.catID = categories.catID "\
+           "WHERE userID=? "\
+           "ORDER BY budID")
+    
+    return (sql, [str(uID)])
+
+
+def getBudRules(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gets a user's Category and period budgets, reading
+                    them from the database the first time only (they
+                    are read again after one is added or deleted).
+    Args:           uID (string): the userID
+    Returns:        rules (list): budID, catID (None for all
+                    Categories), catName, budPeriod, budAmount,
+                    rollover and startDate for each budget
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    with cacheLock:
+        rules = budRules.get(uID)
+    if rules == None:
+        sql, params = getBudRulesSQL(uID)
+        rules = getData(sql, params) or []
+        with cacheLock:
+            budRules[uID] = rules
+    
+    return (rules)
+
+
+def checkBudRule(rule, totals, today=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks one Category or period budget against the 
+                    running period totals. With rollover, what was left
+                    of (or overspent on) each period since the budget
+                    started is added to (or taken off) this period's
+                    amount.
+    Args:           rule (list): a budget (see getBudRules)
+                    totals (dict): the user's period totals (see
+                    getPeriodTotals)
+                    today (date): the date to check at (defaults to
+                    today)
+    Returns:        spent (float): the amount spent this period
+                    available (float): the amount budgeted for this
+                    period, including any rollover
+                    carried (float): the rollover from earlier periods
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    budID, catID, catName, period, budAmount, rollover, startDate = rule
+    catID = str(catID).strip() if catID != None else None
+    budAmount = float(budAmount)
+    current = periodStart(period, today or date.today())
+    spent = totals.get((catID, period, current), 0)
+    
+    carried = 0
+    if rollover:
+        start = periodStart(period, date.fromisoformat(str(startDate)[:10]))
+        while start < current:
+            carried += budAmount - totals.get((catID, period, start), 0)
+            start = nextPeriodStart(period, start)
+    
+    return (spent, budAmount + carried, carried)
+
+
+def budRulesSummary(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the summary text for a user's Category and
+                    period budgets, one line each for this week, month
+                    or year.
+    Args:           uID (string): the userID
+    Returns:        summary (string): the summary text, empty if the
+                    user has no Category or period budgets
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rules = getBudRules(uID)
+    if rules == []:
+        return ('')
+    
+    totals = getPeriodTotals(uID)
+    summary = 'Your Category and period budgets:\n'
+    for rule in rules:
+        spent, available, carried = checkBudRule(rule, totals)
+        period = rule[3]
+        summary += ('  ' + periodNames[period] + ' ' + (str(rule[2]).strip() if rule[1] != None else 'all expenses') + ': '\
+                    + fixAmt(spent) + ' of ' + fixAmt(available) + ' spent this ' + period)
+        if carried != 0:
+            summary += ' (' + fixAmt(carried) + ' rolled over)'
+        
+        # The same Under/Over Budget levels as the overall budget
+        if spent < available * 0.9:
+            summary += ' - UNDER BUDGET\n'
+        elif spent < available:
+            summary += ' - UNDER BUDGET Note: 90% reached\n'
+        else:
+            summary += ' - OVER BUDGET\n'
+    summary += '\n'
+    
+    return (summary)
+
+
+def budSummary(uID=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Compare the total of all the user's transactions
+                    against their budget amount and build the budget
+                    summary text (totals and Under/Over Budget status).
+                    Nothing is printed, so the summary can be shown on
+                    screen or written into a report file. The total
+                    and budget are only read from the database when the
+                    user's data has changed by an unknown amount (see
+                    bumpDataVersion). Any Category and period budgets
+                    are added (see budRulesSummary).
+    Args:           uID (string): the userID to use (defaults to the
+                    current user)
+    Returns:        summary (string): the budget summary text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Use the current userID unless another user is given
+    if uID == None:
+        uID = userID
+    
+    uID = str(uID)
+    with cacheLock:
+        version = dataVersions.get(uID, 0)
+        cached = budTotals.get(uID)
+
+    if cached != None and cached[0] == version:
+        totalTranAmt, userBudget = cached[1], cached[2]
+    else:
+        # Get the users current budget amount and the total of all
+        # their transaction amounts
+        budRow = getData(getBudSQL(uID))[0]
+        totalTranAmt, userBudget = storeBudTotal(uID, version, budRow)
+    
+    # fix the amounts format to currency with 2 decimal places
+    fixBudAmt = fixAmt(userBudget)
+    fixTranAmt = fixAmt(totalTranAmt)
+    
+    summary = ('\n'\
+               'All your expenses currently total ' + str(fixTranAmt) + '\n'\
+               'Your budget is currently set to ' + str(fixBudAmt) + '\n'\
+               '\n')
+    
+    # Check if the total transactions are now Under Budget, Within 90% of the Budget, Over Budget.
+    if float(totalTranAmt) < (float(userBudget) * 0.9):
+        summary += 'UNDER BUDGET: Your total tranactions are less than 90% of your Budget Amount.\n'
+    elif (float(totalTranAmt) < float(userBudget)) and (float(totalTranAmt) > (float(userBudget) * 0.9)):
+        summary += 'UNDER BUDGET Note: You have reached 90% of your current budget.\n'
+    else:
+        summary += 'OVER BUDGET: You have now exceeded your current budget.\n'
+    
+    summary += '\n'
+    summary += budRulesSummary(uID)
+    
+    return (summary)
+
+
+async def budSummaryAsync(uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of budSummary. The budget figures,
+                    budgets and period totals are read without blocking
+                    if they are not cached.
+    Args:           uID (string): the userID
+    Returns:        summary (string): the budget summary text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    with cacheLock:
+        version = dataVersions.get(uID, 0)
+        cached = budTotals.get(uID)
+        rules = budRules.get(uID)
+        totals = periodTotals.get(uID)
+    
+    if cached == None or cached[0] != version:
+        rows = await getDataAsync(getBudSQL(uID))
+        storeBudTotal(uID, version, rows[0])
+    if rules == None:
+        sql, params = getBudRulesSQL(uID)
+        rules = await getDataAsync(sql, params) or []
+        with cacheLock:
+            budRules[uID] = rules
+    if rules != [] and (totals == None or totals[0] != version):
+        sql, params = getPeriodSQL(uID)
+        storePeriodTotals(uID, version, await getDataAsync(sql, params))
+    
+    # The figures are cached now, so this does not go to the database
+    return (budSummary(uID))
+
+
+def checkBud():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Display the budget summary for the current user,
+                    comparing all their transactions against their
+                    budget amount.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    print (budSummary(), end='')
+    
+    return
+
+
+@contextlib.contextmanager
+def atomicFile(fPathName):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Used in a 'with' statement to write a file safely.
+                    Provides a temporary file path in the same folder
+                    to write to. When the 'with' block finishes, the
+                    temporary file is renamed over the real file in a
+                    single step, so a report file is never seen half
+                    written. If an error occurs the temporary file is
+                    removed and the real file is left untouched. The
+                    file keeps the permissions of the file it replaces,
+                    or gets those of a file made with open() (0666 less
+                    the umask, applied when the file is created).
+    Args:           fPathName (string): the path of the file to write
+    Returns:        tmpPathName (string): the temporary path to write
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Create a uniquely named temporary file next to the real file,
+    # trying another name if one is already taken
+    folder, fName = os.path.split(fPathName)
+    while True:
+        tmpPathName = os.path.join(folder or '.', '.' + fName + '.' + os.urandom(6).hex() + '.tmp')
+        try:
+            fd = os.open(tmpPathName, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+            break
+        except FileExistsError:
+            pass
+    os.close(fd)
+    try:
+        yield tmpPathName
+        # Keep the permissions of the file being replaced
+        try:
+            os.chmod(tmpPathName, os.stat(fPathName).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmpPathName, fPathName)
+    except BaseException:
+        # Tidy up the temporary file and pass the error on
+        if os.path.exists(tmpPathName):
+            os.remove(tmpPathName)
+        raise
+
+
+def writeReport(fPathName, repHead, report, budText):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Writes a report header, the report and the budget
+                    summary to a file through one buffered stream that
+                    is opened only once. The file is replaced atomically
+                    (see atomicFile) and no global state such as 
+                    sys.stdout is touched, so it is safe to call from
+                    worker threads.
+    Args:           fPathName (string): the path of the file to write
+                    repHead (string): the report header
+                    report (string): the report
+                    budText (string): the budget summary (see budSummary)
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    with atomicFile(fPathName) as tmpPathName:
+        with open(tmpPathName, "w") as file:
+            file.write(repHead)
+            file.write(report)
+            file.write(budText)
+    
+    return
+
+
+def writePivot(fPathName, months, pivotRows):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Writes the Category by month table (see buildPivot)
+                    to a CSV file, with a column for each month
+                    (yyyy-mm), plain amounts and blanks for months with
+                    no spending. The file is replaced atomically (see
+                    atomicFile).
+    Args:           fPathName (string): the path of the file to write
+                    months (list): the months reported on (yyyy-mm)
+                    pivotRows (list): the table rows (see buildPivot)
+    Returns:        rowCount (int): the number of rows written
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    with atomicFile(fPathName) as tmpPathName:
+        with open(tmpPathName, "w", newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Category'] + months + ['Total'])
+            writer.writerows([row[0]] + ['' if amount == None else "{:.2f}".format(amount) for amount in row[1:]]
+                             for row in pivotRows)
+    
+    return (len(pivotRows))
+
+
+def writeHourGrid(fPathName, amounts, counts):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Writes the spending by hour and weekday grid (see
+                    buildHourGrid) to a CSV file, with a row for each
+                    hour and a column for each weekday. The file is
+                    replaced atomically (see atomicFile).
+    Args:           fPathName (string): the path of the file to write
+                    amounts (list): the amount spent in each hour on
+                    each weekday
+                    counts (list): the number of transactions in each
+                    hour
+    Returns:        rowCount (int): the number of rows written
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    with atomicFile(fPathName) as tmpPathName:
+        with open(tmpPathName, "w", newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Hour'] + list(dayNames) + ['Total', 'Count'])
+            writer.writerows(["{:02d}:00".format(hour)] + ["{:.2f}".format(amount) for amount in amounts[hour]]
+                             + ["{:.2f}".format(sum(amounts[hour])), counts[hour]] for hour in range(24))
+    
+    return (24)
+
+
+def getRepSQL(repType, uID, catID=None, firstDate=None, secDate=None, firstTime=None, secTime=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for one of the
+                    expense reports. Every report returns the same
+                    columns (Date, Time, Category, Description, Amount)
+                    for one user, ordered by date.
+    Args:           repType (string): 'all', 'cat', 'date' or 'time'
+                    uID (string): the userID to report on
+                    catID (string): Category ID for a 'cat' report
+                    firstDate, secDate (dd-mm-yyyy): the date range for
+                    a 'date' report (firstDate is the date searched
+                    for a 'time' report)
+                    firstTime, secTime (hh:mm): the time range for a 
+                    'time' report
+    Returns:        sql (string): the report SELECT statement
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
     sql = ("SELECT tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
+            "FROM transactions "\
             "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "ORDER BY tranDate;")
+            "WHERE transactions.userID='" + str(uID) + "' ")
+
+    # Add the search conditions for the requested report
+    if repType == 'cat':
+        sql += "AND transactions.catID='" + str(catID) + "' "
+    elif repType == 'date':
+        sql += "AND tranDate BETWEEN '" + convertDate(firstDate) + "' AND '" + convertDate(secDate) + "' "
+    elif repType == 'time':
+        sql += ("AND tranDate='" + convertDate(firstDate) + "' "\
+                "AND tranTime BETWEEN '" + str(firstTime) + "' AND '" + str(secTime) + "' ")
+
+    sql += "ORDER BY tranDate;"
+    
+    return (sql)
+
+
+def getPivotSQL(uID, firstDate=None, secDate=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for the Category by
+                    month report: one grouped query that returns the
+                    total a user spent in each Category in each month
+                    (yyyy-mm), so the whole table is read at once
+                    rather than one Category report at a time.
+    Args:           uID (string): the userID to report on
+                    firstDate, secDate (dd-mm-yyyy): the date range to
+                    report on, or None for all dates
+    Returns:        sql (string): the SELECT statement
+                    params (list): the values for its ? placeholders
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # The year and month of each transaction (yyyy-mm)
+    if dbDialect() == 'mssql':
+        tranMonth = "CONVERT(CHAR(7), tranDate, 120)"
+    else:
+        tranMonth = "substr(tranDate, 1, 7)"
+    
+    sql = ("SELECT categories.catName, " + tranMonth + ", SUM(tranAmount) "\
+           "FROM transactions "\
+           "INNER JOIN categories on transactions.catID = categories.catID "\
+           "WHERE transactions.userID=? ")
+    params = [str(uID)]
+    if firstDate != None:
+        sql += "AND tranDate BETWEEN ? AND ? "
+        params += [convertDate(firstDate), convertDate(secDate)]
+    sql += "GROUP BY categories.catName, " + tranMonth
+    
+    return (sql, params)
+
+
+def getHourSQL(uID, firstDate=None, secDate=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the SQL SELECT statement for the spending by
+                    hour and weekday report: the number and total of a
+                    user's transactions in each hour of each day. It is
+                    answered from the (userID, tranTime) index and
+                    returns at most 24 rows a day, whatever the number
+                    of transactions.
+    Args:           uID (string): the userID to report on
+                    firstDate, secDate (dd-mm-yyyy): the date range to
+                    report on, or None for all dates
+    Returns:        sql (string): the SELECT statement
+                    params (list): the values for its ? placeholders
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # The hour of each transaction (hh)
+    if dbDialect() == 'mssql':
+        tranHour = "LEFT(tranTime, 2)"
+    else:
+        tranHour = "substr(tranTime, 1, 2)"
+    
+    sql = ("SELECT " + tranHour + ", tranDate, COUNT(*), SUM(tranAmount) "\
+           "FROM transactions "\
+           "WHERE userID=? ")
+    params = [str(uID)]
+    if firstDate != None:
+        sql += "AND tranDate BETWEEN ? AND ? "
+        params += [convertDate(firstDate), convertDate(secDate)]
+    sql += "GROUP BY " + tranHour + ", tranDate"
+    
+    return (sql, params)
+
+
+def bumpDataVersion(uID=None, amtDelta=None, spend=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Records that a user's expense data has changed by
+                    adding 1 to their data version, so cached reports
+                    built from the old data are never used again (see
+                    getRepData). With no userID (e.g. a Category has
+                    been renamed or merged) every cached report, period
+                    total, Category statistic and budget is discarded.
+                    If the change in the user's expenses total is known
+                    it is applied to their cached total (see budSummary)
+                    instead of the total being read again, and likewise
+                    the amounts added to or taken off each Category and
+                    date are applied to their period totals (see
+                    getPeriodTotals) and Category statistics (see
+                    getCatStats).
+    Args:           uID (string): the userID whose data changed, or
+                    None if the change affects all users
+                    amtDelta (float): the change in the user's total
+                    expenses, or None if not known
+                    spend (list): (catID, tranDate, amount) for each
+                    amount added (or taken off, if negative), or None
+                    if not known
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    global repCacheBytes, globalVersion
+    with cacheLock:
+        if uID == None:
+            globalVersion += 1
+            repCache.clear()
+            repCacheBytes = 0
+            periodTotals.clear()
+            catStats.clear()
+            budRules.clear()
+        else:
+            uID = str(uID)
+            oldVersion = dataVersions.get(uID, 0)
+            dataVersions[uID] = oldVersion + 1
+            
+            # Carry an up to date budget total forward to the new version
+            cached = budTotals.get(uID)
+            if amtDelta != None and cached != None and cached[0] == oldVersion:
+                budTotals[uID] = [oldVersion + 1, cached[1] + amtDelta, cached[2]]
+            cached = periodTotals.get(uID)
+            if spend != None and cached != None and cached[0] == oldVersion:
+                for catID, tranDate, amount in spend:
+                    addSpend(cached[1], catID, tranDate, amount)
+                cached[0] = oldVersion + 1
+            cached = catStats.get(uID)
+            if spend != None and cached != None and cached[0] == oldVersion:
+                for catID, tranDate, amount in spend:
+                    addStat(cached[1], catID, amount)
+                cached[0] = oldVersion + 1
+            # Free the memory held by this user's out of date reports
+            for key in [key for key in repCache if key[0] == uID]:
+                repCacheBytes -= repCache.pop(key)[1]
+    
+    return
+
+
+def getRepData(repType, uID, sql):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gets the rows for a report, serving them from the
+                    report cache when the same report has already been
+                    run on the user's current data. The cache is keyed
+                    on the userID, report type, report SQL (which holds
+                    the report's search values) and the user's data
+                    version, so any change made through this program
+                    makes the old entries unreachable. The least 
+                    recently used reports are dropped when the cache
+                    grows past its memory limit.
+                    If the user's budget figures are not cached either
+                    they are read in the same batch as the report (see
+                    getDataSets), so the report and its budget summary
+                    cost one round trip to the database.
+    Args:           repType (string): 'all', 'cat', 'date' or 'time'
+                    uID (string): the userID the report is for
+                    sql (string): the report SELECT statement (see 
+                    getRepSQL)
+    Returns:        reportData: a fresh copy of the report rows as a
+                    list of lists, or None if the database could not 
+                    be read
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    key, rows, sqlList = findRepData(repType, uID, sql)
+
+    if rows == None:
+        # Read the report rows, and the budget figures if needed,
+        # in one batch
+        rowSets = getDataSets(sqlList)
+        if rowSets == None:
+            return None
+        rows = storeRepData(key, rowSets)
+
+    # Hand back a copy the caller is free to reformat
+    return ([list(row) for row in rows])
+
+
+async def getRepDataAsync(repType, uID, sql):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The async version of getRepData, sharing its cache.
+    Args:           repType (string): 'all', 'cat', 'date' or 'time'
+                    uID (string): the userID the report is for
+                    sql (string): the report SELECT statement (see 
+                    getRepSQL)
+    Returns:        reportData: a fresh copy of the report rows as a
+                    list of lists, or None if the database could not 
+                    be read
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    key, rows, sqlList = findRepData(repType, uID, sql)
+
+    if rows == None:
+        rowSets = await getDataSetsAsync(sqlList)
+        if rowSets == None:
+            return None
+        rows = storeRepData(key, rowSets)
+
+    return ([list(row) for row in rows])
+
+
+def findRepData(repType, uID, sql):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Looks a report up in the report cache for the
+                    user's current data version (see getRepData).
+    Args:           repType (string): 'all', 'cat', 'date' or 'time'
+                    uID (string): the userID the report is for
+                    sql (string): the report SELECT statement
+    Returns:        key (tuple): the report's cache key
+                    rows (tuple): the cached rows, or None if the
+                    report is not cached
+                    sqlList (list): the statements to read the report
+                    with, including the budget figures if they are not
+                    cached either
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    uID = str(uID)
+    rows = None
+
+    # Read the data version before the query, so a change made while
+    # the query runs leaves this result under an out of date key
+    with cacheLock:
+        version = dataVersions.get(uID, 0)
+        key = (uID, repType, sql, version, globalVersion)
+        cached = repCache.get(key)
+        if cached != None:
+            repCache.move_to_end(key)
+            rows = cached[0]
+        budCached = budTotals.get(uID)
+        needBud = budCached == None or budCached[0] != version
+
+    sqlList = [sql]
+    if needBud:
+        sqlList.append(getBudSQL(uID))
+    
+    return (key, rows, sqlList)
+
+
+def storeRepData(key, rowSets):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Stores report rows read from the database in the
+                    report cache, along with the budget figures if they
+                    were read too (see findRepData).
+    Args:           key (tuple): the report's cache key
+                    rowSets (list): the report rows, then the budget
+                    figures if they were asked for
+    Returns:        rows (tuple): the report rows as tuples
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    global repCacheBytes
+    uID, version = key[0], key[3]
+    if len(rowSets) > 1 and rowSets[1] != []:
+        storeBudTotal(uID, version, rowSets[1][0])
+    
+    # Store the rows as tuples so the cached copy cannot be changed
+    rows = tuple(tuple(row) for row in rowSets[0])
+    rowBytes = sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows)
+    
+    with cacheLock:
+        # Very large reports are not worth caching
+        if rowBytes <= maxCacheBytes and key not in repCache:
+            repCache[key] = (rows, rowBytes)
+            repCacheBytes += rowBytes
+            # Drop the least recently used reports until under the limit
+            while repCacheBytes > maxCacheBytes:
+                repCacheBytes -= repCache.popitem(last=False)[1][1]
+    
+    return (rows)
+
+
+def getRepHead(repType):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the heading written at the top of a saved
+                    report file.
+    Args:           repType (string): 'all', 'cat', 'date', 'time',
+                    'pivot' or 'hour'
+    Returns:        repHead (string): the report heading
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    titles = {'all': "\t \t \t \t   ALL EXPENSES REPORT",
+              'cat': "\t \t \t   EXPENSES BY CATEGORY REPORT",
+              'date': "\t \t \t   EXPENSES BY DATE REPORT",
+              'time': "\t \t \t   EXPENSES BY TIME REPORT",
+              'pivot': "\t \t     EXPENSES BY CATEGORY AND MONTH REPORT",
+              'hour': "\t \t   SPENDING BY HOUR AND WEEKDAY REPORT"}
+    repHead = "========================================================================" \
+              + "\n" + titles[repType] + "\n" \
+              + "========================================================================" \
+              + "\n"
+    
+    return (repHead)
+
+
+def buildReport(repType, reportData):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Fix the date and amount formats of the report rows
+                    and build the report table (see tables.py). The
+                    Category, Date and Time reports also
+                    get a total of the transaction amounts.
+    Args:           repType (string): 'all', 'cat', 'date' or 'time'
+                    reportData: the rows returned by the report SQL
+                    (see getRepSQL)
+    Returns:        report (string): the report text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    totalTrans = 0
+    
+    # Cycle through the reportData list and fix date and amount format 
+    for data in reportData:
+        # Get a running total of the transaction amounts
+        totalTrans += data[4]
+        # fix the date format to read dd-mm-yyyy
+        data[0] = fixDate(data[0])
+        # fix the amount format to be currency with 2 decimal places
+        data[4] = fixAmt(data[4])
+
+    # Build the report table, sized to fit the report's rows
+    widths = tables.fitWidths(reportData, tables.reportColumns)
+    report = "\n".join(tables.tableLines(reportData, tables.reportColumns, widths=widths))
+
+    # Add the total for the searched reports
+    totalLabels = {'cat': 'Your Expenses under this category total: ',
+                   'date': 'Your Expenses between these dates total: ',
+                   'time': 'Your Expenses between these times total: '}
+    if repType in totalLabels:
+        report += ('\n\n' + totalLabels[repType] + str(fixAmt(totalTrans)))
+    
+    return (report)
+
+
+def buildPivot(pivotData):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Lays out the rows returned by getPivotSQL as a
+                    table with a row for each Category and a column for
+                    each month. The Category totals, the month totals
+                    and the overall total are added up in the same
+                    single pass over the rows.
+    Args:           pivotData: the rows returned by getPivotSQL
+    Returns:        months (list): the months reported on (yyyy-mm)
+                    pivotRows (list): the Category name, the amount
+                    spent in each month (None if nothing was spent) and
+                    the Category total for each Category, followed by
+                    a 'Total' row of the month totals
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    cells = {}
+    catTotals = {}
+    monthTotals = {}
+    grandTotal = 0
+    
+    # Add each amount to its cell and to its Category and month totals
+    for catName, tranMonth, amount in pivotData:
+        catName = catName.strip()
+        amount = float(amount)
+        cells[(catName, tranMonth)] = amount
+        catTotals[catName] = catTotals.get(catName, 0) + amount
+        monthTotals[tranMonth] = monthTotals.get(tranMonth, 0) + amount
+        grandTotal += amount
+    
+    months = sorted(monthTotals)
+    pivotRows = [[catName] + [cells.get((catName, tranMonth)) for tranMonth in months] + [catTotals[catName]]
+                 for catName in sorted(catTotals)]
+    pivotRows.append(['Total'] + [monthTotals[tranMonth] for tranMonth in months] + [grandTotal])
+    
+    return (months, pivotRows)
 
-    # Request the data from the database
-    reportData = getData(sql)
 
-    # Cycle through the reportData list and fix date and amount format 
-    for data in reportData:
-        # fix the date format to read dd-mm-yyyy
-        data[0] = fixDate(data[0])
-        # fix the amount format to be currency with 2 decimal places
-        data[4] = fixAmt(data[4])
+def pivotReport(months, pivotRows):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the Category by month report table (see
+                    tables.py) from the output of buildPivot, with the
+                    months shown as mm-yyyy and the amounts as currency.
+    Args:           months (list): the months reported on (yyyy-mm)
+                    pivotRows (list): the table rows (see buildPivot)
+    Returns:        report (string): the report text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    columns = (('Category', 30, 'left'),) \
+              + tuple((tranMonth[5:] + '-' + tranMonth[:4], 12, 'right') for tranMonth in months) \
+              + (('Total', 12, 'right'),)
+    rows = [[row[0]] + [fixAmt(amount) if amount != None else '' for amount in row[1:]] for row in pivotRows]
+    
+    # Rule off the totals row from the Category rows
+    widths = tables.fitWidths(rows, columns)
+    lines = list(tables.tableLines(rows, columns, widths=widths))
+    lines.insert(-2, lines[0])
+    
+    return ("\n".join(lines))
+
+
+def buildHourGrid(hourData):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds the rows returned by getHourSQL into a grid of
+                    24 hours by 7 weekdays. Each date's weekday is
+                    worked out once, however many hours it has
+                    transactions in, and each row is added straight
+                    into its cell.
+    Args:           hourData: the rows returned by getHourSQL
+    Returns:        amounts (list): 24 lists (one per hour) of the
+                    amount spent on each weekday, Monday first
+                    counts (list): the number of transactions in each
+                    hour
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    amounts = [[0.0] * 7 for hour in range(24)]
+    counts = [0] * 24
+    weekdays = {}
+    
+    for tranHour, tranDate, tranCount, amount in hourData:
+        weekday = weekdays.get(tranDate)
+        if weekday == None:
+            weekday = weekdays[tranDate] = date.fromisoformat(str(tranDate)[:10]).weekday()
+        hour = int(tranHour)
+        amounts[hour][weekday] += float(amount)
+        counts[hour] += tranCount
+    
+    return (amounts, counts)
+
+
+def hourReport(amounts, counts):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the spending by hour and weekday report table
+                    (see tables.py): a row for each hour with the
+                    amount spent on each weekday, the hour's total and
+                    number of transactions, and a bar showing the
+                    hour's share of the spending, followed by the
+                    weekday totals.
+    Args:           amounts (list): the amount spent in each hour on
+                    each weekday (see buildHourGrid)
+                    counts (list): the number of transactions in each
+                    hour
+    Returns:        report (string): the report text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    barWidth = 20
+    columns = (('Hour', 5, 'right'),) \
+              + tuple((dayName, 12, 'right') for dayName in dayNames) \
+              + (('Total', 12, 'right'), ('Count', 6, 'right'), ('Spending', barWidth, 'left'))
+    
+    hourTotals = [sum(dayAmounts) for dayAmounts in amounts]
+    dayTotals = [sum(dayAmounts[weekday] for dayAmounts in amounts) for weekday in range(7)]
+    grandTotal = sum(hourTotals)
+    largest = max(hourTotals) or 1
+    
+    rows = []
+    for hour in range(24):
+        rows.append(["{:02d}:00".format(hour)] \
+                    + [fixAmt(amount) if amount else '' for amount in amounts[hour]] \
+                    + [fixAmt(hourTotals[hour]), counts[hour], '#' * round(barWidth * hourTotals[hour] / largest)])
+    rows.append(['Total'] + [fixAmt(amount) for amount in dayTotals] + [fixAmt(grandTotal), sum(counts), ''])
+    
+    # Rule off the totals row from the hour rows
+    widths = tables.fitWidths(rows, columns)
+    lines = list(tables.tableLines(rows, columns, widths=widths))
+    lines.insert(-2, lines[0])
+    
+    return ("\n".join(lines))
+
+
+def exportRows(sql, fPathName):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs a report SQL statement and writes the raw 
+                    report rows to a file as they are read from the
+                    database cursor, one batch at a time, without
+                    building the text report. The file format is
+                    taken from the file extension: .csv, .jsonl
+                    (JSON Lines), or .parquet/.arrow (when the pyarrow
+                    module is installed).
+    Args:           sql (string): a report SELECT statement (see 
+                    getRepSQL)
+                    fPathName (string): the path of the file to write
+    Returns:        rowCount (int): the number of rows written, or None
+                    if the format is not available or the rows could
+                    not all be read (the file is then left as it was)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    ext = os.path.splitext(fPathName)[1].lower()
+
+    if ext in ('.parquet', '.arrow') and pyarrow == None:
+        print ('\nSaving as ' + ext + ' needs the pyarrow module. Please use .csv or .jsonl instead.')
+        return None
+    if ext not in exportFormats:
+        print ('\n' + ext + ' is not a raw data export format.')
+        return None
+
+    # Write to a temporary file that replaces the real file once complete
+    try:
+        with atomicFile(fPathName) as tmpPathName:
+            rowCount = writeRows(sql, tmpPathName, ext)
+    except RuntimeError as e:
+        print ('\n' + str(e) + '. The report data has not been saved.')
+        return None
+
+    return (rowCount)
+
+
+def writeRows(sql, fPathName, ext):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Streams the rows of a report SQL statement into a
+                    file in the requested raw data format (used by
+                    exportRows).
+    Args:           sql (string): a report SELECT statement
+                    fPathName (string): the path of the file to write
+                    ext (string): '.csv', '.jsonl', '.parquet' or '.arrow'
+    Returns:        rowCount (int): the number of rows written
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rowCount = 0
+
+    # Write comma separated values with a header row
+    if ext == '.csv':
+        with open(fPathName, "w", newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(repColumns)
+            for rows in streamData(sql):
+                writer.writerows((str(row[0]), row[1], row[2], row[3], "{:.2f}".format(row[4])) for row in rows)
+                rowCount += len(rows)
+
+    # Write one JSON object per line
+    elif ext == '.jsonl':
+        with open(fPathName, "w") as file:
+            for rows in streamData(sql):
+                file.writelines(json.dumps({'tranDate': str(row[0]),
+                                            'tranTime': row[1],
+                                            'catName': row[2],
+                                            'tranDescription': row[3],
+                                            'tranAmount': round(float(row[4]), 2)}) + '\n' for row in rows)
+                rowCount += len(rows)
+
+    # Write columnar Parquet or Arrow IPC files, one record batch at a time
+    else:
+        schema = pyarrow.schema([('tranDate', pyarrow.date32()),
+                                 ('tranTime', pyarrow.string()),
+                                 ('catName', pyarrow.string()),
+                                 ('tranDescription', pyarrow.string()),
+                                 ('tranAmount', pyarrow.float64())])
+        if ext == '.parquet':
+            importlib.import_module('pyarrow.parquet')
+            writer = pyarrow.parquet.ParquetWriter(fPathName, schema)
+        else:
+            writer = pyarrow.ipc.new_file(fPathName, schema)
+        try:
+            for rows in streamData(sql):
+                batch = pyarrow.record_batch(
+                    [pyarrow.array([datetime.strptime(str(row[0]), '%Y-%m-%d').date() for row in rows], pyarrow.date32()),
+                     pyarrow.array([row[1] for row in rows], pyarrow.string()),
+                     pyarrow.array([row[2] for row in rows], pyarrow.string()),
+                     pyarrow.array([row[3] for row in rows], pyarrow.string()),
+                     pyarrow.array([float(row[4]) for row in rows], pyarrow.float64())],
+                    schema=schema)
+                if ext == '.parquet':
+                    writer.write_table(pyarrow.Table.from_batches([batch]))
+                else:
+                    writer.write_batch(batch)
+                rowCount += len(rows)
+        finally:
+            writer.close()
+
+    return (rowCount)
+
+
+def saveToFile (repHead, report, sql=None, writeCSV=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Accepts a report header and report content, requests
+                    a filename from the user and saves the report header,
+                    the report and budget information to an external
+                    file. If the filename has a raw data extension
+                    (.csv, .jsonl, .parquet, .arrow) the report rows
+                    are exported from the report SQL instead.
+    Args:           repHead: string (The report header)
+                    report: string (The report to save) 
+                    sql: string (The report SELECT statement, used
+                    for raw data exports)
+                    writeCSV: function (Writes the report's own rows
+                    to a .csv file and returns the row count, for
+                    reports that are not a list of transactions)
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+
+    filePath = "./Reports/"
+    # Check if ./Reports/ folder exists, if not, create it
+    os.makedirs(filePath, exist_ok=True)
+    # Get a valid filename to save file to
+    validFilename = False
+    while not validFilename:
+        fName = input ('\nEnter a filename for the report (.txt for the report, .csv/.jsonl/.parquet for raw data): ')
+        # test if this is a valid filename
+        if isValidFilename(fName):
+            validFilename = True
+        else:
+            print ('That is not a valid filename in Windows. Please try again.')
+    # Build the full file path
+    fPathName = filePath + fName
+
+    # Export the raw report rows for data file formats
+    _, ext = os.path.splitext(fName)
+    if writeCSV != None and ext.lower() == '.csv':
+        rowCount = writeCSV(fPathName)
+        print ('\nYour Report data (' + str(rowCount) + ' rows) has been written to ' + str(fPathName))
+        return
+    if sql != None and ext.lower() in exportFormats:
+        rowCount = exportRows(sql, fPathName)
+        if rowCount != None:
+            print ('\nYour Report data (' + str(rowCount) + ' rows) has been written to ' + str(fPathName))
+        return
+
+    # Overwrite (or create) the file with the report heading, the
+    # report and the budget summary
+    writeReport(fPathName, repHead, report, budSummary())
+    print ('\nYour Report has been written to ' + str(fPathName))
+    return
+
+
+
+def currTranRep():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds a report to output to the screen all
+                    the users current tranactions. Offer the user
+                    the ability to save report to an external file.
+    Args:           nil 
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t \t     ALL EXPENSES REPORT")
+    print ("========================================================================")
+    print ()
+
+    print ('This is a report of all your expenses to date:')
+    print ()
+
+    # Build a SQL SELECT statement to return all this users transactions
+    sql = getRepSQL('all', userID)
+
+    # Request the data from the report cache or the database
+    reportData = getRepData('all', userID, sql)
 
     if reportData != []:
         # Build the report for the user
-        headers = ['Date', 'Time', 'Category', 'Description', 'Amount']
-        report = tabulate(reportData, headers, tablefmt="pretty", colalign=("right", "right", "center", "left", "right"))
+        report = buildReport('all', reportData)
         # Provide the user with their Report and Budget information
         print (report)
         checkBud ()
@@ -1538,10 +4802,7 @@ def currTranRep():
         print ()
         print (report)
         print ()
-        repHead = "========================================================================" \
-                  + "\n" + "\t \t \t \t   ALL EXPENSES REPORT" + "\n" \
-                  + "========================================================================" \
-                  + "\n"
+        repHead = getRepHead('all')
         
         validSelection = False
         while not validSelection:
@@ -1549,7 +4810,7 @@ def currTranRep():
             if writeToFile == 'y':
                 validSelection = True
                 # write the Report header and report to a file
-                saveToFile (repHead, report)
+                saveToFile (repHead, report, sql)
             elif writeToFile == 'n':
                 validSelection = True
                 break
@@ -1610,36 +4871,15 @@ def tranByCatRep():
     
     # Build a SQL SELECT statement to return transactions for this user under the
     # requested Category
-    sql = ("SELECT tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND categories.catID=" + str(catID) + " "\
-            "ORDER BY tranDate;")
+    sql = getRepSQL('cat', userID, catID=catID)
 
-    # Request the data from the database
-    reportData = getData(sql)
-    
-    totalTrans = 0
+    # Request the data from the report cache or the database
+    reportData = getRepData('cat', userID, sql)
     
-    # Cycle through the reportData list and fix date and amount format 
-    for data in reportData:
-        # Get a running total of the transaction amounts for this category
-        totalTrans += data[4]
-        # fix the date format to read dd-mm-yyyy
-        data[0] = fixDate(data[0])
-        # fix the amount format to be currency with 2 decimal places
-        data[4] = fixAmt(data[4])
 
     if reportData != []:
-        # Build the report and its total using Tabulate module 
-        totalTrans = fixAmt(totalTrans)   
-        headers = ['Date', 'Time', 'Category', 'Description', 'Amount']
-        report = (tabulate(reportData, headers, tablefmt="pretty", colalign=("right", "right", "center", "left", "right")) \
-                + ('\n\n')\
-                + ('Your Expenses under this category total: ' + str(totalTrans)))
+        # Build the report and its total
+        report = buildReport('cat', reportData)
 
         # Clear the screen and provide the user with their Report 
         # and Budget information
@@ -1658,17 +4898,14 @@ def tranByCatRep():
         print ()
         print (report)
         print ()
-        repHead = "========================================================================" \
-                  + "\n" + "\t \t \t   EXPENSES BY CATEGORY REPORT" + "\n" \
-                  + "========================================================================" \
-                  + "\n"
+        repHead = getRepHead('cat')
         validSelection = False
         while not validSelection:
             writeToFile = input('Would you like to save this report to a file? (y/n): ')
             if writeToFile == 'y':
                 validSelection = True
                 # Write the report header and report to a file
-                saveToFile (repHead, report)
+                saveToFile (repHead, report, sql)
             elif writeToFile == 'n':
                 validSelection = True
                 break
@@ -1719,36 +4956,14 @@ def tranByDateRep():
             validDate = True
 
     # Build a SQL SELECT Statement to find transactions for this user between the given dates
-    sql = ("SET DATEFORMAT dmy;"\
-           "SELECT tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND tranDate BETWEEN '" + str(firstTranDate) + "' AND '" + str(secTranDate) + "' "\
-            "ORDER BY tranDate;")
+    sql = getRepSQL('date', userID, firstDate=firstTranDate, secDate=secTranDate)
 
-    # Request the data from the database
-    reportData = getData(sql)
-    totalTrans = 0
-    
-    # Cycle through the reportData list and fix date and amount format 
-    for data in reportData:
-        # Get a running total of the transaction amounts for this category
-        totalTrans += data[4]
-        # fix the date format to read dd-mm-yyyy
-        data[0] = fixDate(data[0])
-        # fix the amount format to be currency with 2 decimal places
-        data[4] = fixAmt(data[4])
+    # Request the data from the report cache or the database
+    reportData = getRepData('date', userID, sql)
 
     if reportData != []:
-        # Build the report and its total using Tabulate module
-        totalTrans = fixAmt(totalTrans)    
-        headers = ['Date', 'Time', 'Category', 'Description', 'Amount']    
-        report = (tabulate(reportData, headers, tablefmt="pretty", colalign=("right", "right", "center", "left", "right")) \
-                + ('\n\n')\
-                + ('Your Expenses between these dates total: ' + str(totalTrans)))
+        # Build the report and its total
+        report = buildReport('date', reportData)
 
         # Clear the screen and provide the user with their Report and Budget information
         clrScreen ()
@@ -1765,17 +4980,14 @@ def tranByDateRep():
         print ()
         print (report)
         print ()
-        repHead = "========================================================================" \
-                  + "\n" + "\t \t \t   EXPENSES BY DATE REPORT" + "\n" \
-                  + "========================================================================" \
-                  + "\n"
+        repHead = getRepHead('date')
         validSelection = False
         while not validSelection:
             writeToFile = input('Would you like to save this report to a file? (y/n): ')
             if writeToFile == 'y':
                 validSelection = True
                 # Write the report header and report to a file
-                saveToFile (repHead, report)
+                saveToFile (repHead, report, sql)
             elif writeToFile == 'n':
                 validSelection = True
                 break
@@ -1792,117 +5004,374 @@ def tranByDateRep():
     return # To repMenu
 
 
-def tranByTimeRep():
+def tranByTimeRep():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Ask the user for a date and a time range on that
+                    date. Present a report of all tranactions that
+                    occured for the current user. Offer the user the 
+                    ability to save the report to a file.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t \t \t  EXPENSES BY TIME REPORT")
+    print ("========================================================================")
+    print ()
+
+    print ('This report will provide your expenses between 2 specified times on ')
+    print ('a particular date.')
+    print ()
+
+    # Ask the user for report date and times and validate
+    validDate = False
+    while not validDate:
+        tranDate = input ('Please enter the date you wish to search (dd-mm-yyyy): ')
+        firstTranTime = input ('Please enter the starting time (hh:mm): ')
+        secTranTime = input ('Please enter the ending time (hh:mm): ')
+        if (firstTranTime > secTranTime) or not isValidTime (firstTranTime) or not isValidTime (secTranTime) or not isValidDate (tranDate):
+            print ('These are not valid date/times. Please try again.')
+        else:
+            validDate = True
+
+    # Build a SQL SELECT Statement to find transactions for this user between the given times
+    sql = getRepSQL('time', userID, firstDate=tranDate, firstTime=firstTranTime, secTime=secTranTime)
+
+    # Request the data from the report cache or the database
+    reportData = getRepData('time', userID, sql)
+
+    if reportData != []:
+        # Build the report and its total
+        report = buildReport('time', reportData)
+
+        # Clear the screen and provide the user with their Report and Budget information
+        clrScreen ()
+        print (report)
+        checkBud()
+        pause ()
+
+        # Offer the user the option of saving the report to a file
+        clrScreen ()
+        print ()
+        print ("========================================================================")
+        print ("\t \t     SAVE THE EXPENSES BY TIME REPORT")
+        print ("========================================================================")
+        print ()
+        print (report)
+        print ()
+        repHead = getRepHead('time')
+        validSelection = False
+        while not validSelection:
+            writeToFile = input('Would you like to save this report to a file? (y/n): ')
+            if writeToFile == 'y':
+                validSelection = True
+                # Write the report header and report to a file
+                saveToFile (repHead, report, sql)
+            elif writeToFile == 'n':
+                validSelection = True
+                break
+            else:
+                print('That is not a valid selection. Please try again.')
+    else:
+        print('There are no expense transactions between those times on that date.')
+
+    print()
+    pause()
+
+    # Clear the screen and return to a previous menu
+    clrScreen()
+    return # To repMenu
+
+
+
+def runReportJob(job):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs one queued report job on a worker thread. The
+                    report described by the job spec is built and saved
+                    under ./Reports/ as a text report (.txt) or as raw
+                    data (.csv, .jsonl, .parquet, .arrow). The job's 
+                    status, file, row count and run time are recorded 
+                    on the job as it goes.
+    Args:           job (dict): a job created by queueReports
+    Returns:        job (dict): the finished job
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    spec = job['spec']
+    job['status'] = 'running'
+    startTime = time.perf_counter()
+
+    try:
+        uID = spec['userID']
+        repType = spec['repType']
+        fmt = spec.get('format', '.txt')
+        sql = getRepSQL(repType, uID,
+                        catID=spec.get('catID'),
+                        firstDate=spec.get('firstDate'),
+                        secDate=spec.get('secDate'),
+                        firstTime=spec.get('firstTime'),
+                        secTime=spec.get('secTime'))
+
+        # Build a filename from the user, report type and date
+        fName = str(uID) + '_' + repType
+        if repType == 'cat':
+            fName += '_' + str(spec['catID'])
+        if repType in ('date', 'time'):
+            fName += '_' + convertDate(spec['firstDate']).replace('-', '')
+        if repType == 'date':
+            fName += '_' + convertDate(spec['secDate']).replace('-', '')
+        fPathName = "./Reports/" + fName + fmt
+
+        if fmt == '.txt':
+            # Build and save the text report with the budget summary
+            reportData = getRepData(repType, uID, sql)
+            if reportData == None:
+                raise RuntimeError('The report data could not be read from the database')
+            if reportData != []:
+                report = buildReport(repType, reportData)
+            else:
+                report = 'There are no expenses to report.'
+            writeReport(fPathName, getRepHead(repType), report, budSummary(uID))
+            job['rows'] = len(reportData)
+        else:
+            # Stream the raw report rows to the data file
+            rowCount = exportRows(sql, fPathName)
+            if rowCount == None:
+                raise RuntimeError('The ' + fmt + ' report data could not be saved')
+            job['rows'] = rowCount
+
+        job['file'] = fPathName
+        job['status'] = 'done'
+
+    except Exception as e:
+        job['error'] = str(e)
+        job['status'] = 'failed'
+
+    job['seconds'] = time.perf_counter() - startTime
+    
+    return (job)
+
+
+async def buildRepAsync(spec):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds a text report (and its budget summary) for a
+                    report spec without blocking the event loop.
+    Args:           spec (dict): the report to build (see queueReports)
+    Returns:        result (dict): the spec, the report's 'head',
+                    'report' and 'budget' text and its 'rows' count, or
+                    'error' if it could not be built
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    repType = spec['repType']
+    uID = spec['userID']
+    sql = getRepSQL(repType, uID,
+                    catID=spec.get('catID'),
+                    firstDate=spec.get('firstDate'),
+                    secDate=spec.get('secDate'),
+                    firstTime=spec.get('firstTime'),
+                    secTime=spec.get('secTime'))
+    
+    reportData = await getRepDataAsync(repType, uID, sql)
+    if reportData == None:
+        return ({'spec': spec, 'error': 'The report data could not be read from the database'})
+    if reportData != []:
+        report = buildReport(repType, reportData)
+    else:
+        report = 'There are no expenses to report.'
+    
+    return ({'spec': spec, 'head': getRepHead(repType), 'report': report,
+             'budget': await budSummaryAsync(uID), 'rows': len(reportData)})
+
+
+async def runReportsAsync(specs):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds several reports at once on the event loop.
+                    The reports' queries are independent, so they all
+                    wait on the database together instead of one after
+                    another.
+    Args:           specs (list): the reports to build (see queueReports)
+    Returns:        results (list): the built reports, in spec order
+                    (see buildRepAsync)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    return (list(await asyncio.gather(*[buildRepAsync(spec) for spec in specs])))
+
+
+def queueReports(specs, maxWorkers=4):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds report jobs to the background report queue.
+                    The jobs are run in parallel by a pool of worker
+                    threads, each using pooled database connections,
+                    while the user carries on using the menus. Use
+                    showReportJobs to see their progress.
+    Args:           specs (list): report job specs, each a dict with
+                    'repType' ('all', 'cat', 'date' or 'time'), 
+                    'userID', 'format' ('.txt', '.csv', '.jsonl', 
+                    '.parquet', '.arrow') and the report search values
+                    ('catID', 'firstDate', 'secDate', 'firstTime',
+                    'secTime') used by getRepSQL
+                    maxWorkers (int): the number of worker threads
+    Returns:        jobs (list): the queued jobs
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    global reportPool
+
+    # Start the worker threads the first time reports are queued
+    if reportPool == None:
+        import concurrent.futures
+        reportPool = concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='report')
+
+    # Check if ./Reports/ folder exists, if not, create it
+    os.makedirs("./Reports/", exist_ok=True)
+
+    jobs = []
+    for spec in specs:
+        job = {'spec': spec, 'status': 'queued', 'file': '', 'rows': 0, 'seconds': 0.0, 'error': ''}
+        jobs.append(job)
+        reportJobs.append(job)
+        job['future'] = reportPool.submit(runReportJob, job)
+    
+    return (jobs)
+
+
+def monthEndSpecs(firstDate, secDate, fmt='.txt'):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds the month-end report job specs for every
+                    user: the All Expenses report, a Category report
+                    for each category the user has expenses in, and
+                    a Date report between the dates given.
+    Args:           firstDate, secDate (dd-mm-yyyy): the date range
+                    fmt (string): the report file extension
+    Returns:        specs (list): report job specs for queueReports
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    specs = []
+    users = getData("SELECT userID FROM users ORDER BY userID")
+    
+    # Find the categories each user has expenses in with a single query
+    sql = ("SELECT DISTINCT userID, catID "\
+           "FROM transactions")
+    userCats = getData(sql)
+    
+    if users == None or userCats == None:
+        return (specs)
+
+    for user in users:
+        uID = str(user[0]).strip()
+        specs.append({'repType': 'all', 'userID': uID, 'format': fmt})
+        for userCat in userCats:
+            if str(userCat[0]).strip() == uID:
+                specs.append({'repType': 'cat', 'userID': uID, 'catID': str(userCat[1]).strip(), 'format': fmt})
+        specs.append({'repType': 'date', 'userID': uID, 'firstDate': firstDate, 'secDate': secDate, 'format': fmt})
+    
+    return (specs)
+
+
+def monthEndRep():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Ask the user for a date and a time range on that
-                    date. Present a report of all tranactions that
-                    occured for the current user. Offer the user the 
-                    ability to save the report to a file.
+    Description:    Asks the user for a date range and file format and
+                    queues the month-end reports for every user to be
+                    built in the background (see queueReports).
     Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
-    # Import the current userID
-    global userID
     clrScreen ()
     print ()
     print ("========================================================================")
-    print ("\t \t \t  EXPENSES BY TIME REPORT")
+    print ("\t \t     MONTH-END REPORTS FOR ALL USERS")
     print ("========================================================================")
     print ()
 
-    print ('This report will provide your expenses between 2 specified times on ')
-    print ('a particular date.')
+    print ('This will build the All Expenses, Category and Date reports for every')
+    print ('user in the background and save them in the ./Reports/ folder.')
     print ()
 
-    # Ask the user for report date and times and validate
+    # Ask the user for report dates and validate
     validDate = False
     while not validDate:
-        tranDate = input ('Please enter the date you wish to search (dd-mm-yyyy): ')
-        firstTranTime = input ('Please enter the starting time (hh:mm): ')
-        secTranTime = input ('Please enter the ending time (hh:mm): ')
-        if (firstTranTime > secTranTime) or not isValidTime (firstTranTime) or not isValidTime (secTranTime) or not isValidDate (tranDate):
-            print ('These are not valid date/times. Please try again.')
+        firstTranDate = input ('First Date (dd-mm-yyyy): ')
+        secTranDate = input ('Second Date (dd-mm-yyyy): ')
+        if not isValidDate (firstTranDate) or not isValidDate (secTranDate) \
+           or convertDate (firstTranDate) > convertDate (secTranDate):
+            print ('These are not valid dates. Please try again.')
         else:
             validDate = True
 
-    # Build a SQL SELECT Statement to find transactions for this user between the given dates
-    sql = ("SET DATEFORMAT dmy;"\
-           "SELECT tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
-            "FROM userTransactions "\
-            "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "\
-            "INNER JOIN users on users.userID = userTransactions.userID "\
-            "INNER JOIN categories on transactions.catID = categories.catID "\
-            "WHERE users.userID=" + str(userID) + " "\
-            "AND tranDate='" + str(tranDate) + "' "\
-            "AND tranTime BETWEEN '" + str(firstTranTime) + "' AND '" + str(secTranTime) + "' "\
-            "ORDER BY tranDate;")
+    # Ask the user for the report file format
+    validFormat = False
+    while not validFormat:
+        fmt = input ('Report file format (.txt, .csv, .jsonl, .parquet, .arrow): ').lower()
+        if not fmt.startswith('.'):
+            fmt = '.' + fmt
+        if fmt == '.txt' or fmt in exportFormats:
+            validFormat = True
+        else:
+            print ('That is not a valid report format. Please try again.')
 
-    # Request the data from the database
-    reportData = getData(sql)
-    totalTrans = 0
-    
-    # Cycle through the reportData list and fix date and amount format 
-    for data in reportData:
-        # Get a running total of the transaction amounts for this category
-        totalTrans += data[4]
-        # fix the date format to read dd-mm-yyyy
-        data[0] = fixDate(data[0])
-        # fix the amount format to be currency with 2 decimal places
-        data[4] = fixAmt(data[4])
+    jobs = queueReports(monthEndSpecs(firstTranDate, secTranDate, fmt))
+    print ()
+    print (str(len(jobs)) + ' reports have been queued. Use the Report Jobs option to check their progress.')
+    print ()
+    pause ()
 
-    if reportData != []:
-        # Build the report and its total using Tabulate module
-        totalTrans = fixAmt(totalTrans)    
-        headers = ['Date', 'Time', 'Category', 'Description', 'Amount']    
-        report = (tabulate(reportData, headers, tablefmt="pretty", colalign=("right", "right", "center", "left", "right")) \
-                + ('\n\n')\
-                + ('Your Expenses between these times total: ' + str(totalTrans)))
+    # Clear the screen and return to a previous menu
+    clrScreen()
+    return # To repMenu
 
-        # Clear the screen and provide the user with their Report and Budget information
-        clrScreen ()
-        print (report)
-        checkBud()
-        pause ()
 
-        # Offer the user the option of saving the report to a file
-        clrScreen ()
-        print ()
-        print ("========================================================================")
-        print ("\t \t     SAVE THE EXPENSES BY TIME REPORT")
-        print ("========================================================================")
-        print ()
-        print (report)
-        print ()
-        repHead = "========================================================================" \
-                  + "\n" + "\t \t \t   EXPENSES BY TIME REPORT" + "\n" \
-                  + "========================================================================" \
-                  + "\n"
-        validSelection = False
-        while not validSelection:
-            writeToFile = input('Would you like to save this report to a file? (y/n): ')
-            if writeToFile == 'y':
-                validSelection = True
-                # Write the report header and report to a file
-                saveToFile (repHead, report)
-            elif writeToFile == 'n':
-                validSelection = True
-                break
-            else:
-                print('That is not a valid selection. Please try again.')
-    else:
-        print('There are no expense transactions between those times on that date.')
+def showReportJobs():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Displays the progress of the background report 
+                    jobs, with the status, file, row count and run
+                    time of each job.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t \t \t  REPORT JOB PROGRESS")
+    print ("========================================================================")
+    print ()
 
-    print()
-    pause()
+    if reportJobs == []:
+        print ('There are no report jobs.')
+    else:
+        jobRows = []
+        finished = 0
+        for job in reportJobs:
+            spec = job['spec']
+            if job['status'] in ('done', 'failed'):
+                finished += 1
+            jobRows.append([spec['userID'], spec['repType'], job['status'], job['file'] or job['error'],
+                            job['rows'], "{:.2f}s".format(job['seconds'])])
+        headers = ['User', 'Report', 'Status', 'File', 'Rows', 'Time']
+        from tabulate import tabulate
+        print (tabulate(jobRows, headers, tablefmt="simple"))
+        print ()
+        print (str(finished) + ' of ' + str(len(reportJobs)) + ' report jobs finished.')
+    
+    print ()
+    pause ()
 
     # Clear the screen and return to a previous menu
     clrScreen()
     return # To repMenu
 
 
-
 def topLevelMenu():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -1926,6 +5395,8 @@ def topLevelMenu():
         print ('\t (C)ATEGORIES')
         print ('\t (B)UDGET')
         print ('\t (R)EPORTS')
+        if replicaDB != "":
+            print ('\t (S)YNC with the Azure database')
         print ('\t (Q)UIT')
         print ()
 
@@ -1939,8 +5410,13 @@ def topLevelMenu():
             budMenu()
         elif menuChoice.lower() == 'r':
             repMenu()
+        elif menuChoice.lower() == 's' and replicaDB != "":
+            syncReplica(userID)
+            pause()
         elif menuChoice.lower() == 'q':
             validChoice = True
+            # Send any changes still waiting in the replica
+            syncReplica(userID)
             print ()
             print ('Goodbye')
             exit()
@@ -1969,6 +5445,7 @@ def transMenu():
         print ('Press:')
         print ("\t (A)DD a new expense transaction")
         print ('\t (S)EARCH your expense transactions')
+        print ('\t (P)ERIODIC expense transactions (rent, subscriptions...)')
         print ('\t (R)ETURN to previous menu')
         print ()
         
@@ -1978,6 +5455,8 @@ def transMenu():
             addTrans()
         elif menuChoice.lower() == 's':
             searchTransMenu()
+        elif menuChoice.lower() == 'p':
+            recurMenu()
         elif menuChoice.lower() == 'r':
             break
         else:
@@ -1988,6 +5467,55 @@ def transMenu():
     return # To topLevelMenu
 
 
+def recurMenu():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    A sub-menu allowing users to ADD or DELETE
+                    recurring transactions, or add the ones that have
+                    fallen due now (they are also added at login).
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    validChoice = False
+    while not validChoice:
+        clrScreen()
+        print ()
+        print ("========================================================================")
+        print ("\t \t RECURRING EXPENSE TRANSACTIONS")
+        print ("========================================================================")
+        # Display the menu options
+        print ("\n")
+        print ('Press:')
+        print ('\t (A)DD a weekly, monthly or yearly expense transaction')
+        print ('\t (D)ELETE a recurring expense transaction')
+        print ('\t (G)ENERATE the expense transactions that have fallen due')
+        print ('\t (R)ETURN to previous menu')
+        print ()
+        
+        # Get a valid choice from the user
+        menuChoice = input('What would you like to do?: ')
+        if menuChoice.lower() == 'a':
+            if not replicaReadOnly('Recurring expense transactions'):
+                addRecurRule()
+        elif menuChoice.lower() == 'd':
+            if not replicaReadOnly('Recurring expense transactions'):
+                delRecurRule()
+        elif menuChoice.lower() == 'g':
+            added = addRecurringDue(userID)
+            if added != None:
+                print (str(added) + ' expense transaction(s) added.')
+            pause()
+        elif menuChoice.lower() == 'r':
+            break
+        else:
+            print ('Invalid Choice. Please try again.')
+    
+    # Clear Screen and Return to the previous menu
+    clrScreen()
+    return # To transMenu
+
+
 def searchTransMenu():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -2011,6 +5539,8 @@ def searchTransMenu():
         print ("\t (C)ATEGORY")
         print ('\t (D)ATE of the expense transaction')
         print ('\t (T)IME of the expense transaction')
+        print ('\t (W)ORDS in the description of the expense transaction')
+        print ('\t (A)DVANCED search on any mix of the above, amount and description')
         print ('\t (R)ETURN to previous menu')
         print ()
         
@@ -2022,6 +5552,10 @@ def searchTransMenu():
             searchByDateMenu()
         elif menuChoice.lower() == 't':
             searchByTimeMenu()            
+        elif menuChoice.lower() == 'w':
+            searchByDescMenu()
+        elif menuChoice.lower() == 'a':
+            searchByFieldsMenu()
         elif menuChoice.lower() == 'r':
             break
         else:
@@ -2069,12 +5603,18 @@ def searchByDateMenu():
     # Ask user if they want to amend any of the listed transactions
     validAns = False
     while not validAns:
-        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n): ')
+        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n, or b for BULK changes): ')
         if updateTrans.lower() == 'y':
             validAns = True
         elif updateTrans.lower() == 'n':
             validAns = True
             return # To searchTransMenu
+        elif updateTrans.lower() == 'b':
+            validAns = True
+            # Apply a single change to several of the listed transactions at once
+            bulkTransMenu(validTranIDs)
+            clrScreen()
+            return # To searchTransMenu
         else:
             print ('That is not a valid response. Please try again.')
 
@@ -2151,12 +5691,18 @@ def searchByTimeMenu():
     # Ask user if they want to amend any of the listed transactions
     validAns = False
     while not validAns:
-        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n): ')
+        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n, or b for BULK changes): ')
         if updateTrans.lower() == 'y':
             validAns = True
         elif updateTrans.lower() == 'n':
             validAns = True
             return # To searchTransMenu
+        elif updateTrans.lower() == 'b':
+            validAns = True
+            # Apply a single change to several of the listed transactions at once
+            bulkTransMenu(validTranIDs)
+            clrScreen()
+            return # To searchTransMenu
         else:
             print ('That is not a valid response. Please try again.')
 
@@ -2194,49 +5740,267 @@ def searchByTimeMenu():
     return # To searchTransMenu
 
 
-def searchByCatMenu():
+def searchByCatMenu():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Allow the user to search for transactions based
+                    on a valid category ID. Ask the user if they
+                    wish to UPDATE or DELETE one of the listed 
+                    transactions.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ("\t \t \t CATEGORY SEARCH MENU")
+    print ("========================================================================")
+    print ()
+    
+    # Get a list of valid transactions based on a category
+    validTranIDs = getTranByCat()
+    print ()
+        
+    # Check if there were any transactions returned
+    if validTranIDs == []:
+        print ('You have no Expense Transactions with that Category.')
+        print ()
+        pause ()
+        return # To searchTransMenu
+    elif validTranIDs == None:
+        print ('There are currently no Categories. Please use the Category menu to create some.')
+        print ()
+        pause ()
+        return # To searchTransMenu
+    
+    # Ask user if they want to amend any of the listed transactions
+    validAns = False
+    while not validAns:
+        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n, or b for BULK changes): ')
+        if updateTrans.lower() == 'y':
+            validAns = True
+        elif updateTrans.lower() == 'n':
+            validAns = True
+            return # To searchTransMenu
+        elif updateTrans.lower() == 'b':
+            validAns = True
+            # Apply a single change to several of the listed transactions at once
+            bulkTransMenu(validTranIDs)
+            clrScreen()
+            return # To searchTransMenu
+        else:
+            print ('That is not a valid response. Please try again.')
+
+    # Get the tranID the user wants to amend
+    validTranID = False
+    while not validTranID:
+        tranID = input('Enter the Expense Transaction ID you wish to adjust: ')
+        if tranID in validTranIDs:
+            validTranID = True
+        else:
+            print("That is not one of the available Expense Transactions. Please try again.")
+
+    # Present a menu selection allowing users to UPDATE or DELETE a transaction
+    validChoice = False
+    while not validChoice:   
+        print ()
+        print ('Press letter to change expense transaction ' + str(tranID) + ':')
+        print ()
+        print ('\t (U)PDATE an expense transaction')
+        print ('\t (D)ELETE an expense transaction')
+        print ('\t (R)ETURN to previous menu')
+        print ()
+         
+        menuChoice = input('What would you like to do?: ')
+        
+        if menuChoice.lower() == 'u':
+            # send the current tranID to be updated
+            updateByTranID(tranID)
+            validChoice = True
+        elif menuChoice.lower() == 'd':
+            # send the current tranID to be deleted
+            deleteByTranID(tranID) 
+            validChoice = True           
+        elif menuChoice.lower() == 'r':
+            # return to the previous menu
+            break
+        else:
+            print ('Invalid Choice. Please try again.')
+            clrScreen()
+    
+    # Clear Screen and Return to the previous menu
+    clrScreen()
+    return # To searchTransMenu
+
+
+def searchByFieldsMenu():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Search for transactions using any mix of 
+                    categories, date range, time range, amount range
+                    and description text in a single query, and allow
+                    the user to Update or Delete the transactions found.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # import the current UserID 
+    global userID
+
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ("\t \t \t ADVANCED SEARCH MENU")
+    print ("========================================================================")
+    print ()
+    print ('Enter any mix of search values. Leave a value blank to match everything.')
+    print ()
+    print ('Here are the available categories:')
+    print ()
+    validCats = showCats()
+    print ()
+
+    # Collect the search values from the user
+    criteria = {}
+    cats = askOptional('Category IDs separated by commas: ',
+                       lambda answer: all(catID.strip() in validCats for catID in answer.split(',')))
+    if cats != '':
+        criteria['cats'] = [catID.strip() for catID in cats.split(',')]
+    criteria['firstDate'] = askOptional('From date (dd-mm-yyyy): ', isValidDate)
+    criteria['secDate'] = askOptional('To date (dd-mm-yyyy): ', isValidDate)
+    criteria['firstTime'] = askOptional('From time (hh:mm): ', isValidTime)
+    criteria['secTime'] = askOptional('To time (hh:mm): ', isValidTime)
+    criteria['minAmt'] = askOptional('Minimum amount: $', isValidAmt)
+    criteria['maxAmt'] = askOptional('Maximum amount: $', isValidAmt)
+    criteria['descText'] = askOptional('Description contains: ', lambda answer: len(answer) <= 50)
+
+    # Search the database with one query and display the transactions found
+    clrScreen()
+    print ()
+    print ("========================================================================")
+    print ("\t \t    ADVANCED SEARCH RESULTS")
+    print ("========================================================================")
+    print ()
+    trans = searchTrans(userID, criteria)
+    validTranIDs = buildTrans(trans)
+    print ()
+
+    # Check if there were any transactions returned
+    if validTranIDs == []:
+        print ('You have no Expense Transactions matching that search.')
+        print ()
+        pause ()
+        return # To searchTransMenu
+
+    # Ask user if they want to amend any of the listed transactions
+    changeFoundTrans(validTranIDs, buildSearch(userID, criteria))
+
+    # Clear Screen and Return to the previous menu
+    clrScreen()
+    return # To searchTransMenu
+
+
+def searchByDescMenu():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    Description:    Allow the user to search for transactions based
-                    on a valid category ID. Ask the user if they
-                    wish to UPDATE or DELETE one of the listed 
-                    transactions.
+    Description:    Search for transactions by words in their 
+                    description (see searchDesc) and allow the user to
+                    Update or Delete the transactions found.
     Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     """
+    # import the current UserID 
+    global userID
+
     clrScreen()
     print ()
     print ("========================================================================")
-    print ("\t \t \t CATEGORY SEARCH MENU")
+    print ("\t \t \t DESCRIPTION SEARCH MENU")
     print ("========================================================================")
     print ()
-    
-    # Get a list of valid transactions based on a category
-    validTranIDs = getTranByCat()
+    print ('Enter the start of any words in the description (e.g. groc for Groceries).')
+    print ('Close spellings are also found.')
     print ()
-        
+
+    # Get some words to search for from the user
+    validText = False
+    while not validText:
+        textToSearch = input('Enter the words to search for: ')
+        if re.search(r'[A-Za-z0-9]', textToSearch) and len(textToSearch) <= 50:
+            validText = True
+        else:
+            print ('That is not a valid search. Please try again.')
+
+    # Search the description index and display the transactions found
+    startTime = time.perf_counter()
+    trans = searchDesc(userID, textToSearch)
+    searchTime = time.perf_counter() - startTime
+    print ()
+    validTranIDs = buildTrans(trans)
+    print ()
+
     # Check if there were any transactions returned
     if validTranIDs == []:
-        print ('You have no Expense Transactions with that Category.')
-        print ()
-        pause ()
-        return # To searchTransMenu
-    elif validTranIDs == None:
-        print ('There are currently no Categories. Please use the Category menu to create some.')
+        print ('You have no Expense Transactions with a description like that.')
         print ()
         pause ()
         return # To searchTransMenu
     
+    print (str(len(validTranIDs)) + ' expense transactions found in ' + "{:.1f}".format(searchTime * 1000) + ' ms.')
+    print ()
+
     # Ask user if they want to amend any of the listed transactions
+    changeFoundTrans(validTranIDs)
+
+    # Clear Screen and Return to the previous menu
+    clrScreen()
+    return # To searchTransMenu
+
+
+def changeFoundTrans(validTranIDs, search=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Ask the user if they want to change any of the 
+                    transactions found by a search, then UPDATE or
+                    DELETE one of them, or make BULK changes to several
+                    of them.
+    Args:           validTranIDs (list): tranIDs found by the search
+                    search (tuple): the (sql, params, plan) of the 
+                    search (see buildSearch), if the user may view it
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    prompt = 'Do you wish to UPDATE or DELETE one of these expense transactions? (y/n, b for BULK changes'
+    if search != None:
+        prompt += ', or p to see the search plan'
+    prompt += '): '
+
     validAns = False
     while not validAns:
-        updateTrans = input('Do you wish to UPDATE or DELETE one of these expense transactions? (y/n): ')
+        updateTrans = input(prompt)
         if updateTrans.lower() == 'y':
             validAns = True
         elif updateTrans.lower() == 'n':
             validAns = True
-            return # To searchTransMenu
+            return # To search menu
+        elif updateTrans.lower() == 'b':
+            validAns = True
+            # Apply a single change to several of the listed transactions at once
+            bulkTransMenu(validTranIDs)
+            return # To search menu
+        elif updateTrans.lower() == 'p' and search != None:
+            # Show how the search was sent to the database
+            sql, params, plan = search
+            print ()
+            print ('Search plan:')
+            for step, stepText in enumerate(plan, 1):
+                print ('\t ' + str(step) + '. ' + stepText)
+            print ()
+            print ('SQL: ' + sql)
+            print ('Parameters: ' + ', '.join(str(param) for param in params))
+            print ()
         else:
             print ('That is not a valid response. Please try again.')
 
@@ -2247,39 +6011,30 @@ def searchByCatMenu():
         if tranID in validTranIDs:
             validTranID = True
         else:
-            print("That is not one of the available Expense Transactions. Please try again.")
+            print ('That is not an available Expense Transaction ID for this search. Please try again.')
 
-    # Present a menu selection allowing users to UPDATE or DELETE a transaction
+    print ()
+    print ('Press letter to change expense transaction ' + str(tranID) + ':')
+    print ()
+    print ('\t (U)PDATE an expense transaction')
+    print ('\t (D)ELETE an expense transaction')
+    print ('\t (R)ETURN to previous menu')
+    print ()
     validChoice = False
-    while not validChoice:   
-        print ()
-        print ('Press letter to change expense transaction ' + str(tranID) + ':')
-        print ()
-        print ('\t (U)PDATE an expense transaction')
-        print ('\t (D)ELETE an expense transaction')
-        print ('\t (R)ETURN to previous menu')
-        print ()
-         
+    while not validChoice:
         menuChoice = input('What would you like to do?: ')
-        
         if menuChoice.lower() == 'u':
-            # send the current tranID to be updated
             updateByTranID(tranID)
             validChoice = True
         elif menuChoice.lower() == 'd':
-            # send the current tranID to be deleted
-            deleteByTranID(tranID) 
-            validChoice = True           
+            deleteByTranID(tranID)
+            validChoice = True
         elif menuChoice.lower() == 'r':
-            # return to the previous menu
             break
         else:
             print ('Invalid Choice. Please try again.')
-            clrScreen()
     
-    # Clear Screen and Return to the previous menu
-    clrScreen()
-    return # To searchTransMenu
+    return # To search menu
 
 
 def catMenu():
@@ -2303,7 +6058,7 @@ def catMenu():
         print ('Press:')
         print ("\t (A)DD a new category")
         print ('\t (U)PDATE a category name')
-        print ('\t (D)ELETE a category (if empty)')
+        print ('\t (D)ELETE a category (moving its transactions to another)')
         print ('\t (R)ETURN to previous menu')
         print ()
         menuChoice = input('What would you like to do?: ')
@@ -2328,7 +6083,8 @@ def budMenu():
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     Description:    Present a sub-menu to the user showing their current
                     budget amount and allowing them to request an
-                    UPDATE of the budget amount.
+                    UPDATE of the budget amount, or to ADD or DELETE
+                    Category and period budgets.
     Args:           nil
     Returns:        nil
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -2345,15 +6101,25 @@ def budMenu():
         print ('Your current budget is $', getBud())
         print ()
         print ('Press:')
-        print ('\t (C)HECK your budget against your total expense transactions')
+        print ('\t (C)HECK your budgets against your expense transactions')
         print ('\t (U)PDATE your budget amount')
+        print ('\t (A)DD a weekly, monthly or yearly budget (overall or for a Category)')
+        print ('\t (D)ELETE a weekly, monthly or yearly budget')
         print ('\t (R)ETURN to previous menu')
         print ()
         menuChoice = input('What would you like to do?: ')
         if menuChoice.lower() == 'u':
-            updateBud()
+            if not replicaReadOnly('Budgets'):
+                updateBud()
+        elif menuChoice.lower() == 'a':
+            if not replicaReadOnly('Budgets'):
+                addBudRule()
+        elif menuChoice.lower() == 'd':
+            if not replicaReadOnly('Budgets'):
+                delBudRule()
         elif menuChoice.lower() == 'c':
             checkBud()
+            print (forecastSummary(userID), end='')
             pause()
         elif menuChoice.lower() == 'r':
             break
@@ -2366,6 +6132,251 @@ def budMenu():
     return # To topLevelMenu
 
 
+def tranByCatMonthRep():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds a report of what the user spent in each
+                    Category in each month, with Category and month
+                    totals, for all dates or between dates entered.
+                    Offer the user the ability to save the report to
+                    an external file (.txt) or export the table (.csv).
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t       EXPENSES BY CATEGORY AND MONTH REPORT")
+    print ("========================================================================")
+    print ()
+
+    print ('This report will provide your expenses in each category for each month.')
+    print ('Leave the dates blank to report on all your expenses.')
+    print ()
+
+    # Ask the user for report dates (optional) and validate
+    validDate = False
+    while not validDate:
+        firstTranDate = input ('First Date (dd-mm-yyyy): ')
+        secTranDate = input ('Second Date (dd-mm-yyyy): ')
+        if firstTranDate == '' and secTranDate == '':
+            firstTranDate = secTranDate = None
+            validDate = True
+        elif not isValidDate (firstTranDate) or not isValidDate (secTranDate) \
+             or convertDate(firstTranDate) > convertDate(secTranDate):
+            print ('These are not valid dates. Please try again.')
+        else:
+            validDate = True
+
+    # Total every Category and month with one grouped query
+    sql, params = getPivotSQL(userID, firstDate=firstTranDate, secDate=secTranDate)
+    pivotData = getData(sql, params)
+
+    if pivotData:
+        # Lay out the table and its totals
+        months, pivotRows = buildPivot(pivotData)
+        report = pivotReport(months, pivotRows)
+
+        # Clear the screen and provide the user with their Report and Budget information
+        clrScreen ()
+        print (report)
+        checkBud()
+        pause ()
+
+        # Offer the user the option of saving the report to a file
+        clrScreen ()
+        print ()
+        print ("========================================================================")
+        print ("\t     SAVE THE EXPENSES BY CATEGORY AND MONTH REPORT")
+        print ("========================================================================")
+        print ()
+        print (report)
+        print ()
+        repHead = getRepHead('pivot')
+        validSelection = False
+        while not validSelection:
+            writeToFile = input('Would you like to save this report to a file? (y/n): ')
+            if writeToFile == 'y':
+                validSelection = True
+                # Write the report, or the table as CSV
+                saveToFile (repHead, report, writeCSV=lambda fPathName: writePivot(fPathName, months, pivotRows))
+            elif writeToFile == 'n':
+                validSelection = True
+                break
+            else:
+                print('That is not a valid selection. Please try again.')
+    else:
+        print ('There are no expense transactions to report on.')
+
+    print()
+    pause()
+ 
+    # Clear the screen and return to a previous menu
+    clrScreen()
+    return # To repMenu
+
+
+def tranByHourRep():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds a report of what the user spends in each
+                    hour of the day on each day of the week, for all
+                    dates or between dates entered. Offer the user the
+                    ability to save the report to an external file
+                    (.txt) or export the grid (.csv).
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t \t  SPENDING BY HOUR AND WEEKDAY REPORT")
+    print ("========================================================================")
+    print ()
+
+    print ('This report will show when you spend, by hour of the day and day of the week.')
+    print ('Leave the dates blank to report on all your expenses.')
+    print ()
+
+    # Ask the user for report dates (optional) and validate
+    validDate = False
+    while not validDate:
+        firstTranDate = input ('First Date (dd-mm-yyyy): ')
+        secTranDate = input ('Second Date (dd-mm-yyyy): ')
+        if firstTranDate == '' and secTranDate == '':
+            firstTranDate = secTranDate = None
+            validDate = True
+        elif not isValidDate (firstTranDate) or not isValidDate (secTranDate) \
+             or convertDate(firstTranDate) > convertDate(secTranDate):
+            print ('These are not valid dates. Please try again.')
+        else:
+            validDate = True
+
+    # Total each hour of each day with one grouped query
+    sql, params = getHourSQL(userID, firstDate=firstTranDate, secDate=secTranDate)
+    hourData = getData(sql, params)
+
+    if hourData:
+        # Add the days into weekdays and lay out the table
+        amounts, counts = buildHourGrid(hourData)
+        report = hourReport(amounts, counts)
+
+        # Clear the screen and provide the user with their Report
+        clrScreen ()
+        print (report)
+        pause ()
+
+        # Offer the user the option of saving the report to a file
+        clrScreen ()
+        print ()
+        print ("========================================================================")
+        print ("\t       SAVE THE SPENDING BY HOUR AND WEEKDAY REPORT")
+        print ("========================================================================")
+        print ()
+        print (report)
+        print ()
+        repHead = getRepHead('hour')
+        validSelection = False
+        while not validSelection:
+            writeToFile = input('Would you like to save this report to a file? (y/n): ')
+            if writeToFile == 'y':
+                validSelection = True
+                # Write the report, or the grid as CSV
+                saveToFile (repHead, report, writeCSV=lambda fPathName: writeHourGrid(fPathName, amounts, counts))
+            elif writeToFile == 'n':
+                validSelection = True
+                break
+            else:
+                print('That is not a valid selection. Please try again.')
+    else:
+        print ('There are no expense transactions to report on.')
+
+    print()
+    pause()
+ 
+    # Clear the screen and return to a previous menu
+    clrScreen()
+    return # To repMenu
+
+
+def dupTransRep():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the user's transactions that have been
+                    entered more than once (see scanDuplicates) and
+                    lists each group of them. Offer the user the option
+                    of DELETING the extra copies, keeping the first
+                    transaction in each group.
+    Args:           nil
+    Returns:        nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Import the current userID
+    global userID
+    clrScreen ()
+    print ()
+    print ("========================================================================")
+    print ("\t \t   DUPLICATE EXPENSE TRANSACTIONS")
+    print ("========================================================================")
+    print ()
+
+    print ('Please wait while your expense transactions are checked for duplicates.')
+    print ()
+    groups = scanDuplicates(userID)
+
+    if groups == None:
+        print ('Your expense transactions could not be checked. Please try again later.')
+    elif groups == []:
+        print ('You have no duplicate expense transactions.')
+    else:
+        # Show every transaction in the groups, one group after another
+        tranIDs = [tranID for group in groups for tranID in group]
+        if dbDialect() == 'mssql':
+            idList = "SELECT value FROM OPENJSON(?)"
+        else:
+            idList = "SELECT value FROM json_each(?)"
+        trans = getData("SELECT transactions.tranID, tranDate, tranTime, categories.catName, tranDescription, tranAmount "\
+                        "FROM transactions "\
+                        "INNER JOIN categories on transactions.catID = categories.catID "\
+                        "WHERE transactions.userID=? AND tranID IN (" + idList + ")",
+                        [str(userID), json.dumps(tranIDs)])
+        if trans == None:
+            print ('Your duplicate expense transactions could not be read. Please try again later.')
+        else:
+            tranOrder = {tranID: position for position, tranID in enumerate(tranIDs)}
+            buildTrans(sorted(trans, key=lambda tran: tranOrder[str(tran[0])]))
+            print ()
+            extraIDs = [tranID for group in groups for tranID in group[1:]]
+            print ('There are ' + str(len(groups)) + ' group(s) of duplicates, with ' + str(len(extraIDs)) + ' extra copies.')
+
+            validSelection = False
+            while not validSelection:
+                delDups = input('Would you like to DELETE the extra copies, keeping the first in each group? (y/n): ')
+                if delDups == 'y':
+                    validSelection = True
+                    if bulkDeleteTrans(extraIDs, userID) == None:
+                        print ('The extra copies could not be DELETED. Please try again later.')
+                    else:
+                        print ('The extra copies have been DELETED.')
+                elif delDups == 'n':
+                    validSelection = True
+                else:
+                    print('That is not a valid selection. Please try again.')
+
+    print()
+    pause()
+ 
+    # Clear the screen and return to a previous menu
+    clrScreen()
+    return # To repMenu
+
+
 def repMenu():
     """
     ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -2389,6 +6400,11 @@ def repMenu():
         print ('\t (2) Report on your expenses by category')
         print ('\t (3) Report on your expenses by date')
         print ('\t (4) Report on your expenses by time of day')
+        print ('\t (5) Queue month-end reports for all users')
+        print ('\t (6) Show the progress of queued report jobs')
+        print ('\t (7) Report on your expenses by category and month')
+        print ('\t (8) Report on your spending by hour and day of the week')
+        print ('\t (9) Find duplicate expense transactions')
         print ('\t (R)ETURN to previous menu')
         print ()
         menuChoice = input('What would you like to do?: ')
@@ -2404,6 +6420,16 @@ def repMenu():
         elif menuChoice.lower() == '4':
             #validChoice = True
             tranByTimeRep()
+        elif menuChoice.lower() == '5':
+            monthEndRep()
+        elif menuChoice.lower() == '6':
+            showReportJobs()
+        elif menuChoice.lower() == '7':
+            tranByCatMonthRep()
+        elif menuChoice.lower() == '8':
+            tranByHourRep()
+        elif menuChoice.lower() == '9':
+            dupTransRep()
         elif menuChoice.lower() == 'r':
             break
         else:
@@ -2415,34 +6441,57 @@ def repMenu():
     return # To topLevelMenu
 
 
-# Main
+def main():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs the expense tracker: the login screen and then
+                    the main menu. Importing this file does not start
+                    it, so other programs (server.py, migrate.py) and
+                    tools can use its functions.
+    Args:           Nil
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    # Bring the replica's users and categories up to date
+    syncReplica()
+    
+    validLogin = False
+    while not validLogin:
+        # Display the imported logo
+        clrScreen()
+        print (logo)
+        print ("========================================================================")
+        # Display the menu options
+        print ("\n")
+        print ('Press:')
+        print ("\t (L)OGIN to Expense Tracker")
+        print ('\t (C)REATE a new user')
+        print ('\t (Q)UIT')
+        print ()
+        login = input ("What would you like to do?: ")
+        if login.lower() == 'l':
+            currentUserID = loginUser()
+            validLogin = True
+            syncReplica(userID)
+            # Add any recurring transactions that have fallen due
+            added = addRecurringDue(userID)
+            if added:
+                print (str(added) + ' recurring expense transaction(s) have been added.')
+                pause()
+        elif login.lower() == 'c':
+            currentUserID = createUser()
+        elif login.lower() == 'q':
+            validLogin = True
+            print("Goodbye !")
+            exit()
+        else:
+            print ('Invalid Selection. Please try again.')
 
-validLogin = False
-while not validLogin:
-    # Display the imported logo
-    clrScreen()
-    print (logo)
-    print ("========================================================================")
-    # Display the menu options
-    print ("\n")
-    print ('Press:')
-    print ("\t (L)OGIN to Expense Tracker")
-    print ('\t (C)REATE a new user')
-    print ('\t (Q)UIT')
-    print ()
-    login = input ("What would you like to do?: ")
-    if login.lower() == 'l':
-        currentUserID = loginUser()
-        validLogin = True
-    elif login.lower() == 'c':
-        currentUserID = createUser()
-    elif login.lower() == 'q':
-        validLogin = True
-        print("Goodbye !")
-        exit()
-    else:
-        print ('Invalid Selection. Please try again.')
+    # Display the Top Level Menu of the system
+    topLevelMenu()
 
-# Display the Top Level Menu of the system
-topLevelMenu()
 
+# Main
+
+if __name__ == "__main__":
+    main()
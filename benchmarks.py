@@ -0,0 +1,424 @@
+'''
+-----------------------------------------------------------
+    Program Title: benchmarks.py
+    Description: Timing benchmarks for the database and reporting
+                 changes made to ExpenseTracker.py. Each benchmark
+                 builds its own test data in a local SQLite
+                 database (standing in for the Azure SQL database),
+                 so no network or database login is needed.
+    Usage:       python benchmarks.py           (owner queries)
+                 python benchmarks.py server    (API server load)
+                 python benchmarks.py tables    (report tables)
+                 python benchmarks.py startup   (import time budget)
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+# import modules
+import random
+import time
+import os
+import sys
+import json
+import socket
+import subprocess
+import tempfile
+import threading
+import http.client
+from datetime import date, timedelta
+import migrate
+import tables
+
+
+def buildTestDB(numUsers, tranPerUser, path=':memory:'):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds an in-memory SQLite copy of the expense
+                    tracker tables (from the migrations, see migrate.py)
+                    filled with random transactions.
+                    Transactions are created in date order across all
+                    users (as they would be entered), so each user's
+                    rows are spread throughout the table.
+    Args:           numUsers (int): the number of users
+                    tranPerUser (int): transactions for each user
+                    path (str): a database file to build instead
+    Returns:        conn: the SQLite connection
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    conn = migrate.newDatabase(path)
+    random.seed(1)
+    conn.executemany('INSERT INTO users VALUES (?, ?, ?, ?, ?)',
+                     [(str(1001 + i), 'pwd', 'Test', 'User', 5000.0) for i in range(numUsers)])
+    conn.executemany('INSERT INTO categories VALUES (?, ?)',
+                     [(str(1000 + i), 'Category ' + str(i)) for i in range(20)])
+
+    startDate = date(2020, 1, 1)
+    total = numUsers * tranPerUser
+    trans = []
+    links = []
+    for i in range(total):
+        tranID = str(1000 + i)
+        uID = str(1001 + random.randrange(numUsers))
+        tranDate = (startDate + timedelta(days=i * 1826 // total)).isoformat()
+        trans.append((tranID, uID, tranDate, '%02d:%02d' % (random.randrange(24), random.randrange(60)),
+                      str(1000 + random.randrange(20)), 'Expense ' + str(i % 997), round(random.uniform(1, 200), 2)))
+        links.append((uID, tranID))
+    conn.executemany('INSERT INTO transactions (tranID, userID, tranDate, tranTime, catID, tranDescription, tranAmount) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?)', trans)
+    conn.executemany('INSERT INTO userTransactions VALUES (?, ?)', links)
+    conn.commit()
+    
+    return (conn)
+
+
+def timeQueries(conn, queries, userIDs):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs each query once for every userID given and
+                    returns the average time per query.
+    Args:           conn: a SQLite connection
+                    queries (dict): query name -> (sql, extra params)
+                    userIDs (list): the userIDs to run the queries for
+    Returns:        times (dict): query name -> average milliseconds
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    times = {}
+    for name, (sql, extra) in queries.items():
+        startTime = time.perf_counter()
+        for uID in userIDs:
+            conn.execute(sql, [uID] + extra).fetchall()
+        times[name] = (time.perf_counter() - startTime) * 1000 / len(userIDs)
+    
+    return (times)
+
+
+def benchOwnerQueries(numUsers=1000, tranPerUser=1000):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Compares the per-user report, date range and budget
+                    queries joining userTransactions -> transactions ->
+                    users -> categories (ExpenseTracker.py 5.3) with
+                    the same queries reading transactions through the
+                    owner userID column and its (userID, tranDate) 
+                    index (ExpenseTracker.py 5.4).
+    Args:           numUsers (int): the number of users
+                    tranPerUser (int): transactions for each user
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    print ('Building ' + str(numUsers * tranPerUser) + ' transactions for ' + str(numUsers) + ' users...')
+    conn = buildTestDB(numUsers, tranPerUser)
+    userIDs = [str(1001 + random.randrange(numUsers)) for i in range(200)]
+    dateRange = ['2022-03-01', '2022-03-31']
+
+    joinFrom = ("FROM userTransactions "
+                "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "
+                "INNER JOIN users on users.userID = userTransactions.userID "
+                "INNER JOIN categories on transactions.catID = categories.catID "
+                "WHERE users.userID = ? ")
+    ownerFrom = ("FROM transactions "
+                 "INNER JOIN categories on transactions.catID = categories.catID "
+                 "WHERE transactions.userID = ? ")
+    columns = "SELECT tranDate, tranTime, categories.catName, tranDescription, tranAmount "
+    joinQueries = {'All expenses report': (columns + joinFrom + "ORDER BY tranDate", []),
+                   'Date range report': (columns + joinFrom + "AND tranDate BETWEEN ? AND ? ORDER BY tranDate", dateRange),
+                   'Budget total': ("SELECT tranAmount FROM userTransactions "
+                                    "INNER JOIN transactions on transactions.tranID = userTransactions.tranID "
+                                    "INNER JOIN users on users.userID = userTransactions.userID "
+                                    "WHERE users.userID = ?", [])}
+    ownerQueries = {'All expenses report': (columns + ownerFrom + "ORDER BY tranDate", []),
+                    'Date range report': (columns + ownerFrom + "AND tranDate BETWEEN ? AND ? ORDER BY tranDate", dateRange),
+                    'Budget total': ("SELECT SUM(tranAmount) FROM transactions WHERE userID = ?", [])}
+
+    # Time the 5.3 queries without the owner index they did not have
+    conn.execute('DROP INDEX IX_transactions_userID_tranDate')
+    joinTimes = timeQueries(conn, joinQueries, userIDs)
+    conn.execute('CREATE INDEX IX_transactions_userID_tranDate ON transactions (userID, tranDate)')
+    ownerTimes = timeQueries(conn, ownerQueries, userIDs)
+
+    print ()
+    print ('%-22s %14s %14s %9s' % ('Query (ms per user)', 'users join', 'owner userID', 'speed up'))
+    for name in joinQueries:
+        print ('%-22s %14.3f %14.3f %8.1fx' % (name, joinTimes[name], ownerTimes[name], joinTimes[name] / ownerTimes[name]))
+    print ()
+    conn.close()
+    
+    return
+
+
+def apiRequest(conn, method, path, body=None, token=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Sends one request to the API server on a kept-alive
+                    connection and reads its JSON answer.
+    Args:           conn (HTTPConnection): the connection to the server
+                    method (str): the HTTP method
+                    path (str): the path and query string
+                    body (dict): the JSON body to send, if any
+                    token (str): the login session token, if any
+    Returns:        status (int): the HTTP status
+                    payload: the JSON answer
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    headers = {'Content-Type': 'application/json'}
+    if token != None:
+        headers['Authorization'] = 'Bearer ' + token
+    conn.request(method, path, json.dumps(body) if body != None else None, headers)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+
+    return (response.status, payload)
+
+
+def loadClient(port, uID, deadline, results):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    One simulated user of the API server. Logs in and
+                    then sends a mix of searches, budget checks,
+                    reports and transaction changes until the deadline,
+                    recording how long each request takes.
+    Args:           port (int): the server's port
+                    uID (str): the userID to log in as
+                    deadline (float): the perf_counter time to stop at
+                    results (dict): request name -> list of seconds,
+                    with 'errors' counting failed requests
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rand = random.Random(uID)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    status, payload = apiRequest(conn, 'POST', '/login', {'userID': uID, 'password': 'pwd'})
+    token = payload['token']
+    added = []
+    times = {}
+    errors = 0
+
+    while time.perf_counter() < deadline:
+        pick = rand.random()
+        if pick < 0.35:
+            month = rand.randrange(1, 13)
+            name, method, path, body = 'search month', 'GET', '/transactions?firstDate=01-%02d-2022&secDate=28-%02d-2022' % (month, month), None
+        elif pick < 0.55:
+            name, method, path, body = 'budget', 'GET', '/budget', None
+        elif pick < 0.65:
+            name, method, path, body = 'categories', 'GET', '/categories', None
+        elif pick < 0.75:
+            name, method, path, body = 'report all', 'GET', '/reports/all', None
+        elif pick < 0.87 or added == []:
+            name, method, path = 'add', 'POST', '/transactions'
+            body = {'tranDate': '15-06-2024', 'tranTime': '12:30', 'catID': str(1000 + rand.randrange(20)),
+                    'tranDescription': 'Load test', 'tranAmount': '%.2f' % rand.uniform(1, 50)}
+        elif pick < 0.95:
+            name, method, path, body = 'update', 'PATCH', '/transactions/' + rand.choice(added), {'tranAmount': '%.2f' % rand.uniform(1, 50)}
+        else:
+            name, method, path, body = 'delete', 'DELETE', '/transactions/' + added.pop(), None
+
+        startTime = time.perf_counter()
+        status, payload = apiRequest(conn, method, path, body, token)
+        times.setdefault(name, []).append(time.perf_counter() - startTime)
+        if status >= 400:
+            errors += 1
+        elif name == 'add':
+            added.append(payload['tranID'])
+    conn.close()
+
+    with results['lock']:
+        for name, seconds in times.items():
+            results.setdefault(name, []).extend(seconds)
+        results['errors'] += errors
+
+    return
+
+
+def benchServer(numUsers=200, tranPerUser=200, clients=16, seconds=10):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Load tests the HTTP/JSON API server (server.py). The
+                    server is started in its own process on a local
+                    SQLite test database, then a number of simulated
+                    users (see loadClient) send it requests at once.
+                    Prints the requests per second the server answered
+                    and the average and 95th percentile time of each
+                    kind of request.
+    Args:           numUsers (int): the number of users in the database
+                    tranPerUser (int): transactions for each user
+                    clients (int): the number of users at once
+                    seconds (int): how long to run the test for
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    tempDir = tempfile.TemporaryDirectory()
+    dbFile = os.path.join(tempDir.name, 'expenses.db')
+    print ('Building ' + str(numUsers * tranPerUser) + ' transactions for ' + str(numUsers) + ' users...')
+    buildTestDB(numUsers, tranPerUser, dbFile).close()
+
+    # Find a free port and start the server on it
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    serverDir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, EXPENSE_TRACKER_DB=dbFile, EXPENSE_TRACKER_REPLICA='')
+    proc = subprocess.Popen([sys.executable, os.path.join(serverDir, 'server.py'), str(port)],
+                            cwd=serverDir, env=env, stdout=subprocess.DEVNULL)
+    try:
+        # Wait for the server to start listening
+        waitUntil = time.perf_counter() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                break
+            except OSError:
+                if proc.poll() != None or time.perf_counter() > waitUntil:
+                    print ('The API server did not start.')
+                    return
+                time.sleep(0.1)
+        
+        print ('Running ' + str(clients) + ' users against the API server for ' + str(seconds) + ' seconds...')
+        results = {'lock': threading.Lock(), 'errors': 0}
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=loadClient, args=(port, str(1001 + i % numUsers), deadline, results))
+                   for i in range(clients)]
+        startTime = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - startTime
+    finally:
+        proc.terminate()
+        proc.wait()
+        tempDir.cleanup()
+
+    total = sum(len(times) for name, times in results.items() if name not in ('lock', 'errors'))
+    print ()
+    print ('%-14s %9s %10s %10s' % ('Request', 'count', 'avg ms', 'p95 ms'))
+    for name in sorted(results):
+        if name in ('lock', 'errors'):
+            continue
+        times = sorted(results[name])
+        print ('%-14s %9d %10.2f %10.2f' % (name, len(times), sum(times) * 1000 / len(times),
+                                           times[int(len(times) * 0.95)] * 1000))
+    print ()
+    print ('%d requests in %.1f seconds: %.0f requests per second, %d errors' % (total, elapsed, total / elapsed, results['errors']))
+    print ()
+    
+    return
+
+
+def benchTables(numRows=100000):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Compares drawing a report table of random rows with
+                    tabulate (ExpenseTracker.py 6.2) and with tables.py,
+                    both sized to fit the rows (ExpenseTracker.py 6.3)
+                    and streamed with the fixed column widths. Checks
+                    that the fitted table is the same as tabulate's.
+    Args:           numRows (int): the number of report rows
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    from tabulate import tabulate
+
+    random.seed(1)
+    startDate = date(2020, 1, 1)
+    rows = [[(startDate + timedelta(days=i * 1826 // numRows)).strftime('%d-%m-%Y'),
+             '%02d:%02d' % (random.randrange(24), random.randrange(60)),
+             'Category ' + str(random.randrange(20)), 'Expense ' + str(i % 997),
+             '$%.2f' % random.uniform(1, 200)] for i in range(numRows)]
+    headers = [heading for heading, limit, align in tables.reportColumns]
+
+    startTime = time.perf_counter()
+    before = tabulate(rows, headers, tablefmt="pretty", colalign=("right", "right", "center", "left", "right"))
+    tabulateTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    after = "\n".join(tables.tableLines(rows, tables.reportColumns, widths=tables.fitWidths(rows, tables.reportColumns)))
+    fittedTime = time.perf_counter() - startTime
+
+    # Stream the fixed width table without keeping its lines
+    startTime = time.perf_counter()
+    for line in tables.tableLines(iter(rows), tables.reportColumns):
+        pass
+    streamTime = time.perf_counter() - startTime
+
+    print ()
+    print ('%-28s %10s %9s' % ('Report table (' + str(numRows) + ' rows)', 'seconds', 'speed up'))
+    print ('%-28s %10.3f %8.1fx' % ('tabulate "pretty"', tabulateTime, 1))
+    print ('%-28s %10.3f %8.1fx' % ('tables.py fitted widths', fittedTime, tabulateTime / fittedTime))
+    print ('%-28s %10.3f %8.1fx' % ('tables.py fixed widths', streamTime, tabulateTime / streamTime))
+    print ()
+    print ('Fitted table matches tabulate: ' + ('yes' if after == before else 'NO'))
+    print ()
+    
+    return
+
+
+def benchStartup(module='ExpenseTracker', budgetMs=100, runs=5):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Measures how long a module takes to import, with
+                    python -X importtime in a new process each run, and
+                    checks it against a time budget. Prints the best
+                    run and the slowest modules it imports directly.
+    Args:           module (str): the module to import
+                    budgetMs (int): the most milliseconds allowed
+                    runs (int): the number of runs (the fastest counts,
+                    the first one also writes the .pyc files)
+    Returns:        True if the import is within budget
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, EXPENSE_TRACKER_DB='', EXPENSE_TRACKER_REPLICA='')
+    best = None
+    for run in range(runs + 1):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                                cwd=moduleDir, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            print (result.stderr.strip().splitlines()[-1])
+            return False
+
+        # Lines are "import time: self | cumulative | name", with the
+        # name indented one level more for each level of import
+        times = {}
+        total = None
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or line.endswith('| imported package'):
+                continue
+            selfTime, cumulative, name = line[len('import time:'):].split('|')
+            if name.strip() == module and not name.startswith('   '):
+                total = int(cumulative) / 1000
+            elif name.startswith('   ') and not name.startswith('    '):
+                times[name.strip()] = int(cumulative) / 1000
+        if run > 0 and total != None and (best == None or total < best[0]):
+            best = (total, times)
+
+    total, times = best
+    print ()
+    print ('Importing ' + module + ': %.1f ms (budget %d ms)' % (total, budgetMs))
+    print ()
+    print ('%-24s %10s' % ('Slowest imports', 'ms'))
+    for name in sorted(times, key=times.get, reverse=True)[:8]:
+        print ('%-24s %10.1f' % (name, times[name]))
+    print ()
+    if total > budgetMs:
+        print ('OVER BUDGET: ' + module + ' takes %.1f ms to import.' % total)
+    else:
+        print ('Within budget.')
+    print ()
+    
+    return (total <= budgetMs)
+
+
+# Main
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'server':
+        benchServer()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'tables':
+        benchTables()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'startup':
+        if not benchStartup():
+            sys.exit(1)
+    else:
+        benchOwnerQueries()
@@ -0,0 +1,235 @@
+'''
+-----------------------------------------------------------
+    Program Title: migrate.py
+    Description: Versioned schema migrations for ExpenseTracker.py.
+                 Each change to the database schema (tables,
+                 columns, indexes and constraints) is a numbered
+                 SQL file in the migrations folder, with one copy
+                 for SQL Server (.mssql.sql) and one for the local
+                 SQLite database (.sqlite.sql):
+
+                     migrations/0001_base_schema.mssql.sql
+                     migrations/0001_base_schema.sqlite.sql
+
+                 The schema_version table records which migrations
+                 a database already has, so running this again only
+                 applies the new ones. Each migration is applied in
+                 its own transaction along with its schema_version
+                 row, so a failed migration leaves nothing behind.
+                 A migration containing the line
+
+                     -- migrate:no-transaction
+
+                 is run outside a transaction instead, for the few
+                 statements that SQL Server does not allow in one
+                 (e.g. ALTER DATABASE). Each of its steps must check
+                 whether it has already been done.
+    Usage:       python migrate.py                 (SQL Server)
+                 python migrate.py expenses.db     (SQLite file)
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+# import modules
+import os
+import re
+import sys
+import sqlite3
+from datetime import datetime
+
+
+# global variables
+migrationDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+migrationName = re.compile(r'^(\d{4})_(\w+)\.(mssql|sqlite)\.sql$')
+noTransaction = '-- migrate:no-transaction'
+
+
+def loadMigrations(dialect):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads the migration files for a database dialect
+                    from the migrations folder.
+    Args:           dialect (str): 'mssql' or 'sqlite'
+    Returns:        migrations (list): (version, name, sql) tuples in
+                    version order
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    migrations = []
+    for fileName in sorted(os.listdir(migrationDir)):
+        match = migrationName.match(fileName)
+        if match == None or match.group(3) != dialect:
+            continue
+        with open(os.path.join(migrationDir, fileName), encoding='utf-8') as file:
+            migrations.append((int(match.group(1)), match.group(2), file.read()))
+
+    return (migrations)
+
+
+def splitBatches(sql):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Splits a SQL Server script into the batches
+                    separated by GO lines (GO is a client command and
+                    cannot be sent to the server).
+    Args:           sql (str): the migration script
+    Returns:        batches (list): the non-empty batches
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    batches = re.split(r'^\s*GO\s*$', sql, flags=re.IGNORECASE | re.MULTILINE)
+
+    return ([batch for batch in batches if batch.strip() != ""])
+
+
+def appliedVersions(conn):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Creates the schema_version table if it does not
+                    exist and returns the migrations already applied.
+    Args:           conn: an open pyodbc or sqlite3 connection
+    Returns:        versions (set): the applied version numbers
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    cursor = conn.cursor()
+    if isinstance(conn, sqlite3.Connection):
+        cursor.execute("CREATE TABLE IF NOT EXISTS schema_version ("\
+                       "version INTEGER NOT NULL PRIMARY KEY, "\
+                       "name TEXT NOT NULL, "\
+                       "appliedOn TEXT NOT NULL)")
+    else:
+        cursor.execute("IF OBJECT_ID('dbo.schema_version', 'U') IS NULL "\
+                       "CREATE TABLE dbo.schema_version ("\
+                       "version INT NOT NULL PRIMARY KEY, "\
+                       "name VARCHAR(100) NOT NULL, "\
+                       "appliedOn DATETIME2 NOT NULL)")
+    conn.commit()
+    cursor.execute("SELECT version FROM schema_version")
+    versions = set(int(row[0]) for row in cursor.fetchall())
+    cursor.close()
+
+    return (versions)
+
+
+def applyMigration(conn, dialect, version, name, sql):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Applies one migration and records it in
+                    schema_version in a single transaction. If any
+                    statement fails the whole migration is rolled back.
+                    Migrations marked with noTransaction are run one
+                    statement at a time and only recorded once they
+                    have all succeeded.
+    Args:           conn: an open pyodbc or sqlite3 connection
+                    dialect (str): 'mssql' or 'sqlite'
+                    version (int): the migration number
+                    name (str): the migration name
+                    sql (str): the migration script
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    appliedOn = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    record = "INSERT INTO schema_version (version, name, appliedOn) VALUES (?, ?, ?)"
+    
+    if noTransaction in sql:
+        if dialect == 'sqlite':
+            conn.executescript(sql)
+        else:
+            conn.autocommit = True
+            try:
+                cursor = conn.cursor()
+                for batch in splitBatches(sql):
+                    cursor.execute(batch)
+                cursor.close()
+            finally:
+                conn.autocommit = False
+
+        cursor = conn.cursor()
+        cursor.execute(record, [version, name, appliedOn])
+        conn.commit()
+        cursor.close()
+        return
+    
+    try:
+        if dialect == 'sqlite':
+            # executescript() commits first and runs each statement as
+            # given, so the transaction is opened in the script itself
+            conn.executescript("BEGIN;\n" + sql + "\n;"\
+                               "INSERT INTO schema_version (version, name, appliedOn) "\
+                               "VALUES (" + str(version) + ", '" + name + "', '" + appliedOn + "');"\
+                               "COMMIT;")
+        else:
+            cursor = conn.cursor()
+            for batch in splitBatches(sql):
+                cursor.execute(batch)
+            cursor.execute(record, [version, name, appliedOn])
+            conn.commit()
+            cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return
+
+
+def migrate(conn, dialect, quiet=False):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Brings a database up to the latest schema by
+                    applying, in order, every migration it does not
+                    have yet.
+    Args:           conn: an open pyodbc or sqlite3 connection
+                    dialect (str): 'mssql' or 'sqlite'
+                    quiet (bool): True to not print progress
+    Returns:        applied (list): the version numbers applied
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    done = appliedVersions(conn)
+    applied = []
+    for version, name, sql in loadMigrations(dialect):
+        if version in done:
+            continue
+        if not quiet:
+            print ('Applying migration ' + '%04d' % version + ' ' + name + '...')
+        applyMigration(conn, dialect, version, name, sql)
+        applied.append(version)
+
+    return (applied)
+
+
+def newDatabase(path=':memory:'):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Opens (creating if needed) a SQLite database and
+                    migrates it to the latest schema. Used for the
+                    local database and for test/benchmark data.
+    Args:           path (str): the database file, or ':memory:'
+    Returns:        conn: the migrated sqlite3 connection
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    migrate(conn, 'sqlite', quiet=True)
+
+    return (conn)
+
+
+# Main
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        dialect = 'sqlite'
+        conn = sqlite3.connect(sys.argv[1])
+        conn.execute("PRAGMA foreign_keys = ON")
+    else:
+        from ExpenseTracker import connectDB
+        dialect = 'mssql'
+        conn = connectDB()
+        if conn == None:
+            sys.exit(1)
+
+    applied = migrate(conn, dialect)
+    if applied == []:
+        print ('Database schema is up to date.')
+    else:
+        print ('Applied ' + str(len(applied)) + ' migration(s).')
+    conn.close()
@@ -0,0 +1,41 @@
+/*
+    0001 - Base schema
+    The users, categories, transactions and userTransactions tables
+    used by ExpenseTracker.py. Tables that already exist are left as
+    they are, so this is safe on the original Exp_Tracker database.
+*/
+IF OBJECT_ID('dbo.users', 'U') IS NULL
+    CREATE TABLE dbo.users (
+        userID VARCHAR(10) NOT NULL PRIMARY KEY,
+        userPwd CHAR(20) NOT NULL,
+        fName VARCHAR(15) NOT NULL,
+        lName VARCHAR(15) NOT NULL,
+        userBudget DECIMAL(10, 2) NOT NULL
+    );
+GO
+
+IF OBJECT_ID('dbo.categories', 'U') IS NULL
+    CREATE TABLE dbo.categories (
+        catID VARCHAR(4) NOT NULL PRIMARY KEY,
+        catName VARCHAR(30) NOT NULL
+    );
+GO
+
+IF OBJECT_ID('dbo.transactions', 'U') IS NULL
+    CREATE TABLE dbo.transactions (
+        tranID VARCHAR(10) NOT NULL PRIMARY KEY,
+        tranDate DATE NOT NULL,
+        tranTime VARCHAR(5) NOT NULL,
+        catID VARCHAR(4) NOT NULL REFERENCES dbo.categories (catID),
+        tranDescription VARCHAR(50) NOT NULL,
+        tranAmount DECIMAL(10, 2) NOT NULL
+    );
+GO
+
+IF OBJECT_ID('dbo.userTransactions', 'U') IS NULL
+    CREATE TABLE dbo.userTransactions (
+        userID VARCHAR(10) NOT NULL REFERENCES dbo.users (userID),
+        tranID VARCHAR(10) NOT NULL REFERENCES dbo.transactions (tranID),
+        PRIMARY KEY (userID, tranID)
+    );
+GO
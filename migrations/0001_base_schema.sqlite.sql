@@ -0,0 +1,32 @@
+/*
+    0001 - Base schema
+    The users, categories, transactions and userTransactions tables
+    used by ExpenseTracker.py. Dates are stored as yyyy-mm-dd text.
+*/
+CREATE TABLE IF NOT EXISTS users (
+    userID TEXT NOT NULL PRIMARY KEY,
+    userPwd TEXT NOT NULL,
+    fName TEXT NOT NULL,
+    lName TEXT NOT NULL,
+    userBudget REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    catID TEXT NOT NULL PRIMARY KEY,
+    catName TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    tranID TEXT NOT NULL PRIMARY KEY,
+    tranDate TEXT NOT NULL,
+    tranTime TEXT NOT NULL,
+    catID TEXT NOT NULL REFERENCES categories (catID),
+    tranDescription TEXT NOT NULL,
+    tranAmount REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS userTransactions (
+    userID TEXT NOT NULL REFERENCES users (userID),
+    tranID TEXT NOT NULL REFERENCES transactions (tranID),
+    PRIMARY KEY (userID, tranID)
+);
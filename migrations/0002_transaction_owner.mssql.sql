@@ -0,0 +1,31 @@
+/*
+    0002 - Transaction owner
+    Adds an owner userID to every expense transaction so the per-user
+    queries in ExpenseTracker.py read a user's transactions with a
+    single index range on (userID, tranDate), instead of joining
+    userTransactions -> transactions -> users. The userTransactions
+    link table is still kept up to date by ExpenseTracker.py.
+    Each step is skipped if it has already been done by hand.
+*/
+IF COL_LENGTH('dbo.transactions', 'userID') IS NULL
+    ALTER TABLE dbo.transactions ADD userID VARCHAR(10) NULL REFERENCES dbo.users (userID);
+GO
+
+-- Copy each transaction's owner across from the link table
+UPDATE t
+SET t.userID = ut.userID
+FROM dbo.transactions t
+INNER JOIN dbo.userTransactions ut ON ut.tranID = t.tranID
+WHERE t.userID IS NULL;
+GO
+
+-- Reports and searches seek on userID and read in tranDate order.
+-- The other report columns are included so they are answered from
+-- the index alone.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_transactions_userID_tranDate'
+               AND object_id = OBJECT_ID('dbo.transactions'))
+    CREATE INDEX IX_transactions_userID_tranDate
+        ON dbo.transactions (userID, tranDate)
+        INCLUDE (tranTime, catID, tranDescription, tranAmount);
+GO
@@ -0,0 +1,16 @@
+/*
+    0002 - Transaction owner
+    Adds an owner userID to every expense transaction so the per-user
+    queries in ExpenseTracker.py read a user's transactions with a
+    single index range on (userID, tranDate).
+*/
+ALTER TABLE transactions ADD COLUMN userID TEXT REFERENCES users (userID);
+
+-- Copy each transaction's owner across from the link table
+UPDATE transactions
+SET userID = (SELECT userTransactions.userID FROM userTransactions
+              WHERE userTransactions.tranID = transactions.tranID)
+WHERE userID IS NULL;
+
+CREATE INDEX IF NOT EXISTS IX_transactions_userID_tranDate
+    ON transactions (userID, tranDate);
@@ -0,0 +1,25 @@
+/*
+    0003 - Lookup indexes and constraints
+    - transactions.catID: Category searches/reports and the check
+      for transactions before a Category is deleted
+    - userTransactions.tranID: deleting a transaction's user link
+    - categories.catName: Category names must be unique (addCat and
+      updateCat check this before saving)
+*/
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_transactions_catID'
+               AND object_id = OBJECT_ID('dbo.transactions'))
+    CREATE INDEX IX_transactions_catID ON dbo.transactions (catID);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_userTransactions_tranID'
+               AND object_id = OBJECT_ID('dbo.userTransactions'))
+    CREATE INDEX IX_userTransactions_tranID ON dbo.userTransactions (tranID);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'UX_categories_catName'
+               AND object_id = OBJECT_ID('dbo.categories'))
+    CREATE UNIQUE INDEX UX_categories_catName ON dbo.categories (catName);
+GO
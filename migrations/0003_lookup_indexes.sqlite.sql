@@ -0,0 +1,13 @@
+/*
+    0003 - Lookup indexes and constraints
+    - transactions.catID: Category searches/reports and the check
+      for transactions before a Category is deleted
+    - userTransactions.tranID: deleting a transaction's user link
+    - categories.catName: Category names must be unique (addCat and
+      updateCat check this before saving)
+*/
+CREATE INDEX IF NOT EXISTS IX_transactions_catID ON transactions (catID);
+
+CREATE INDEX IF NOT EXISTS IX_userTransactions_tranID ON userTransactions (tranID);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_categories_catName ON categories (catName);
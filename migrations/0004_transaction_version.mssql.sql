@@ -0,0 +1,11 @@
+/*
+    0004 - Transaction row version
+    tranVersion goes up by 1 every time ExpenseTracker.py changes a
+    transaction. An edit is only saved if the row still has the
+    version that was shown to the user, so a change made by someone
+    else in the meantime is detected rather than overwritten.
+*/
+IF COL_LENGTH('dbo.transactions', 'tranVersion') IS NULL
+    ALTER TABLE dbo.transactions ADD tranVersion INT NOT NULL
+        CONSTRAINT DF_transactions_tranVersion DEFAULT 1;
+GO
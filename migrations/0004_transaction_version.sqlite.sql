@@ -0,0 +1,8 @@
+/*
+    0004 - Transaction row version
+    tranVersion goes up by 1 every time ExpenseTracker.py changes a
+    transaction. An edit is only saved if the row still has the
+    version that was shown to the user, so a change made by someone
+    else in the meantime is detected rather than overwritten.
+*/
+ALTER TABLE transactions ADD COLUMN tranVersion INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,18 @@
+-- migrate:no-transaction
+/*
+    0005 - Change tracking
+    Turns on SQL Server change tracking for the transactions table,
+    so a local replica (see replica.py) can ask for just the 
+    transactions changed since it last synced. ALTER DATABASE cannot
+    run inside a transaction, so this migration runs without one.
+    Change tracking is used rather than triggers because SQL Server
+    does not allow OUTPUT (used by ExpenseTracker.py) on a table with
+    triggers.
+*/
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_databases WHERE database_id = DB_ID())
+    ALTER DATABASE CURRENT SET CHANGE_TRACKING = ON (CHANGE_RETENTION = 14 DAYS, AUTO_CLEANUP = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('dbo.transactions'))
+    ALTER TABLE dbo.transactions ENABLE CHANGE_TRACKING;
+GO
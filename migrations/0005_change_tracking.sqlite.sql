@@ -0,0 +1,32 @@
+/*
+    0005 - Change tracking
+    SQLite has no change tracking, so triggers record every change
+    to the transactions table in changeLog. When this database is
+    standing in for the server, a replica asks for the changes since
+    it last synced. In a replica (see replica.py), changeLog is the
+    journal of local changes waiting to be sent to the server.
+*/
+CREATE TABLE IF NOT EXISTS changeLog (
+    changeID INTEGER PRIMARY KEY AUTOINCREMENT,
+    tranID TEXT NOT NULL,
+    userID TEXT,
+    op TEXT NOT NULL,
+    changedOn TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS IX_changeLog_tranID ON changeLog (tranID);
+
+CREATE TRIGGER IF NOT EXISTS TR_transactions_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO changeLog (tranID, userID, op) VALUES (NEW.tranID, NEW.userID, 'I');
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_transactions_update AFTER UPDATE ON transactions
+BEGIN
+    INSERT INTO changeLog (tranID, userID, op) VALUES (NEW.tranID, NEW.userID, 'U');
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_transactions_delete AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO changeLog (tranID, userID, op) VALUES (OLD.tranID, OLD.userID, 'D');
+END;
@@ -0,0 +1,27 @@
+/*
+    0006 - Category and period budgets
+    Each user can have any number of budgets as well as the overall
+    users.userBudget: a weekly, monthly or yearly amount for one
+    Category (or for all their expenses when catID is NULL). With
+    rollover on, what is left of (or overspent on) each period since
+    startDate carries over into the next. A Category with budgets
+    cannot be deleted: its budgets are moved when it is merged into
+    another Category (0011 replaces the ON DELETE CASCADE below).
+*/
+IF OBJECT_ID('dbo.budgets', 'U') IS NULL
+    CREATE TABLE dbo.budgets (
+        budID INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+        userID VARCHAR(10) NOT NULL REFERENCES dbo.users (userID),
+        catID VARCHAR(4) NULL REFERENCES dbo.categories (catID) ON DELETE CASCADE,
+        budPeriod VARCHAR(5) NOT NULL CHECK (budPeriod IN ('week', 'month', 'year')),
+        budAmount DECIMAL(10, 2) NOT NULL CHECK (budAmount > 0),
+        rollover BIT NOT NULL DEFAULT 0,
+        startDate DATE NOT NULL
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_budgets_userID'
+               AND object_id = OBJECT_ID('dbo.budgets'))
+    CREATE INDEX IX_budgets_userID ON dbo.budgets (userID);
+GO
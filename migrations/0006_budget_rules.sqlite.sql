@@ -0,0 +1,21 @@
+/*
+    0006 - Category and period budgets
+    Each user can have any number of budgets as well as the overall
+    users.userBudget: a weekly, monthly or yearly amount for one
+    Category (or for all their expenses when catID is NULL). With
+    rollover on, what is left of (or overspent on) each period since
+    startDate carries over into the next. A Category with budgets
+    cannot be deleted: its budgets are moved when it is merged into
+    another Category (0011 replaces the ON DELETE CASCADE below).
+*/
+CREATE TABLE budgets (
+    budID INTEGER PRIMARY KEY,
+    userID TEXT NOT NULL REFERENCES users (userID),
+    catID TEXT NULL REFERENCES categories (catID) ON DELETE CASCADE,
+    budPeriod TEXT NOT NULL CHECK (budPeriod IN ('week', 'month', 'year')),
+    budAmount REAL NOT NULL CHECK (budAmount > 0),
+    rollover INTEGER NOT NULL DEFAULT 0,
+    startDate TEXT NOT NULL
+);
+
+CREATE INDEX IX_budgets_userID ON budgets (userID);
@@ -0,0 +1,14 @@
+/*
+    0007 - Time of day index
+    The spending by hour and weekday report reads every transaction a
+    user has made, grouped by the hour of tranTime. Seeking on userID
+    and reading in tranTime order, with the date and amount included,
+    answers it from the index alone.
+*/
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_transactions_userID_tranTime'
+               AND object_id = OBJECT_ID('dbo.transactions'))
+    CREATE INDEX IX_transactions_userID_tranTime
+        ON dbo.transactions (userID, tranTime)
+        INCLUDE (tranDate, tranAmount);
+GO
@@ -0,0 +1,9 @@
+/*
+    0007 - Time of day index
+    The spending by hour and weekday report reads every transaction a
+    user has made, grouped by the hour of tranTime. SQLite has no
+    INCLUDE, so the date and amount are added to the end of the key to
+    answer it from the index alone.
+*/
+CREATE INDEX IF NOT EXISTS IX_transactions_userID_tranTime
+    ON transactions (userID, tranTime, tranDate, tranAmount);
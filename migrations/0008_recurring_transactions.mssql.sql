@@ -0,0 +1,45 @@
+/*
+    0008 - Recurring transactions
+    A recurring transaction (rent, a subscription) is added for a user
+    every week, month or year from startDate, until endDate if it has
+    one. nextDate is the first occurrence not yet added to the
+    transactions table. Each transaction added for an occurrence has
+    a recKey (recID:yyyy-mm-dd), and recKey is unique, so adding the
+    same occurrence again (e.g. two logins at once) can never create
+    a duplicate. A Category with recurring transactions cannot be
+    deleted: they are moved when it is merged into another Category
+    (0011 replaces the ON DELETE CASCADE below).
+*/
+IF OBJECT_ID('dbo.recurring', 'U') IS NULL
+    CREATE TABLE dbo.recurring (
+        recID INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+        userID VARCHAR(10) NOT NULL REFERENCES dbo.users (userID),
+        catID VARCHAR(4) NOT NULL REFERENCES dbo.categories (catID) ON DELETE CASCADE,
+        recDescription VARCHAR(50) NOT NULL,
+        recAmount DECIMAL(10, 2) NOT NULL CHECK (recAmount > 0),
+        recPeriod VARCHAR(5) NOT NULL CHECK (recPeriod IN ('week', 'month', 'year')),
+        recTime VARCHAR(5) NOT NULL,
+        startDate DATE NOT NULL,
+        nextDate DATE NOT NULL,
+        endDate DATE NULL
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_recurring_userID'
+               AND object_id = OBJECT_ID('dbo.recurring'))
+    CREATE INDEX IX_recurring_userID ON dbo.recurring (userID);
+GO
+
+IF COL_LENGTH('dbo.transactions', 'recKey') IS NULL
+    ALTER TABLE dbo.transactions ADD recKey VARCHAR(30) NULL;
+GO
+
+-- Only transactions added from a recurring transaction have a recKey
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'UX_transactions_recKey'
+               AND object_id = OBJECT_ID('dbo.transactions'))
+    CREATE UNIQUE INDEX UX_transactions_recKey
+        ON dbo.transactions (recKey)
+        WHERE recKey IS NOT NULL;
+GO
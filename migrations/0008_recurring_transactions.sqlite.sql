@@ -0,0 +1,33 @@
+/*
+    0008 - Recurring transactions
+    A recurring transaction (rent, a subscription) is added for a user
+    every week, month or year from startDate, until endDate if it has
+    one. nextDate is the first occurrence not yet added to the
+    transactions table. Each transaction added for an occurrence has
+    a recKey (recID:yyyy-mm-dd), and recKey is unique, so adding the
+    same occurrence again can never create a duplicate. A Category
+    with recurring transactions cannot be deleted: they are moved when
+    it is merged into another Category (0011 replaces the ON DELETE
+    CASCADE below).
+*/
+CREATE TABLE recurring (
+    recID INTEGER PRIMARY KEY,
+    userID TEXT NOT NULL REFERENCES users (userID),
+    catID TEXT NOT NULL REFERENCES categories (catID) ON DELETE CASCADE,
+    recDescription TEXT NOT NULL,
+    recAmount REAL NOT NULL CHECK (recAmount > 0),
+    recPeriod TEXT NOT NULL CHECK (recPeriod IN ('week', 'month', 'year')),
+    recTime TEXT NOT NULL,
+    startDate TEXT NOT NULL,
+    nextDate TEXT NOT NULL,
+    endDate TEXT NULL
+);
+
+CREATE INDEX IX_recurring_userID ON recurring (userID);
+
+ALTER TABLE transactions ADD COLUMN recKey TEXT;
+
+-- Only transactions added from a recurring transaction have a recKey
+CREATE UNIQUE INDEX UX_transactions_recKey
+    ON transactions (recKey)
+    WHERE recKey IS NOT NULL;
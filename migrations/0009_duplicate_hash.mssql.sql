@@ -0,0 +1,18 @@
+/*
+    0009 - Duplicate check hash
+    dupHash is a short hash of a transaction's date, time, amount and
+    description (lower case, with runs of spaces made single), worked
+    out by ExpenseTracker.py (see dupHash). Looking a new transaction's
+    hash up on (userID, dupHash) finds an identical one already entered
+    with a single index seek. Transactions from before this migration
+    have no hash until the duplicate scan fills it in.
+*/
+IF COL_LENGTH('dbo.transactions', 'dupHash') IS NULL
+    ALTER TABLE dbo.transactions ADD dupHash CHAR(16) NULL;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_transactions_userID_dupHash'
+               AND object_id = OBJECT_ID('dbo.transactions'))
+    CREATE INDEX IX_transactions_userID_dupHash ON dbo.transactions (userID, dupHash);
+GO
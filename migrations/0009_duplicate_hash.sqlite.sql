@@ -0,0 +1,12 @@
+/*
+    0009 - Duplicate check hash
+    dupHash is a short hash of a transaction's date, time, amount and
+    description (lower case, with runs of spaces made single), worked
+    out by ExpenseTracker.py (see dupHash). Looking a new transaction's
+    hash up on (userID, dupHash) finds an identical one already entered
+    with a single index seek. Transactions from before this migration
+    have no hash until the duplicate scan fills it in.
+*/
+ALTER TABLE transactions ADD COLUMN dupHash TEXT;
+
+CREATE INDEX IX_transactions_userID_dupHash ON transactions (userID, dupHash);
@@ -0,0 +1,16 @@
+/*
+    0010 - Category foreign key
+    A Category with transactions must never be deleted. 0001 creates
+    transactions.catID with a foreign key to categories, but leaves a
+    transactions table that already existed as it was, so the original
+    Exp_Tracker database may not have one. It is added here if missing
+    (WITH CHECK, so every existing catID is checked as well). Checks on
+    it use IX_transactions_catID (see 0003).
+*/
+IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys
+               WHERE parent_object_id = OBJECT_ID('dbo.transactions')
+               AND referenced_object_id = OBJECT_ID('dbo.categories'))
+    ALTER TABLE dbo.transactions WITH CHECK
+        ADD CONSTRAINT FK_transactions_categories
+        FOREIGN KEY (catID) REFERENCES dbo.categories (catID);
+GO
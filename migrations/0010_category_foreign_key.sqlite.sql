@@ -0,0 +1,10 @@
+/*
+    0010 - Category foreign key
+    A Category with transactions must never be deleted. SQLite
+    databases are always created by 0001, which already gives
+    transactions.catID a foreign key to categories (enforced as
+    connectLocalDB turns foreign_keys on), and checks on it use
+    IX_transactions_catID (see 0003). Nothing needs to change here; the
+    version is kept in step with SQL Server.
+*/
+SELECT 1;
@@ -0,0 +1,42 @@
+/*
+    0011 - Keep budgets and recurring transactions with their Category
+    0006 and 0008 gave budgets.catID and recurring.catID foreign keys
+    with ON DELETE CASCADE, so deleting a Category silently removed
+    its budgets and recurring transactions. A Category still in use
+    is never deleted (see catInUse) and merging one moves them (see
+    mergeCat), so the cascades are replaced with plain foreign keys:
+    a DELETE made any other way now fails instead.
+*/
+DECLARE @fkName SYSNAME;
+SELECT @fkName = name FROM sys.foreign_keys
+WHERE parent_object_id = OBJECT_ID('dbo.budgets')
+AND referenced_object_id = OBJECT_ID('dbo.categories')
+AND delete_referential_action_desc = 'CASCADE';
+IF @fkName IS NOT NULL
+    EXEC ('ALTER TABLE dbo.budgets DROP CONSTRAINT ' + QUOTENAME(@fkName));
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys
+               WHERE parent_object_id = OBJECT_ID('dbo.budgets')
+               AND referenced_object_id = OBJECT_ID('dbo.categories'))
+    ALTER TABLE dbo.budgets WITH CHECK
+        ADD CONSTRAINT FK_budgets_categories
+        FOREIGN KEY (catID) REFERENCES dbo.categories (catID);
+GO
+
+DECLARE @fkName SYSNAME;
+SELECT @fkName = name FROM sys.foreign_keys
+WHERE parent_object_id = OBJECT_ID('dbo.recurring')
+AND referenced_object_id = OBJECT_ID('dbo.categories')
+AND delete_referential_action_desc = 'CASCADE';
+IF @fkName IS NOT NULL
+    EXEC ('ALTER TABLE dbo.recurring DROP CONSTRAINT ' + QUOTENAME(@fkName));
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys
+               WHERE parent_object_id = OBJECT_ID('dbo.recurring')
+               AND referenced_object_id = OBJECT_ID('dbo.categories'))
+    ALTER TABLE dbo.recurring WITH CHECK
+        ADD CONSTRAINT FK_recurring_categories
+        FOREIGN KEY (catID) REFERENCES dbo.categories (catID);
+GO
@@ -0,0 +1,45 @@
+/*
+    0011 - Keep budgets and recurring transactions with their Category
+    0006 and 0008 gave budgets.catID and recurring.catID foreign keys
+    with ON DELETE CASCADE, so deleting a Category silently removed
+    its budgets and recurring transactions. A Category still in use
+    is never deleted (see catInUse) and merging one moves them (see
+    mergeCat), so the cascades are replaced with plain foreign keys:
+    a DELETE made any other way now fails instead. SQLite cannot
+    change a foreign key, so both tables are rebuilt and their rows
+    copied across.
+*/
+CREATE TABLE budgets_new (
+    budID INTEGER PRIMARY KEY,
+    userID TEXT NOT NULL REFERENCES users (userID),
+    catID TEXT NULL REFERENCES categories (catID),
+    budPeriod TEXT NOT NULL CHECK (budPeriod IN ('week', 'month', 'year')),
+    budAmount REAL NOT NULL CHECK (budAmount > 0),
+    rollover INTEGER NOT NULL DEFAULT 0,
+    startDate TEXT NOT NULL
+);
+
+INSERT INTO budgets_new (budID, userID, catID, budPeriod, budAmount, rollover, startDate)
+    SELECT budID, userID, catID, budPeriod, budAmount, rollover, startDate FROM budgets;
+DROP TABLE budgets;
+ALTER TABLE budgets_new RENAME TO budgets;
+CREATE INDEX IX_budgets_userID ON budgets (userID);
+
+CREATE TABLE recurring_new (
+    recID INTEGER PRIMARY KEY,
+    userID TEXT NOT NULL REFERENCES users (userID),
+    catID TEXT NOT NULL REFERENCES categories (catID),
+    recDescription TEXT NOT NULL,
+    recAmount REAL NOT NULL CHECK (recAmount > 0),
+    recPeriod TEXT NOT NULL CHECK (recPeriod IN ('week', 'month', 'year')),
+    recTime TEXT NOT NULL,
+    startDate TEXT NOT NULL,
+    nextDate TEXT NOT NULL,
+    endDate TEXT NULL
+);
+
+INSERT INTO recurring_new (recID, userID, catID, recDescription, recAmount, recPeriod, recTime, startDate, nextDate, endDate)
+    SELECT recID, userID, catID, recDescription, recAmount, recPeriod, recTime, startDate, nextDate, endDate FROM recurring;
+DROP TABLE recurring;
+ALTER TABLE recurring_new RENAME TO recurring;
+CREATE INDEX IX_recurring_userID ON recurring (userID);
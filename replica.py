@@ -0,0 +1,607 @@
+'''
+-----------------------------------------------------------
+    Program Title: replica.py
+    Description: Local replica of the expense tracker database, so
+                 ExpenseTracker.py keeps working when the Azure
+                 database is asleep or the network is down. The
+                 replica is a SQLite database with the same schema
+                 (see migrate.py). The program reads from it and
+                 writes to it, and sync() exchanges just the changes
+                 with the server:
+
+                 Push: every local change to a transaction is
+                    journaled by the changeLog triggers in the
+                    replica. Each changed transaction is sent to the
+                    server, only if the server copy still has the
+                    row version (tranVersion) the replica last saw.
+                    If it does not, the server copy wins and the
+                    local change is kept in syncConflicts.
+                 Pull: the transactions changed on the server since
+                    the last sync are found with SQL Server change
+                    tracking (or the changeLog table when the server
+                    is a SQLite database) and copied into the replica.
+                    Users, categories, budgets and recurring
+                    transactions are small and are copied in full on
+                    each sync.
+
+                 Only transactions are sent to the server. Users,
+                 categories, budgets and recurring transactions are
+                 read-only copies, so changes to them need to be made
+                 while online.
+    Usage:       python replica.py replica.db server.db userID
+                 (syncs two SQLite databases, to try out or test
+                 the sync without the Azure database)
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+# import modules
+import sys
+import json
+import sqlite3
+from datetime import datetime
+import migrate
+
+
+# global variables
+tranColumns = ['tranID', 'userID', 'tranDate', 'tranTime', 'catID', 'tranDescription', 'tranAmount', 'tranVersion',
+               'recKey', 'dupHash']
+maxInList = 500 # SQL Server allows at most 2100 parameters
+
+# How to read the server's changes for each kind of server database
+currentVersionSQL = {'mssql': "SELECT CHANGE_TRACKING_CURRENT_VERSION()",
+                     'sqlite': "SELECT COALESCE(MAX(changeID), 0) FROM changeLog"}
+minVersionSQL = {'mssql': "SELECT CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID('dbo.transactions'))",
+                 'sqlite': "SELECT 0"}
+changesSQL = {'mssql': "SELECT tranID FROM CHANGETABLE(CHANGES dbo.transactions, ?) AS changes",
+              'sqlite': "SELECT DISTINCT tranID FROM changeLog WHERE changeID > ?"}
+maxIDSQL = {'mssql': "SELECT MAX(CAST(tranID AS INT)) FROM transactions",
+            'sqlite': "SELECT MAX(CAST(tranID AS INTEGER)) FROM transactions"}
+
+
+def dialectOf(conn):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Works out which kind of database a connection is to.
+    Args:           conn: an open pyodbc or sqlite3 connection
+    Returns:        'sqlite' or 'mssql'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if isinstance(conn, sqlite3.Connection):
+        return ('sqlite')
+
+    return ('mssql')
+
+
+def openReplica(path):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Opens (creating if needed) a replica database,
+                    bringing it up to the latest schema and adding the
+                    tables used to keep track of syncing:
+                    syncState - the server change version each user's
+                        transactions were last pulled at
+                    syncRows - the server row version of each
+                        transaction, as last seen by the replica
+                    syncConflicts - local changes the server rejected
+    Args:           path (str): the replica database file
+    Returns:        local: the sqlite3 connection to the replica
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local = migrate.newDatabase(path)
+    local.executescript('''
+        CREATE TABLE IF NOT EXISTS syncState (
+            stateKey TEXT NOT NULL PRIMARY KEY,
+            stateValue INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS syncRows (
+            tranID TEXT NOT NULL PRIMARY KEY,
+            serverVersion INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS syncConflicts (
+            conflictID INTEGER PRIMARY KEY AUTOINCREMENT,
+            tranID TEXT NOT NULL,
+            localRow TEXT,
+            reason TEXT NOT NULL,
+            detectedOn TEXT NOT NULL
+        );
+    ''')
+
+    return (local)
+
+
+def pendingChanges(local):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Counts the transactions changed in the replica that
+                    have not been sent to the server yet.
+    Args:           local: the replica connection
+    Returns:        count (int): the number of changed transactions
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    return (local.execute("SELECT COUNT(DISTINCT tranID) FROM changeLog").fetchone()[0])
+
+
+def quietStart(local):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Marks the start of changes to the replica that come
+                    from the server (or from syncing), which must not
+                    be journaled to be sent back. Takes SQLite's write
+                    lock straight away, so no change made by the program
+                    can be journaled until quietEnd commits.
+    Args:           local: the replica connection
+    Returns:        start (int): the last journal entry before the
+                    changes
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if not local.in_transaction:
+        local.execute("BEGIN IMMEDIATE")
+
+    return (local.execute("SELECT COALESCE(MAX(changeID), 0) FROM changeLog").fetchone()[0])
+
+
+def quietEnd(local, start):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Removes the journal entries made since quietStart
+                    and commits the changes.
+    Args:           local: the replica connection
+                    start (int): the value returned by quietStart
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local.execute("DELETE FROM changeLog WHERE changeID > ?", [start])
+    local.commit()
+
+    return
+
+
+def getState(local, key):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads a value from syncState.
+    Args:           local: the replica connection
+                    key (str): the state name
+    Returns:        value (int), or None if it has not been set
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    row = local.execute("SELECT stateValue FROM syncState WHERE stateKey=?", [key]).fetchone()
+    if row == None:
+        return None
+
+    return (row[0])
+
+
+def setState(local, key, value):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Saves a value in syncState (not committed).
+    Args:           local: the replica connection
+                    key (str): the state name
+                    value (int): the value to save
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local.execute("INSERT OR REPLACE INTO syncState (stateKey, stateValue) VALUES (?, ?)", [key, value])
+
+    return
+
+
+def fixRow(row):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Converts a transaction row read from either database
+                    (in tranColumns order) to the replica's types,
+                    e.g. SQL Server dates and Decimal amounts. Keys
+                    that are not set (recKey, dupHash) stay None.
+    Args:           row: the transaction row
+    Returns:        fixedRow (list): the row ready for the replica
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    return ([str(row[0]).strip(), str(row[1]).strip(), str(row[2])[:10], str(row[3]).strip(),
+             str(row[4]).strip(), row[5], float(row[6]), int(row[7]),
+             None if row[8] == None else str(row[8]).strip(),
+             None if row[9] == None else str(row[9]).strip()])
+
+
+def saveLocalRow(local, row):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds or replaces a transaction from the server in
+                    the replica and records its server row version.
+    Args:           local: the replica connection
+                    row (list): the transaction (see fixRow)
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local.execute("INSERT INTO transactions (" + ", ".join(tranColumns) + ") "\
+                  "VALUES (" + ", ".join("?" * len(tranColumns)) + ") "\
+                  "ON CONFLICT (tranID) DO UPDATE SET "\
+                  "userID=excluded.userID, tranDate=excluded.tranDate, tranTime=excluded.tranTime, "\
+                  "catID=excluded.catID, tranDescription=excluded.tranDescription, "\
+                  "tranAmount=excluded.tranAmount, tranVersion=excluded.tranVersion, "\
+                  "recKey=excluded.recKey, dupHash=excluded.dupHash", row)
+    local.execute("INSERT OR IGNORE INTO userTransactions (userID, tranID) VALUES (?, ?)", [row[1], row[0]])
+    local.execute("INSERT OR REPLACE INTO syncRows (tranID, serverVersion) VALUES (?, ?)", [row[0], row[7]])
+
+    return
+
+
+def deleteLocalRow(local, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Removes a transaction deleted on the server from
+                    the replica.
+    Args:           local: the replica connection
+                    tranID (str): the transaction ID
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local.execute("DELETE FROM userTransactions WHERE tranID=?", [tranID])
+    local.execute("DELETE FROM transactions WHERE tranID=?", [tranID])
+    local.execute("DELETE FROM syncRows WHERE tranID=?", [tranID])
+
+    return
+
+
+def readServerRows(remote, uID, tranIDs=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads a user's transactions from the server, either
+                    all of them or just the ones with the given IDs
+                    (read a chunk of IDs at a time).
+    Args:           remote: the server connection
+                    uID (str): the userID
+                    tranIDs (list): the transaction IDs to read, or
+                    None for all of the user's transactions
+    Returns:        rows (list): the transactions (see fixRow)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sql = "SELECT " + ", ".join(tranColumns) + " FROM transactions WHERE userID=?"
+    cursor = remote.cursor()
+    rows = []
+    if tranIDs == None:
+        cursor.execute(sql, [uID])
+        rows = cursor.fetchall()
+    else:
+        for i in range(0, len(tranIDs), maxInList):
+            chunk = tranIDs[i:i + maxInList]
+            cursor.execute(sql + " AND tranID IN (" + ", ".join("?" * len(chunk)) + ")", [uID] + chunk)
+            rows += cursor.fetchall()
+    cursor.close()
+
+    return ([fixRow(row) for row in rows])
+
+
+def refreshShared(local, remote):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Copies the users, categories, budgets and recurring
+                    tables from the server into the replica. Categories
+                    no longer on the server are removed unless a local
+                    transaction still uses them.
+    Args:           local: the replica connection
+                    remote: the server connection
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    cursor = remote.cursor()
+    cursor.execute("SELECT userID, userPwd, fName, lName, userBudget FROM users")
+    users = cursor.fetchall()
+    cursor.execute("SELECT catID, catName FROM categories")
+    cats = cursor.fetchall()
+    cursor.execute("SELECT budID, userID, catID, budPeriod, budAmount, rollover, startDate FROM budgets")
+    buds = cursor.fetchall()
+    cursor.execute("SELECT recID, userID, catID, recDescription, recAmount, recPeriod, recTime, "\
+                   "startDate, nextDate, endDate FROM recurring")
+    recs = cursor.fetchall()
+    cursor.close()
+
+    for user in users:
+        local.execute("INSERT INTO users (userID, userPwd, fName, lName, userBudget) "\
+                      "VALUES (?, ?, ?, ?, ?) "\
+                      "ON CONFLICT (userID) DO UPDATE SET "\
+                      "userPwd=excluded.userPwd, fName=excluded.fName, lName=excluded.lName, "\
+                      "userBudget=excluded.userBudget",
+                      [str(user[0]).strip(), user[1], user[2], user[3], float(user[4])])
+    for cat in cats:
+        local.execute("INSERT INTO categories (catID, catName) VALUES (?, ?) "\
+                      "ON CONFLICT (catID) DO UPDATE SET catName=excluded.catName",
+                      [str(cat[0]).strip(), cat[1]])
+
+    # Budgets and recurring transactions are replaced outright
+    local.execute("DELETE FROM budgets")
+    for bud in buds:
+        local.execute("INSERT INTO budgets (budID, userID, catID, budPeriod, budAmount, rollover, startDate) "\
+                      "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      [int(bud[0]), str(bud[1]).strip(), None if bud[2] == None else str(bud[2]).strip(),
+                       bud[3], float(bud[4]), int(bud[5]), str(bud[6])[:10]])
+    local.execute("DELETE FROM recurring")
+    for rec in recs:
+        local.execute("INSERT INTO recurring (recID, userID, catID, recDescription, recAmount, recPeriod, recTime, "\
+                      "startDate, nextDate, endDate) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                      [int(rec[0]), str(rec[1]).strip(), str(rec[2]).strip(), rec[3], float(rec[4]), rec[5],
+                       str(rec[6]).strip(), str(rec[7])[:10], str(rec[8])[:10],
+                       None if rec[9] == None else str(rec[9])[:10]])
+
+    catIDs = [str(cat[0]).strip() for cat in cats]
+    local.execute("DELETE FROM categories "\
+                  "WHERE catID NOT IN (" + ", ".join("?" * len(catIDs)) + ") "\
+                  "AND NOT EXISTS (SELECT 1 FROM transactions WHERE transactions.catID = categories.catID)", catIDs)
+    local.commit()
+
+    return
+
+
+def snapshot(local, remote, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Replaces the replica's copy of a user's transactions
+                    with all of their transactions on the server. Used
+                    for the first sync, or when the server no longer
+                    has the changes since the last sync.
+    Args:           local: the replica connection
+                    remote: the server connection
+                    uID (str): the userID
+    Returns:        count (int): the number of transactions copied
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    dialect = dialectOf(remote)
+
+    # Read the change version first, so a change made while copying
+    # is pulled again next time
+    cursor = remote.cursor()
+    cursor.execute(currentVersionSQL[dialect])
+    version = int(cursor.fetchone()[0] or 0)
+    cursor.close()
+    rows = readServerRows(remote, uID)
+
+    start = quietStart(local)
+    localIDs = [row[0] for row in local.execute("SELECT tranID FROM transactions WHERE userID=?", [uID])]
+    for tranID in localIDs:
+        deleteLocalRow(local, tranID)
+    for row in rows:
+        saveLocalRow(local, row)
+    setState(local, 'lastVersion:' + uID, version)
+    quietEnd(local, start)
+
+    return (len(rows))
+
+
+def recordConflict(local, tranID, localRow, reason):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Keeps a local change the server rejected in
+                    syncConflicts, so it is not lost.
+    Args:           local: the replica connection
+                    tranID (str): the transaction ID
+                    localRow: the replica's copy of the transaction,
+                    or None if it was deleted locally
+                    reason (str): why it was rejected
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    local.execute("INSERT INTO syncConflicts (tranID, localRow, reason, detectedOn) VALUES (?, ?, ?, ?)",
+                  [tranID, None if localRow == None else json.dumps(list(localRow)), reason,
+                   datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+
+    return
+
+
+def pushInsert(local, remote, row):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Sends a transaction added in the replica to the
+                    server. If its tranID has been used on the server
+                    in the meantime it is given the next free tranID,
+                    on the server and in the replica. A recurring
+                    transaction another copy of the program has already
+                    added to the server (the same recKey) is not sent
+                    again: the replica's copy is removed, and the
+                    server's is pulled down in its place.
+    Args:           local: the replica connection
+                    remote: the server connection
+                    row (list): the replica's transaction (see fixRow)
+    Returns:        tranID (str): the transaction's tranID on the server
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    cursor = remote.cursor()
+    oldID = row[0]
+    if row[8] != None:
+        cursor.execute("SELECT tranID FROM transactions WHERE recKey=?", [row[8]])
+        serverRow = cursor.fetchone()
+        if serverRow != None:
+            cursor.close()
+            deleteLocalRow(local, oldID)
+            return (str(serverRow[0]).strip())
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE tranID=?", [oldID])
+    if cursor.fetchone()[0] > 0:
+        # tranID is text, so compare the IDs as numbers ('99' > '100')
+        cursor.execute(maxIDSQL[dialectOf(remote)])
+        serverMax = int(cursor.fetchone()[0])
+        localMax = int(local.execute(maxIDSQL['sqlite']).fetchone()[0])
+        row = [str(max(serverMax, localMax) + 1)] + row[1:]
+
+    cursor.execute("INSERT INTO transactions (tranID, userID, tranDate, tranTime, catID, tranDescription, tranAmount, tranVersion, recKey, dupHash) "\
+                   "VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)", row[:7] + row[8:])
+    cursor.execute("INSERT INTO userTransactions (userID, tranID) VALUES (?, ?)", [row[1], row[0]])
+    remote.commit()
+    cursor.close()
+
+    # Give the replica's copy its server tranID and row version
+    if row[0] != oldID:
+        local.execute("DELETE FROM userTransactions WHERE tranID=?", [oldID])
+        local.execute("DELETE FROM transactions WHERE tranID=?", [oldID])
+    saveLocalRow(local, row[:7] + [1] + row[8:])
+
+    return (row[0])
+
+
+def pushChanges(local, remote, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Sends the user's journaled local changes to the
+                    server, one transaction at a time, each committed on
+                    the server before its journal entries are removed.
+                    An UPDATE or DELETE is only made if the server copy
+                    still has the row version the replica last saw;
+                    otherwise the change is recorded as a conflict and
+                    the server copy is pulled down in its place.
+    Args:           local: the replica connection
+                    remote: the server connection
+                    uID (str): the userID
+    Returns:        pushed (int): the number of changes sent
+                    conflicts (int): the number of changes rejected
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    pushed = 0
+    conflicts = 0
+    journal = local.execute("SELECT tranID, MAX(changeID) FROM changeLog "\
+                            "WHERE userID=? GROUP BY tranID ORDER BY MAX(changeID)", [uID]).fetchall()
+
+    for tranID, lastChange in journal:
+        row = local.execute("SELECT " + ", ".join(tranColumns) + " FROM transactions WHERE tranID=?", [tranID]).fetchone()
+        synced = local.execute("SELECT serverVersion FROM syncRows WHERE tranID=?", [tranID]).fetchone()
+
+        start = quietStart(local)
+        cursor = remote.cursor()
+        if row != None and synced == None:
+            # Added in the replica
+            pushInsert(local, remote, fixRow(row))
+            pushed += 1
+        elif row != None:
+            # Changed in the replica
+            row = fixRow(row)
+            cursor.execute("UPDATE transactions "\
+                           "SET tranDate=?, tranTime=?, catID=?, tranDescription=?, tranAmount=?, dupHash=?, "\
+                           "tranVersion=tranVersion + 1 "\
+                           "WHERE tranID=? AND userID=? AND tranVersion=?",
+                           row[2:7] + [row[9], tranID, uID, synced[0]])
+            if cursor.rowcount == 1:
+                remote.commit()
+                local.execute("UPDATE transactions SET tranVersion=? WHERE tranID=?", [synced[0] + 1, tranID])
+                local.execute("UPDATE syncRows SET serverVersion=? WHERE tranID=?", [synced[0] + 1, tranID])
+                pushed += 1
+            else:
+                remote.rollback()
+                recordConflict(local, tranID, row, 'changed or deleted on the server')
+                conflicts += 1
+        elif synced != None:
+            # Deleted in the replica
+            cursor.execute("DELETE FROM userTransactions WHERE tranID=? AND userID=?", [tranID, uID])
+            cursor.execute("DELETE FROM transactions WHERE tranID=? AND userID=? AND tranVersion=?", [tranID, uID, synced[0]])
+            if cursor.rowcount == 1:
+                remote.commit()
+                local.execute("DELETE FROM syncRows WHERE tranID=?", [tranID])
+                pushed += 1
+            else:
+                remote.rollback()
+                recordConflict(local, tranID, None, 'changed on the server')
+                conflicts += 1
+        cursor.close()
+
+        # Added and deleted again in the replica needs nothing sent
+        local.execute("DELETE FROM changeLog WHERE tranID=? AND changeID <= ?", [tranID, lastChange])
+        quietEnd(local, start)
+
+    return (pushed, conflicts)
+
+
+def pullChanges(local, remote, uID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Copies the user's transactions changed on the
+                    server since the last sync into the replica (a
+                    full snapshot the first time). Transactions with
+                    local changes still waiting to be sent are left
+                    alone; the next push checks them against the
+                    server.
+    Args:           local: the replica connection
+                    remote: the server connection
+                    uID (str): the userID
+    Returns:        pulled (int): the number of transactions changed
+                    in the replica
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    dialect = dialectOf(remote)
+    lastVersion = getState(local, 'lastVersion:' + uID)
+
+    cursor = remote.cursor()
+    cursor.execute(minVersionSQL[dialect])
+    minVersion = int(cursor.fetchone()[0] or 0)
+    if lastVersion == None or lastVersion < minVersion:
+        cursor.close()
+        return (snapshot(local, remote, uID))
+
+    cursor.execute(currentVersionSQL[dialect])
+    version = int(cursor.fetchone()[0] or 0)
+    cursor.execute(changesSQL[dialect], [lastVersion])
+    changedIDs = [str(row[0]).strip() for row in cursor.fetchall()]
+    cursor.close()
+
+    pending = set(row[0] for row in local.execute("SELECT DISTINCT tranID FROM changeLog"))
+    changedIDs = [tranID for tranID in changedIDs if tranID not in pending]
+    rows = readServerRows(remote, uID, changedIDs)
+
+    start = quietStart(local)
+    pulled = 0
+    for row in rows:
+        synced = local.execute("SELECT serverVersion FROM syncRows WHERE tranID=?", [row[0]]).fetchone()
+        if synced == None or synced[0] != row[7]:
+            saveLocalRow(local, row)
+            pulled += 1
+
+    # Changed IDs not found for this user have been deleted (or
+    # belong to another user, so are not in the replica)
+    found = set(row[0] for row in rows)
+    for tranID in changedIDs:
+        if tranID not in found and local.execute("SELECT 1 FROM syncRows WHERE tranID=?", [tranID]).fetchone() != None:
+            deleteLocalRow(local, tranID)
+            pulled += 1
+    setState(local, 'lastVersion:' + uID, version)
+    quietEnd(local, start)
+
+    return (pulled)
+
+
+def sync(local, remote, uID=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Syncs the replica with the server: refreshes the
+                    users, categories, budgets and recurring
+                    transactions, then (for a user) pushes the
+                    local changes and pulls the server changes.
+    Args:           local: the replica connection
+                    remote: the server connection
+                    uID (str): the userID to sync transactions for, or
+                    None to only refresh the read-only tables
+    Returns:        result (dict): pushed, conflicts and pulled counts
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    result = {'pushed': 0, 'conflicts': 0, 'pulled': 0}
+    refreshShared(local, remote)
+    if uID != None:
+        uID = str(uID).strip()
+        result['pushed'], result['conflicts'] = pushChanges(local, remote, uID)
+        result['pulled'] = pullChanges(local, remote, uID)
+
+    return (result)
+
+
+# Main
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print ('Usage: python replica.py replica.db server.db userID')
+        sys.exit(1)
+
+    local = openReplica(sys.argv[1])
+    remote = migrate.newDatabase(sys.argv[2])
+    result = sync(local, remote, sys.argv[3])
+    print ('Sent ' + str(result['pushed']) + ' change(s), '\
+           + str(result['conflicts']) + ' conflict(s), '\
+           + 'received ' + str(result['pulled']) + ' change(s).')
+    local.close()
+    remote.close()
@@ -0,0 +1,638 @@
+'''
+-----------------------------------------------------------
+    Program Title: server.py
+    Description: A multi-user HTTP/JSON API over the expense engine
+                 in ExpenseTracker.py, so other programs (a web or
+                 phone app) can use the expense tracker. It runs on
+                 one asyncio event loop using the async data layer
+                 (see getDataAsync), sharing the database connection
+                 pools and the per-user report and budget caches
+                 between all the users logged in.
+
+                 POST   /login                 {"userID", "password"}
+                 POST   /logout
+                 GET    /categories
+                 GET    /transactions          ?cats=&firstDate=&secDate=
+                                               &firstTime=&secTime=
+                                               &minAmt=&maxAmt=&descText=
+                 GET    /transactions/search   ?text=&fuzzy=
+                 GET    /transactions/<tranID>
+                 POST   /transactions          {"tranDate", "tranTime",
+                                               "catID", "tranDescription",
+                                               "tranAmount"}
+                 PATCH  /transactions/<tranID> any of the above, and
+                                               optionally "tranVersion"
+                 DELETE /transactions/<tranID>
+                 GET    /budget
+                 GET    /reports/<all|cat|date|time>
+                                               ?catID=&firstDate=&secDate=
+                                               &firstTime=&secTime=
+
+                 Dates are dd-mm-yyyy and times hh:mm, as in the
+                 expense tracker. Every request but /login needs the
+                 header "Authorization: Bearer <token>", using the
+                 token /login returns.
+    Usage:       python server.py [port]
+                 (set EXPENSE_TRACKER_DB to serve a local SQLite database)
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+# import modules
+import asyncio
+import json
+import secrets
+import sys
+import time
+import traceback
+from urllib.parse import urlsplit, parse_qs
+from ExpenseTracker import (getDataAsync, getConn, releaseConn, dbDialect,
+                            closeAsyncPool, checkLogin, insertTran, updateTran,
+                            deleteTran, dupHash, findDuplicate, searchTransAsync,
+                            searchDescAsync, budSummaryAsync, buildRepAsync,
+                            isValidDate, isValidTime, isValidAmt, fixDate,
+                            convertDate)
+
+
+# global variables
+# Logged in users: token -> {'userID', 'name', 'lastUsed'}
+sessions = {}
+sessionIdle = 30 * 60 # seconds
+maxBody = 64 * 1024 # bytes
+
+statusText = {200: 'OK', 201: 'Created', 400: 'Bad Request', 401: 'Unauthorized',
+              404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict',
+              413: 'Payload Too Large', 500: 'Internal Server Error',
+              503: 'Service Unavailable'}
+
+
+class ApiError(Exception):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Raised by a request handler to answer the request
+                    with an HTTP error status and message.
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def tranJSON(tran):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Converts a transaction record (tranID, Date, Time,
+                    Category, Description, Amount) to a JSON object.
+    Args:           tran (list): the transaction record
+    Returns:        tran (dict): the transaction
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    return ({'tranID': str(tran[0]),
+             'tranDate': fixDate(tran[1]),
+             'tranTime': str(tran[2])[:5],
+             'catName': str(tran[3]).strip(),
+             'tranDescription': str(tran[4]).strip(),
+             'tranAmount': round(float(tran[5]), 2)})
+
+
+async def getCats():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads the Category IDs and names.
+    Args:           Nil
+    Returns:        cats (dict): Category ID -> name
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rows = await getDataAsync("SELECT catID, catName FROM categories ORDER BY catID")
+    if rows == None:
+        raise ApiError(503, 'The database is not available')
+
+    return ({str(row[0]).strip(): str(row[1]).strip() for row in rows})
+
+
+async def readTranFields(body, allFields):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks the transaction fields in a request body with
+                    the same rules the expense tracker uses when they
+                    are typed in.
+    Args:           body (dict): the request body
+                    allFields (bool): True if every field is needed (a
+                    new transaction)
+    Returns:        fields (dict): the checked fields, keyed by their
+                    transactions column name
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    fields = {}
+    for name in ('tranDate', 'tranTime', 'catID', 'tranDescription', 'tranAmount'):
+        if name not in body:
+            if allFields:
+                raise ApiError(400, name + ' is missing')
+            continue
+        value = body[name]
+        if isinstance(value, float):
+            value = '%.2f' % value if round(value, 2) == value else str(value)
+        value = str(value).strip()
+
+        if name == 'tranDate' and not isValidDate(value):
+            raise ApiError(400, 'tranDate must be a dd-mm-yyyy date')
+        if name == 'tranTime' and not isValidTime(value):
+            raise ApiError(400, 'tranTime must be a hh:mm time')
+        if name == 'catID' and value not in await getCats():
+            raise ApiError(400, 'catID is not a valid Category ID')
+        if name == 'tranDescription' and (value == '' or len(value) > 50):
+            raise ApiError(400, 'tranDescription must be 1 to 50 characters')
+        if name == 'tranAmount' and (not isValidAmt(value) or float(value) <= 0):
+            raise ApiError(400, 'tranAmount must be an amount over 0.00')
+        fields[name] = value
+
+    return (fields)
+
+
+def searchCriteria(query):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks the search values in a query string and
+                    builds the criteria for searchTrans from them.
+    Args:           query (dict): the query string values
+    Returns:        criteria (dict): the search criteria (see
+                    buildSearch)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    criteria = {}
+    if query.get('cats'):
+        criteria['cats'] = [catID.strip() for catID in query['cats'].split(',') if catID.strip()]
+    for name, isValid in (('firstDate', isValidDate), ('secDate', isValidDate),
+                          ('firstTime', isValidTime), ('secTime', isValidTime),
+                          ('minAmt', isValidAmt), ('maxAmt', isValidAmt)):
+        value = query.get(name, '')
+        if value == '':
+            continue
+        if not isValid(value):
+            raise ApiError(400, name + ' is not valid')
+        criteria[name] = value
+    if query.get('descText'):
+        criteria['descText'] = query['descText']
+
+    return (criteria)
+
+
+async def login(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks a user's userID and password and starts a
+                    login session for them.
+    Args:           session (dict): the user's login session
+                    body (dict): 'userID' and 'password'
+    Returns:        status (int): the HTTP status
+                    payload: the session 'token', 'userID' and user's 'name'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    userName = await asyncio.to_thread(checkLogin, str(body.get('userID', '')), str(body.get('password', '')))
+    if userName == None:
+        raise ApiError(401, 'That userID and password are not valid')
+
+    # Throw away sessions that have not been used for a while
+    now = time.monotonic()
+    for token in [token for token, old in sessions.items() if now - old['lastUsed'] > sessionIdle]:
+        del sessions[token]
+
+    token = secrets.token_hex(16)
+    sessions[token] = {'userID': str(body['userID']), 'name': userName, 'lastUsed': now}
+
+    return (200, {'token': token, 'userID': str(body['userID']), 'name': userName})
+
+
+async def logout(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Ends the user's login session.
+    Args:           session (dict): the user's login session
+    Returns:        status (int): the HTTP status
+                    payload: an empty object
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sessions.pop(session['token'], None)
+
+    return (200, {})
+
+
+async def listCats(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Lists the expense Categories.
+    Args:           session (dict): the user's login session
+    Returns:        status (int): the HTTP status
+                    payload: a list of 'catID' and 'catName' objects
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    cats = await getCats()
+
+    return (200, [{'catID': catID, 'catName': catName} for catID, catName in cats.items()])
+
+
+async def findTrans(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Searches the user's transactions on any mix of
+                    fields (see buildSearch).
+    Args:           session (dict): the user's login session
+                    query (dict): the search values
+    Returns:        status (int): the HTTP status
+                    payload: a list of transactions (see tranJSON)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    trans = await searchTransAsync(session['userID'], searchCriteria(query))
+    if trans == None:
+        raise ApiError(503, 'The database is not available')
+
+    return (200, [tranJSON(tran) for tran in trans])
+
+
+async def findDesc(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Searches the user's transaction descriptions by
+                    word (see searchDesc).
+    Args:           session (dict): the user's login session
+                    query (dict): 'text' and optionally 'fuzzy' (0 for
+                    exact words only)
+    Returns:        status (int): the HTTP status
+                    payload: a list of transactions (see tranJSON)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    text = query.get('text', '').strip()
+    if text == '':
+        raise ApiError(400, 'text is missing')
+    trans = await searchDescAsync(session['userID'], text, query.get('fuzzy', '1') != '0')
+    if trans == None:
+        raise ApiError(503, 'The database is not available')
+
+    return (200, [tranJSON(tran) for tran in trans])
+
+
+async def getTran(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads one of the user's transactions along with
+                    its row version (for a PATCH).
+    Args:           session (dict): the user's login session
+                    tranID (string): the transaction ID
+    Returns:        status (int): the HTTP status
+                    payload: the transaction (see tranJSON) and 'tranVersion'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    rows = await getDataAsync("SELECT transactions.tranID, tranDate, tranTime, categories.catName, "\
+                              "tranDescription, tranAmount, tranVersion "\
+                              "FROM transactions "\
+                              "INNER JOIN categories on transactions.catID = categories.catID "\
+                              "WHERE transactions.tranID=? AND transactions.userID=?",
+                              [tranID, session['userID']])
+    if rows == None:
+        raise ApiError(503, 'The database is not available')
+    if rows == []:
+        raise ApiError(404, 'There is no transaction ' + tranID)
+
+    tran = tranJSON(rows[0])
+    tran['tranVersion'] = int(rows[0][6])
+
+    return (200, tran)
+
+
+async def addTran(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Adds a new transaction for the user (see
+                    insertTran). If the user already has a transaction
+                    with the same date, time, amount and description
+                    (see findDuplicate) it is still added, and its
+                    TranID is handed back so the client can warn them.
+    Args:           session (dict): the user's login session
+                    body (dict): the transaction's fields
+    Returns:        status (int): the HTTP status
+                    payload: the new 'tranID' and 'duplicateOf' (the
+                    TranID it duplicates, or null)
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    fields = await readTranFields(body, True)
+    dupID = await asyncio.to_thread(findDuplicate, session['userID'],
+                                    dupHash(convertDate(fields['tranDate']), fields['tranTime'],
+                                            fields['tranAmount'], fields['tranDescription']))
+    newID = await asyncio.to_thread(insertTran, session['userID'], fields['tranDate'], fields['tranTime'],
+                                    fields['catID'], fields['tranDescription'], fields['tranAmount'])
+    if newID == None:
+        raise ApiError(503, 'The transaction could not be added')
+
+    return (201, {'tranID': newID, 'duplicateOf': dupID})
+
+
+async def changeTran(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Changes any of the fields of one of the user's
+                    transactions (see updateTran). If a tranVersion
+                    is given the change is only made if the
+                    transaction still has that row version.
+    Args:           session (dict): the user's login session
+                    body (dict): the fields to change
+                    tranID (string): the transaction ID
+    Returns:        status (int): the HTTP status
+                    payload: the changed transaction (see tranJSON) and its
+                    new 'tranVersion'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    changes = await readTranFields(body, False)
+    if changes == {}:
+        raise ApiError(400, 'There are no fields to change')
+    if 'tranDate' in changes:
+        changes['tranDate'] = convertDate(changes['tranDate'])
+
+    rows = await getDataAsync("SELECT tranAmount, tranVersion, catID, tranDate, tranTime, tranDescription "\
+                              "FROM transactions WHERE tranID=? AND userID=?",
+                              [tranID, session['userID']])
+    if rows == None:
+        raise ApiError(503, 'The database is not available')
+    if rows == []:
+        raise ApiError(404, 'There is no transaction ' + tranID)
+
+    # Without a tranVersion the change is made to whatever is there now
+    try:
+        tranVersion = int(body.get('tranVersion', rows[0][1]))
+    except (TypeError, ValueError):
+        raise ApiError(400, 'tranVersion must be a whole number')
+    oldTran = [rows[0][2], str(rows[0][3]), float(rows[0][0]), rows[0][4], rows[0][5]]
+    tran, amtDelta = await asyncio.to_thread(updateTran, tranID, session['userID'], changes,
+                                             oldTran, tranVersion)
+    if tran == None:
+        raise ApiError(409, 'The transaction has been changed or deleted since it was read')
+
+    tran = tranJSON(tran)
+    tran['tranVersion'] = tranVersion + 1
+
+    return (200, tran)
+
+
+async def removeTran(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Deletes one of the user's transactions (see
+                    deleteTran).
+    Args:           session (dict): the user's login session
+                    tranID (string): the transaction ID
+    Returns:        status (int): the HTTP status
+                    payload: the deleted 'tranID' and 'tranAmount'
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    tranAmt = await asyncio.to_thread(deleteTran, tranID, session['userID'])
+    if tranAmt == None:
+        raise ApiError(404, 'There is no transaction ' + tranID)
+
+    return (200, {'tranID': tranID, 'tranAmount': tranAmt})
+
+
+async def budget(session, query, body, tranID):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Gives the user's budget summary.
+    Args:           session (dict): the user's login session
+    Returns:        status (int): the HTTP status
+                    payload: the budget 'summary' text
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    summary = await budSummaryAsync(session['userID'])
+
+    return (200, {'summary': summary})
+
+
+async def report(session, query, body, repType):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Builds one of the user's expense reports (see
+                    buildRepAsync).
+    Args:           session (dict): the user's login session
+                    query (dict): the values the report type needs
+                    repType (string): 'all', 'cat', 'date' or 'time'
+    Returns:        status (int): the HTTP status
+                    payload: the report's 'head', 'report' and 'budget' text
+                    and its 'rows' count
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if repType not in ('all', 'cat', 'date', 'time'):
+        raise ApiError(404, 'There is no ' + repType + ' report')
+
+    # Check the values each report type needs
+    needs = {'all': [], 'cat': ['catID'], 'date': ['firstDate', 'secDate'],
+             'time': ['firstDate', 'firstTime', 'secTime']}[repType]
+    spec = {'userID': session['userID'], 'repType': repType}
+    for name in needs:
+        value = query.get(name, '')
+        if (name.endswith('Date') and not isValidDate(value)) or \
+           (name.endswith('Time') and not isValidTime(value)) or value == '':
+            raise ApiError(400, name + ' is missing or not valid')
+        spec[name] = value
+
+    result = await buildRepAsync(spec)
+    if 'error' in result:
+        raise ApiError(503, result['error'])
+
+    return (200, {'head': result['head'], 'report': result['report'],
+                  'budget': result['budget'], 'rows': result['rows']})
+
+
+# The handler for each (method, path); a path ending in / takes the
+# rest of the path (a tranID or report type) as its last argument
+routes = {('POST', '/login'): login,
+          ('POST', '/logout'): logout,
+          ('GET', '/categories'): listCats,
+          ('GET', '/transactions'): findTrans,
+          ('GET', '/transactions/search'): findDesc,
+          ('POST', '/transactions'): addTran,
+          ('GET', '/transactions/'): getTran,
+          ('PATCH', '/transactions/'): changeTran,
+          ('DELETE', '/transactions/'): removeTran,
+          ('GET', '/budget'): budget,
+          ('GET', '/reports/'): report}
+
+
+async def handleRequest(method, target, headers, rawBody):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Finds the handler for a request, checks its login
+                    session and runs it.
+    Args:           method (string): the HTTP method
+                    target (string): the path and query string
+                    headers (dict): the request headers (lower case)
+                    rawBody (bytes): the request body
+    Returns:        status (int): the HTTP status
+                    payload: the response, to send as JSON
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    url = urlsplit(target)
+    path = url.path.rstrip('/') or '/'
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+    handler = routes.get((method, path))
+    pathArg = None
+    if handler == None:
+        prefix, sep, pathArg = path.rpartition('/')
+        handler = routes.get((method, prefix + '/'))
+    if handler == None:
+        if any(route[1] in (path, path.rpartition('/')[0] + '/') for route in routes):
+            raise ApiError(405, method + ' is not allowed on ' + path)
+        raise ApiError(404, 'There is no ' + path)
+
+    session = None
+    if handler != login:
+        token = headers.get('authorization', '').removeprefix('Bearer ').strip()
+        session = sessions.get(token)
+        if session == None or time.monotonic() - session['lastUsed'] > sessionIdle:
+            sessions.pop(token, None)
+            raise ApiError(401, 'Please log in')
+        session['lastUsed'] = time.monotonic()
+        session = dict(session, token=token)
+
+    try:
+        body = json.loads(rawBody) if rawBody else {}
+    except ValueError:
+        raise ApiError(400, 'The request body is not valid JSON')
+    if not isinstance(body, dict):
+        raise ApiError(400, 'The request body must be a JSON object')
+
+    return (await handler(session, query, body, pathArg))
+
+
+async def readRequest(reader):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Reads one HTTP/1.1 request from a connection.
+    Args:           reader (StreamReader): the client connection
+    Returns:        request (tuple): the method, target, headers (dict,
+                    lower case names), body (bytes) and HTTP version,
+                    or None if the client closed the connection
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', '0') or 0)
+    except ValueError:
+        return None
+    if length > maxBody:
+        raise ApiError(413, 'The request body is too large')
+    body = await reader.readexactly(length) if length > 0 else b''
+
+    return (method.upper(), target, headers, body, version)
+
+
+async def handleClient(reader, writer):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Answers the requests on one client connection,
+                    keeping it open between requests (HTTP keep-alive)
+                    until the client closes it.
+    Args:           reader, writer: the client connection streams
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    keepAlive = True
+    try:
+        while keepAlive:
+            try:
+                request = await readRequest(reader)
+                if request == None:
+                    break
+                method, target, headers, body, version = request
+                keepAlive = (headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1')
+                status, payload = await handleRequest(method, target, headers, body)
+            except ApiError as e:
+                status, payload = e.status, {'error': e.message}
+                if e.status == 413:
+                    keepAlive = False
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception:
+                # Answer the request rather than drop the connection, but
+                # keep the details (SQL, file paths) in the server's log
+                traceback.print_exc()
+                status, payload = 500, {'error': statusText[500]}
+
+            data = json.dumps(payload).encode('utf-8')
+            writer.write(('HTTP/1.1 ' + str(status) + ' ' + statusText.get(status, '') + '\r\n'\
+                          'Content-Type: application/json\r\n'\
+                          'Content-Length: ' + str(len(data)) + '\r\n'\
+                          'Connection: ' + ('keep-alive' if keepAlive else 'close') + '\r\n'\
+                          '\r\n').encode('latin-1') + data)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+    return
+
+
+async def startServer(host='127.0.0.1', port=8080):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Starts the API server on the running event loop. A
+                    local SQLite database is switched to write-ahead
+                    logging so users can read while another is writing.
+    Args:           host (string): the address to listen on
+                    port (int): the port to listen on (0 for any free
+                    port)
+    Returns:        server: the asyncio server
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if dbDialect() == 'sqlite':
+        conn = await asyncio.to_thread(getConn)
+        if conn != None:
+            conn.execute("PRAGMA journal_mode=WAL")
+            releaseConn(conn)
+
+    return (await asyncio.start_server(handleClient, host, port))
+
+
+async def runServer(host='127.0.0.1', port=8080):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Runs the API server until it is stopped (Ctrl+C).
+    Args:           host (string): the address to listen on
+                    port (int): the port to listen on
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    server = await startServer(host, port)
+    print ('Expense Tracker API listening on http://' + host + ':' + str(port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await closeAsyncPool()
+
+    return
+
+
+# Main
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    try:
+        asyncio.run(runServer(port=port))
+    except KeyboardInterrupt:
+        print ('Expense Tracker API stopped.')
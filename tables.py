@@ -0,0 +1,120 @@
+'''
+-----------------------------------------------------------
+    Program Title: tables.py
+    Description: Fast text tables for the transaction lists and
+                 reports in ExpenseTracker.py, drawn in the same
+                 layouts as tabulate's "pretty" and "simple" formats.
+
+                 The tables always have the same known columns, and
+                 the database limits how long each value can be (a
+                 30 character Category name, a 50 character
+                 Description, dd-mm-yyyy dates and hh:mm times), so
+                 the column widths can be set before any rows are
+                 read. Each row is then formatted with one prepared
+                 format string and handed back as soon as it is
+                 ready, so a table can be written out straight from
+                 the database without holding it all in memory.
+
+                 When the rows are already in memory, fitWidths sizes
+                 the columns to the data instead, which gives exactly
+                 the table tabulate would.
+    Usage:       import tables
+                 for line in tables.tableLines(rows, tables.reportColumns):
+                     print (line)
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+
+# global variables
+# Each table column: (heading, longest value it can hold, alignment)
+reportColumns = (('Date', 10, 'right'),
+                 ('Time', 5, 'right'),
+                 ('Category', 30, 'center'),
+                 ('Description', 50, 'left'),
+                 ('Amount', 12, 'right')) # $99999999.99, DECIMAL(10, 2)
+tranColumns = (('TranID', 10, 'right'),) + reportColumns
+
+# The space around each value and the smallest gap beside a heading
+# for each table style (as in tabulate)
+padding = {'pretty': 1, 'simple': 0}
+headingGap = {'pretty': 0, 'simple': 2}
+alignCodes = {'left': '<', 'center': '^', 'right': '>'}
+
+
+def cellText(value):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    The text shown in a table for one value (tabulate
+                    strips the spaces around values, and shows None as
+                    a blank).
+    Args:           value: the value
+    Returns:        text (str): the text to show
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if value == None:
+        return ('')
+
+    return (str(value).strip())
+
+
+def fitWidths(rows, columns, style='pretty'):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Works out the width of each column from the rows
+                    themselves, instead of the longest value each
+                    column can hold, so the table is only as wide as
+                    it needs to be.
+    Args:           rows (list): the table rows (already in memory)
+                    columns (tuple): the table columns (see
+                    reportColumns)
+                    style (str): 'pretty' or 'simple'
+    Returns:        widths (list): the width of each column
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    widths = [len(heading) + headingGap[style] for heading, limit, align in columns]
+    for col, values in enumerate(zip(*rows)):
+        widths[col] = max(widths[col], max(map(len, map(cellText, values))))
+
+    return (widths)
+
+
+def tableLines(rows, columns, style='pretty', widths=None):
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Draws a table one line at a time. Each row is
+                    formatted as it is read from rows, so rows can be
+                    any iterable, including one reading from the
+                    database (see streamData).
+    Args:           rows: the table rows
+                    columns (tuple): the table columns (see
+                    reportColumns)
+                    style (str): 'pretty' (boxed, as the reports) or
+                    'simple' (as the transaction lists)
+                    widths (list): the column widths, if not the longest
+                    value each column can hold (see fitWidths)
+    Returns:        lines: a generator of the table's lines
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if widths == None:
+        widths = [max(limit, len(heading) + headingGap[style]) for heading, limit, align in columns]
+
+    # One format string lays out a whole row
+    cells = ['{:' + alignCodes[align] + str(width) + '}' for (heading, limit, align), width in zip(columns, widths)]
+    pad = ' ' * padding[style]
+    if style == 'pretty':
+        rowFormat = '|' + pad + (pad + '|' + pad).join(cells) + pad + '|'
+        rule = '+' + '+'.join('-' * (width + 2 * padding[style]) for width in widths) + '+'
+    else:
+        rowFormat = '  '.join(cells)
+        rule = '  '.join('-' * width for width in widths)
+
+    if style == 'pretty':
+        yield (rule)
+    yield (rowFormat.format(*[heading for heading, limit, align in columns]))
+    yield (rule)
+    for row in rows:
+        yield (rowFormat.format(*map(cellText, row)))
+    if style == 'pretty':
+        yield (rule)
@@ -0,0 +1,176 @@
+'''
+-----------------------------------------------------------
+    Program Title: terminal.py
+    Description: Cross-platform screen handling for ExpenseTracker.py
+                 without starting a shell for every screen change
+                 (os.system('cls')) or needing the Windows-only msvcrt
+                 module on other systems.
+
+                 The screen is cleared with ANSI escape codes. Once it
+                 has been cleared, each new screen (a menu, a table
+                 of transactions) is drawn over the top of the last
+                 one in place: each line overwrites the old line at
+                 the same row and only what is left of the old screen
+                 below the new one is erased, when the program next
+                 waits for the user. Menus and tables therefore change
+                 without the screen going blank in between.
+
+                 Single key presses are read with termios on Linux and
+                 macOS, and msvcrt on Windows.
+    Usage:       import terminal
+                 terminal.clearScreen()
+                 key = terminal.getKey()
+    Author: David Rogers
+    Date Created: 19/10/2026
+-----------------------------------------------------------
+'''
+
+# import modules
+import os
+import sys
+import shutil
+
+
+# global variables
+# ANSI escape codes
+homeCursor = '\x1b[H'
+clearAll = '\x1b[H\x1b[2J\x1b[3J'
+eraseLine = '\x1b[K'
+eraseBelow = '\x1b[J'
+
+# Whether the terminal understands ANSI escape codes (see ansiSupported)
+ansiReady = None
+
+
+class ScreenWriter:
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Wraps sys.stdout so that everything printed after
+                    clearScreen overwrites the previous screen in
+                    place. Each line erases what is left of the old
+                    line after it, and the rest of the old screen is
+                    erased whenever the output is flushed (input()
+                    flushes before it waits for the user).
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.rows = 0
+        self.dirty = False
+
+    def write(self, text):
+        self.rows += text.count('\n')
+        self.dirty = self.dirty or text != ''
+
+        return (self.stream.write(text.replace('\n', eraseLine + '\n')))
+
+    def flush(self):
+        if self.dirty:
+            self.stream.write(eraseBelow)
+            self.dirty = False
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        # Everything else (encoding, isatty, fileno...) is the stream's
+        return (getattr(self.stream, name))
+
+
+def ansiSupported():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Checks whether the screen is a terminal that
+                    understands ANSI escape codes, turning them on in
+                    the Windows console if needed (Windows 10 and
+                    later). Output redirected to a file or pipe never
+                    gets escape codes.
+    Args:           Nil
+    Returns:        True if ANSI escape codes can be used
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    global ansiReady
+    if ansiReady != None:
+        return (ansiReady)
+
+    ansiReady = sys.stdout.isatty()
+    if ansiReady and os.name == 'nt':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11) # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            kernel32.GetConsoleMode(handle, ctypes.byref(mode))
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+            ansiReady = bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+        except (AttributeError, OSError):
+            ansiReady = False
+
+    return (ansiReady)
+
+
+def clearScreen():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Starts a new screen. The first time (or if the last
+                    screen was taller than the terminal and scrolled)
+                    the whole screen is cleared, otherwise the cursor
+                    just goes back to the top so the next screen is
+                    drawn over the last one (see ScreenWriter). Does
+                    nothing if the output is not a terminal.
+    Args:           Nil
+    Returns:        Nil
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    if not ansiSupported():
+        if sys.stdout.isatty():
+            # An old console without ANSI codes: scroll the screen away
+            print ('\n' * shutil.get_terminal_size().lines)
+        return
+
+    writer = sys.stdout
+    if not isinstance(writer, ScreenWriter):
+        writer = ScreenWriter(sys.stdout)
+        sys.stdout = writer
+        writer.stream.write(clearAll)
+    elif writer.rows >= shutil.get_terminal_size().lines - 1:
+        writer.stream.write(clearAll)
+    else:
+        writer.stream.write(homeCursor)
+    writer.rows = 0
+    writer.dirty = True
+
+    return
+
+
+def getKey():
+    """
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    Description:    Waits for the user to press a single key, without
+                    them needing to press Enter and without showing
+                    it. If the input is not a terminal (e.g. piped in)
+                    a line is read instead.
+    Args:           Nil
+    Returns:        key (str): the key pressed
+    ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    """
+    sys.stdout.flush()
+    if not sys.stdin.isatty():
+        return (sys.stdin.readline()[:1])
+
+    if os.name == 'nt':
+        import msvcrt
+        return (msvcrt.getwch())
+
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    oldMode = termios.tcgetattr(fd)
+    try:
+        # cbreak mode hands over each key as it is pressed but still
+        # lets Ctrl+C stop the program
+        tty.setcbreak(fd)
+        # Read all of a multi-byte key (e.g. an arrow key) at once
+        key = os.read(fd, 8)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, oldMode)
+
+    return (key.decode(sys.stdin.encoding or 'utf-8', 'replace'))